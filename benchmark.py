@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Copyright © 2019-2020, Matjaž Guštin <dev@matjaz.it> <https://matjaz.it>.
+# Released under the BSD 3-Clause License
+
+"""Benchmarks of the rangeforce module.
+
+Times every public validator on both the accepting and the raising path,
+with integers, floats, NaN and integers beyond the float range, using only
+the standard library (timeit). Results are written as JSON and can be
+compared against a previously stored baseline file to spot regressions:
+
+        python benchmark.py --output baseline.json
+        # ... change rangeforce.py ...
+        python benchmark.py --baseline baseline.json
+
+The exit code is 1 if any case got slower than the baseline by more than the
+tolerance, 0 otherwise.
+"""
+
+import argparse
+import decimal
+import json
+import math
+import platform
+import sys
+import timeit
+
+import rangeforce as rf
+
+# Beyond the float range.
+HUGE = 2 ** 2000
+
+# Case name, statement, accepting path (False means the statement raises).
+CASES = [
+    ('clip/int/inside', 'rf.clip(5, 0, 10)', True),
+    ('clip/int/below', 'rf.clip(-5, 0, 10)', True),
+    ('clip/int/above', 'rf.clip(50, 0, 10)', True),
+    ('clip/float/inside', 'rf.clip(0.5, 0.0, 1.0)', True),
+    ('clip/nan', 'rf.clip(math.nan, 0.0, 1.0)', True),
+    ('exactly/int/valid', 'rf.exactly(7, 7)', True),
+    ('exactly/int/invalid', 'rf.exactly(8, 7)', False),
+    ('exactly/float/valid', 'rf.exactly(0.5, 0.5)', True),
+    ('exactly/nan/valid', 'rf.exactly(math.nan, math.nan)', True),
+    ('exactly/nan/invalid', 'rf.exactly(0.5, math.nan)', False),
+    ('exactly/huge/valid', 'rf.exactly(HUGE, HUGE)', True),
+    ('exactly/huge/invalid', 'rf.exactly(HUGE, HUGE + 1)', False),
+    ('limited/closed/int/valid', 'rf.limited(5, 0, 10)', True),
+    ('limited/closed/int/invalid', 'rf.limited(50, 0, 10)', False),
+    ('limited/closed/float/valid', 'rf.limited(0.5, 0.0, 1.0)', True),
+    ('limited/closed/float/invalid', 'rf.limited(1.5, 0.0, 1.0)', False),
+    ('limited/closed/nan/invalid', 'rf.limited(math.nan, 0.0, 1.0)', False),
+    ('limited/closed/huge/valid', 'rf.limited(HUGE, 0, HUGE)', True),
+    ('limited/closed/huge/invalid', 'rf.limited(HUGE, 0, 10)', False),
+    ('limited/min-only/int/valid', 'rf.limited(5, 0, None)', True),
+    ('limited/min-only/int/invalid', 'rf.limited(-5, 0, None)', False),
+    ('limited/min-only/float/valid', 'rf.limited(0.5, 0.0, None)', True),
+    ('limited/min-only/nan/invalid', 'rf.limited(math.nan, 0.0, None)', False),
+    ('limited/min-only/huge/valid', 'rf.limited(HUGE, 0, None)', True),
+    ('limited/max-only/int/valid', 'rf.limited(5, None, 10)', True),
+    ('limited/max-only/int/invalid', 'rf.limited(50, None, 10)', False),
+    ('limited/max-only/float/valid', 'rf.limited(0.5, None, 1.0)', True),
+    ('limited/max-only/nan/invalid', 'rf.limited(math.nan, None, 1.0)', False),
+    ('limited/max-only/huge/invalid', 'rf.limited(HUGE, None, 10)', False),
+    ('limited/decimal/valid', 'rf.limited(DECIMAL, 0, 10)', True),
+    ('limited/decimal/nan/invalid', 'rf.limited(DECIMAL_NAN, 0, 10)', False),
+    ('limited/dtype/valid', 'rf.limited(5, 0, 10, dtype=int)', True),
+    ('limited/dtype/invalid', 'rf.limited(5.0, 0, 10, dtype=int)', False),
+    ('negative_int/valid', 'rf.negative_int(-5)', True),
+    ('negative_int/invalid', 'rf.negative_int(5)', False),
+    ('nonpositive_int/valid', 'rf.nonpositive_int(0)', True),
+    ('nonpositive_int/invalid', 'rf.nonpositive_int(5)', False),
+    ('positive_int/valid', 'rf.positive_int(5)', True),
+    ('positive_int/invalid', 'rf.positive_int(0)', False),
+    ('nonnegative_int/valid', 'rf.nonnegative_int(0)', True),
+    ('nonnegative_int/invalid', 'rf.nonnegative_int(-5)', False),
+    ('uint8/valid', 'rf.uint8(200)', True),
+    ('uint8/invalid', 'rf.uint8(300)', False),
+    ('uint16/valid', 'rf.uint16(60000)', True),
+    ('uint16/invalid', 'rf.uint16(70000)', False),
+    ('uint32/valid', 'rf.uint32(0xFFFFFFFF)', True),
+    ('uint32/invalid', 'rf.uint32(-1)', False),
+    ('uint64/valid', 'rf.uint64(0xFFFFFFFFFFFFFFFF)', True),
+    ('uint64/invalid', 'rf.uint64(HUGE)', False),
+    ('uint_bits/valid', 'rf.uint_bits(5, 3)', True),
+    ('uint_bits/invalid', 'rf.uint_bits(8, 3)', False),
+    ('uint_bits/huge/valid', 'rf.uint_bits(HUGE, 2001)', True),
+    ('uint_bits/huge/invalid', 'rf.uint_bits(HUGE, 64)', False),
+    ('int8/valid', 'rf.int8(-100)', True),
+    ('int8/invalid', 'rf.int8(-200)', False),
+    ('int16/valid', 'rf.int16(-30000)', True),
+    ('int16/invalid', 'rf.int16(40000)', False),
+    ('int32/valid', 'rf.int32(-2 ** 31)', True),
+    ('int32/invalid', 'rf.int32(2 ** 31)', False),
+    ('int64/valid', 'rf.int64(2 ** 63 - 1)', True),
+    ('int64/invalid', 'rf.int64(-HUGE)', False),
+    ('limited_len/closed/valid', 'rf.limited_len(SIZED, 0, 10)', True),
+    ('limited_len/closed/invalid', 'rf.limited_len(SIZED, 5, 10)', False),
+    ('limited_len/min-only/valid', 'rf.limited_len(SIZED, 0, None)', True),
+    ('limited_len/max-only/invalid', 'rf.limited_len(SIZED, None, 2)', False),
+    ('exact_len/valid', 'rf.exact_len(SIZED, 3)', True),
+    ('exact_len/invalid', 'rf.exact_len(SIZED, 4)', False),
+]
+
+NAMESPACE = {
+    'rf': rf,
+    'math': math,
+    'HUGE': HUGE,
+    'DECIMAL': decimal.Decimal('0.5'),
+    'DECIMAL_NAN': decimal.Decimal('NaN'),
+    'SIZED': [1, 2, 3],
+}
+
+RAISING_TEMPLATE = '''
+try:
+    {:}
+except Exception:
+    pass
+'''
+
+
+def run(cases, repeat=5):
+    """Times the given cases, returning a dictionary of results by case name.
+
+    Each result holds the best time per call out of the repetitions, in
+    nanoseconds, or the error message if a case did not behave as expected.
+    """
+    results = {}
+    for name, statement, accepting in cases:
+        try:
+            # Check once, outside of the timing, that the path is the intended
+            # one, so errors are reported instead of being timed.
+            exec(statement, dict(NAMESPACE))
+        except Exception as error:
+            if accepting:
+                results[name] = {'error': '{:}: {:}'.format(
+                    type(error).__name__, error)}
+                continue
+        else:
+            if not accepting:
+                results[name] = {'error': 'No exception raised.'}
+                continue
+        if not accepting:
+            statement = RAISING_TEMPLATE.format(statement)
+        timer = timeit.Timer(statement, globals=NAMESPACE)
+        number, best = timer.autorange()
+        if repeat > 1:
+            best = min([best] + timer.repeat(repeat=repeat - 1, number=number))
+        results[name] = {'ns_per_call': best / number * 1e9}
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Compares results against a baseline, returning the regressed cases.
+
+    Returns a list of (case name, baseline ns per call, new ns per call)
+    tuples for all cases slower than the baseline by more than the tolerance
+    (as a fraction, e.g. 0.1 for 10%).
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        old = baseline.get(name, {}).get('ns_per_call')
+        new = result.get('ns_per_call')
+        if old is not None and new is not None and new > old * (
+                1 + tolerance):
+            regressions.append((name, old, new))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmarks of the rangeforce module.')
+    parser.add_argument('--output', '-o', default='-',
+                        help='JSON file to write the results into, '
+                             '"-" for stdout (default)')
+    parser.add_argument('--baseline', '-b',
+                        help='JSON results file to compare against')
+    parser.add_argument('--tolerance', '-t', type=float, default=0.1,
+                        help='accepted slowdown against the baseline as a '
+                             'fraction (default: 0.1)')
+    parser.add_argument('--filter', '-f', default='',
+                        help='run only the cases containing this substring')
+    parser.add_argument('--repeat', '-r', type=int, default=5,
+                        help='repetitions per case, best one is kept '
+                             '(default: 5)')
+    args = parser.parse_args(argv)
+    cases = [case for case in CASES if args.filter in case[0]]
+    report = {
+        'rangeforce': rf.__VERSION__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'results': run(cases, repeat=args.repeat),
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w') as file:
+            file.write(text + '\n')
+    for name, result in sorted(report['results'].items()):
+        if 'error' in result:
+            print('{:} errored: {:}'.format(name, result['error']),
+                  file=sys.stderr)
+    if args.baseline is None:
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)['results']
+    regressions = compare(report['results'], baseline, args.tolerance)
+    for name, old, new in regressions:
+        print('{:} regressed: {:.0f} ns -> {:.0f} ns (+{:.0%})'.format(
+            name, old, new, new / old - 1), file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -26,10 +26,37 @@ For example:
         found instead.
 """
 
+import array as _array
+import bisect
+import builtins
+import functools
+import itertools
 import math
+import mmap
+import operator
+import os
+import struct
+import sys
+import time
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 __VERSION__ = '1.1.0'
 
+_FIXED_WIDTH_BOUNDS = {
+    'uint8': (0, 0xFF),
+    'uint16': (0, 0xFFFF),
+    'uint32': (0, 0xFFFFFFFF),
+    'uint64': (0, 0xFFFFFFFFFFFFFFFF),
+    'int8': (-0x80, 0x7F),
+    'int16': (-0x8000, 0x7FFF),
+    'int32': (-0x80000000, 0x7FFFFFFF),
+    'int64': (-0x8000000000000000, 0x7FFFFFFFFFFFFFFF),
+}
+
 
 class RangeError(Exception):
     """Value outside of the allowed range.
@@ -37,8 +64,113 @@ class RangeError(Exception):
     A custom exception type raised by Rangeforce functions when the validation
     of the values fails, that is when the values are not within the acceptable
     bounds.
+
+    When raised by Rangeforce, the exception carries the details of the
+    failure as attributes and the error message is formatted only when
+    actually requested with str() or args, so rejecting values is cheap when
+    the exception is caught and discarded. It can still be constructed with
+    any positional arguments, as any other exception, and the details are
+    given as keyword-only arguments. Subclasses with their own constructor
+    are raised with the formatted message as only argument instead.
+
+    Attributes:
+        name: name of the value that appears in the error message
+        value: the invalid value (or length, for length checks)
+        min: smallest acceptable value, None if unbounded. Equal to the
+             expected value for exact checks.
+        max: greatest acceptable value, None if unbounded. Equal to the
+             expected value for exact checks.
+        kind: type of check that failed: 'range', 'exact', 'length',
+              'exact_length', 'intervals', 'domain' or None if constructed
+              from a message. For 'intervals' checks, min and max are the
+              nearest allowed (min, max) intervals below and above the value,
+              None if there is none. For 'domain' checks, min is the sorted
+              tuple of allowed values and max is None.
     """
-    pass
+
+    def __init__(self, *args, name=None, value=None, min=None, max=None,
+                 kind=None):
+        # Exception.__init__() is not called: without positional arguments,
+        # the message is built lazily from the details.
+        self._args = args
+        self.name = name
+        self.value = value
+        self.min = min
+        self.max = max
+        self.kind = kind
+
+    @property
+    def message(self):
+        args = self.args
+        return args[0] if args else None
+
+    @property
+    def args(self):
+        if not self._args and self.kind is not None:
+            self._args = (_format_message(self.kind, self.name, self.value,
+                                          self.min, self.max),)
+        return self._args
+
+    @args.setter
+    def args(self, args):
+        self._args = tuple(args)
+        self.kind = None
+
+    def __str__(self):
+        args = self.args
+        if len(args) > 1:
+            return str(args)
+        return str(args[0]) if args else ''
+
+    def __repr__(self):
+        return '{:}({:})'.format(type(self).__name__,
+                                 ', '.join(map(repr, self.args)))
+
+    def __reduce__(self):
+        return type(self), self._args, {
+            'name': self.name, 'value': self.value, 'min': self.min,
+            'max': self.max, 'kind': self.kind}
+
+
+_MESSAGE_TEMPLATES = {
+    'range': '{:} must be in range {:}. {:} found instead.',
+    'exact': '{:} must be exactly {:}. {:} found instead.',
+    'length': 'Length of {:} must be in range {:}. {:} found instead.',
+    'exact_length': 'Length of {:} must be exactly {:}. {:} found instead.',
+    'intervals': '{:} must be in one of the allowed ranges, the nearest '
+                 'being {:}. {:} found instead.',
+    'domain': '{:} must be one of {:}. {:} found instead.',
+}
+
+# Most allowed values listed in the messages of Domain.
+_DOMAIN_LISTED_VALUES = 8
+
+
+def _format_message(kind, name, value, min, max):
+    if kind in ('exact', 'exact_length'):
+        expected = 'NaN' if min != min else min
+    elif kind == 'intervals':
+        # The nearest allowed intervals below and above the value.
+        expected = ' and '.join(_interval_to_str(*interval)
+                                for interval in (min, max)
+                                if interval is not None)
+    elif kind == 'domain' and len(min) > _DOMAIN_LISTED_VALUES:
+        # The sorted allowed values, listed only if few.
+        expected = 'the {:} allowed values in {:}'.format(
+            len(min), _interval_to_str(min[0], min[-1]))
+    elif kind == 'domain':
+        expected = ', '.join(str(value) for value in min)
+    else:
+        expected = _interval_to_str(min, max)
+    return _MESSAGE_TEMPLATES[kind].format(name, expected, value)
+
+
+def _range_error(ex, kind, name, value, min, max):
+    # The exception to raise, with lazy formatting of the message if the
+    # exception type takes the details, i.e. uses the RangeError constructor.
+    if ex.__init__ is RangeError.__init__:
+        return ex(name=name, value=value, min=min, max=max, kind=kind)
+    return ex(_format_message(kind, name, value, min, max))
 
 
 def clip(value, min, max):
@@ -116,27 +248,14 @@ def exactly(value, expected, name='Value', dtype=None, ex=RangeError):
            >>> exactly(7.0, 7, name='Days in a week', ex=ValueError)
            ValueError: Days in a week must be exactly 7. 50 found instead.
     """
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(exactly, name, value, expected, name, dtype, ex)
     _validate_type(name, value, dtype)
-    try:
-        if math.isnan(expected):
-            if math.isnan(value):
-                # NaN is EQUAL to NaN for this function.
-                return value
-            else:
-                raise ex(
-                    '{:} must be exactly NaN. '
-                    '{:} found instead.'.format(name, value)
-                )
-    except TypeError:
-        # Suppress math.isnan() applied to non-floats and just go on.
-        pass
-    if value != expected:
-        raise ex(
-            '{:} must be exactly {:}. '
-            '{:} found instead.'.format(name, expected, value)
-        )
-    else:
+    # NaN is the only value not equal to itself: NaN equals NaN here.
+    if value == expected or (value != value and expected != expected):
         return value
+    raise _range_error(ex, 'exact', name, value, expected, expected)
 
 
 def limited(value, min, max, name='Value', dtype=None, ex=RangeError):
@@ -150,6 +269,11 @@ def limited(value, min, max, name='Value', dtype=None, ex=RangeError):
     the value only has to be smaller or greater than something, not within a
     closed interval.
 
+    Any ordered type is accepted: int (also beyond the float range), float,
+    Decimal, Fraction etc. NaN values, including Decimal ones, are never
+    within the range. The comparison is specialized per type of the value and
+    cached on first use.
+
     The name of the value can be altered for a customized error message.
 
     The data type can be enforced if specified.
@@ -197,36 +321,33 @@ def limited(value, min, max, name='Value', dtype=None, ex=RangeError):
             ValueError: Earth satellites must be in range [0, +inf[. -1 found
             instead.
     """
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(limited, name, value, min, max, name, dtype, ex)
     _validate_interval(min, max)
     _validate_type(name, value, dtype)
-    if min is None and max is not None and (value > max or math.isnan(value)):
-        raise ex(
-            '{:} must be in range ]-inf, {:}]. '
-            '{:} found instead.'.format(name, max, value)
-        )
-    elif max is None and min is not None and (
-            value < min or math.isnan(value)):
-        raise ex(
-            '{:} must be in range [{:}, +inf[. '
-            '{:} found instead.'.format(name, min, value)
-        )
-    elif min is not None and max is not None and (
-            value < min or value > max or math.isnan(value)):
-        raise ex(
-            '{:} must be in range [{:}, {:}]. '
-            '{:} found instead.'.format(name, min, max, value)
-        )
-    else:
+    try:
+        within = _WITHIN_BY_TYPE[type(value)]
+    except KeyError:
+        within = _cache_comparator(type(value))
+    if within is _within_ordered:
+        # Inlined, saving a call on the most common path.
+        if (min is None or min <= value) and (max is None or value <= max):
+            return value
+    elif within(value, min, max):
         return value
+    raise _range_error(ex, 'range', name, value, min, max)
 
 
 def _validate_interval(min, max):
     if min is None and max is None:
         raise ValueError(
             '[min, max] interval must be closed on at least one extreme.')
-    elif min is not None and math.isnan(min):
+    # NaN is the only value not equal to itself. Unlike math.isnan(), this
+    # needs no conversion to float, so it works for any type.
+    elif min is not None and min != min:
         raise ValueError('NaN is not a valid interval lower bound.')
-    elif max is not None and math.isnan(max):
+    elif max is not None and max != max:
         raise ValueError('NaN is not a valid interval upper bound.')
     elif min is not None and max is not None and min > max:
         raise ValueError(
@@ -242,6 +363,49 @@ def _validate_type(name, value, dtype):
         )
 
 
+def _within_ordered(value, min, max):
+    # Integers are never NaN. For floats, any comparison with NaN is False,
+    # so the positive form of the check rejects NaN values at no cost, as at
+    # least one of the extremes is not None.
+    return (min is None or min <= value) and (max is None or value <= max)
+
+
+def _within_decimal(value, min, max):
+    # Ordering comparisons signal InvalidOperation on Decimal NaNs.
+    return not value.is_nan() and _within_ordered(value, min, max)
+
+
+def _within_generic(value, min, max):
+    return value == value and _within_ordered(value, min, max)
+
+
+# Comparators specialized by type(value), populated on first use.
+_WITHIN_BY_TYPE = {int: _within_ordered, bool: _within_ordered,
+                   float: _within_ordered}
+
+
+def _cache_comparator(value_type):
+    decimal = sys.modules.get('decimal')
+    if decimal is not None and issubclass(value_type, decimal.Decimal):
+        comparator = _within_decimal
+    else:
+        # Anything else may be NaN-like or, for subclasses of int and float,
+        # override the comparison operators.
+        comparator = _within_generic
+    _WITHIN_BY_TYPE[value_type] = comparator
+    return comparator
+
+
+def _within(value, min, max):
+    # Fallback of the inlined chained comparisons, which raise
+    # InvalidOperation, an ArithmeticError, on Decimal NaNs.
+    try:
+        within = _WITHIN_BY_TYPE[type(value)]
+    except KeyError:
+        within = _cache_comparator(type(value))
+    return within(value, min, max)
+
+
 def negative_int(value, name='Value', ex=RangeError):
     """Validates that value is negative (< 0) and of type int.
 
@@ -262,7 +426,10 @@ def negative_int(value, name='Value', ex=RangeError):
                                 range.
         TypeError: if the value is not an integer.
     """
-    return limited(value, None, -1, name, dtype=int, ex=ex)
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(negative_int, name, value, name, ex)
+    return _limited_int(value, None, -1, name, ex)
 
 
 def nonpositive_int(value, name='Value', ex=RangeError):
@@ -285,7 +452,10 @@ def nonpositive_int(value, name='Value', ex=RangeError):
                                 range.
         TypeError: if the value is not an integer.
     """
-    return limited(value, None, 0, name, dtype=int, ex=ex)
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(nonpositive_int, name, value, name, ex)
+    return _limited_int(value, None, 0, name, ex)
 
 
 def positive_int(value, name='Value', ex=RangeError):
@@ -308,7 +478,10 @@ def positive_int(value, name='Value', ex=RangeError):
                                 range.
         TypeError: if the value is not an integer.
     """
-    return limited(value, 1, None, name, dtype=int, ex=ex)
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(positive_int, name, value, name, ex)
+    return _limited_int(value, 1, None, name, ex)
 
 
 def nonnegative_int(value, name='Value', ex=RangeError):
@@ -331,7 +504,10 @@ def nonnegative_int(value, name='Value', ex=RangeError):
                                 range.
         TypeError: if the value is not an integer.
     """
-    return limited(value, 0, None, name, dtype=int, ex=ex)
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(nonnegative_int, name, value, name, ex)
+    return _limited_int(value, 0, None, name, ex)
 
 
 def uint8(value, name='Value', ex=RangeError):
@@ -354,7 +530,10 @@ def uint8(value, name='Value', ex=RangeError):
                                 range.
         TypeError: if the value is not an integer.
     """
-    return limited(value, 0, 0xFF, name, dtype=int, ex=ex)
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(uint8, name, value, name, ex)
+    return _limited_int(value, 0, 0xFF, name, ex)
 
 
 def uint16(value, name='Value', ex=RangeError):
@@ -377,7 +556,10 @@ def uint16(value, name='Value', ex=RangeError):
                                 range.
         TypeError: if the value is not an integer.
     """
-    return limited(value, 0, 0xFFFF, name, dtype=int, ex=ex)
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(uint16, name, value, name, ex)
+    return _limited_int(value, 0, 0xFFFF, name, ex)
 
 
 def uint32(value, name='Value', ex=RangeError):
@@ -400,7 +582,10 @@ def uint32(value, name='Value', ex=RangeError):
                                 range.
         TypeError: if the value is not an integer.
     """
-    return limited(value, 0, 0xFFFFFFFF, name, dtype=int, ex=ex)
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(uint32, name, value, name, ex)
+    return _limited_int(value, 0, 0xFFFFFFFF, name, ex)
 
 
 def uint64(value, name='Value', ex=RangeError):
@@ -423,7 +608,10 @@ def uint64(value, name='Value', ex=RangeError):
                                 range.
         TypeError: if the value is not an integer.
     """
-    return limited(value, 0, 0xFFFFFFFFFFFFFFFF, name, dtype=int, ex=ex)
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(uint64, name, value, name, ex)
+    return _limited_int(value, 0, 0xFFFFFFFFFFFFFFFF, name, ex)
 
 
 def uint_bits(value, bits, name='Value', ex=RangeError):
@@ -449,7 +637,14 @@ def uint_bits(value, bits, name='Value', ex=RangeError):
                                 range.
         TypeError: if the value is not an integer.
     """
-    return limited(value, 0, (1 << bits) - 1, name, dtype=int, ex=ex)
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(uint_bits, name, value, bits, name, ex)
+    if not isinstance(value, int):
+        _validate_type(name, value, int)
+    if value >= 0 and value.bit_length() <= bits:
+        return value
+    return _limited_int(value, 0, (1 << bits) - 1, name, ex)
 
 
 def int8(value, name='Value', ex=RangeError):
@@ -472,7 +667,10 @@ def int8(value, name='Value', ex=RangeError):
                                 range.
         TypeError: if the value is not an integer.
     """
-    return limited(value, -0x80, 0x7F, name, dtype=int, ex=ex)
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(int8, name, value, name, ex)
+    return _limited_int(value, -0x80, 0x7F, name, ex)
 
 
 def int16(value, name='Value', ex=RangeError):
@@ -495,7 +693,10 @@ def int16(value, name='Value', ex=RangeError):
                                 range.
         TypeError: if the value is not an integer.
     """
-    return limited(value, -0x8000, 0x7FFF, name, dtype=int, ex=ex)
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(int16, name, value, name, ex)
+    return _limited_int(value, -0x8000, 0x7FFF, name, ex)
 
 
 def int32(value, name='Value', ex=RangeError):
@@ -518,7 +719,10 @@ def int32(value, name='Value', ex=RangeError):
                                 range.
         TypeError: if the value is not an integer.
     """
-    return limited(value, -0x80000000, 0x7FFFFFFF, name, dtype=int, ex=ex)
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(int32, name, value, name, ex)
+    return _limited_int(value, -0x80000000, 0x7FFFFFFF, name, ex)
 
 
 def int64(value, name='Value', ex=RangeError):
@@ -542,8 +746,38 @@ def int64(value, name='Value', ex=RangeError):
                                 range.
         TypeError: if the value is not an integer.
     """
-    return limited(value, -0x8000000000000000, 0x7FFFFFFFFFFFFFFF, name,
-                   dtype=int, ex=ex)
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(int64, name, value, name, ex)
+    return _limited_int(value, -0x8000000000000000, 0x7FFFFFFFFFFFFFFF, name,
+                        ex)
+
+
+def _limited_int(value, min, max, name, ex):
+    # Integer-only variant of limited() for the helpers above: no NaN checks
+    # and no interval validation, as the bounds are known to be valid
+    # integers. Also works with integers beyond the float range.
+    if not isinstance(value, int):
+        _validate_type(name, value, int)
+    if (min is None or value >= min) and (max is None or value <= max):
+        return value
+    raise _range_error(ex, 'range', name, value, min, max)
+
+
+_INTEGER_HELPER_BOUNDS = {
+    negative_int: (None, -1),
+    nonpositive_int: (None, 0),
+    positive_int: (1, None),
+    nonnegative_int: (0, None),
+    uint8: _FIXED_WIDTH_BOUNDS['uint8'],
+    uint16: _FIXED_WIDTH_BOUNDS['uint16'],
+    uint32: _FIXED_WIDTH_BOUNDS['uint32'],
+    uint64: _FIXED_WIDTH_BOUNDS['uint64'],
+    int8: _FIXED_WIDTH_BOUNDS['int8'],
+    int16: _FIXED_WIDTH_BOUNDS['int16'],
+    int32: _FIXED_WIDTH_BOUNDS['int32'],
+    int64: _FIXED_WIDTH_BOUNDS['int64'],
+}
 
 
 def limited_len(sized, min, max, name='value', ex=RangeError):
@@ -597,8 +831,15 @@ def limited_len(sized, min, max, name='value', ex=RangeError):
             ValueError: Length of value must be in range [10, 20]. 3 found
             instead.
     """
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(limited_len, name, sized, min, max, name, ex)
     _validate_non_negative_interval_extremes(min, max)
-    limited(len(sized), min, max, name='Length of ' + name, ex=ex)
+    length = len(sized)
+    _validate_interval(min, max)
+    if ((min is not None and length < min)
+            or (max is not None and length > max)):
+        raise _range_error(ex, 'length', name, length, min, max)
     return sized
 
 
@@ -655,13 +896,14 @@ def exact_len(sized, expected, name='value', ex=RangeError):
             >>> exact_len([1], 2, name='pairs', ex=ValueError)
             ValueError: Length of pairs must be exactly 2. 1 found instead.
     """
+    stats = _stats
+    if stats is not None and not stats.busy:
+        return stats.measure(exact_len, name, sized, expected, name, ex)
     length = len(sized)
     _validate_expected_length(expected)
     if length != expected:
-        raise ex(
-            'Length of {:} must be exactly {:}. '
-            '{:} found instead.'.format(name, expected, length)
-        )
+        raise _range_error(ex, 'exact_length', name, length, expected,
+                           expected)
     return sized
 
 
@@ -676,3 +918,3352 @@ def _validate_expected_length(expected):
             'Expected length must be non-negative. '
             '{:} found instead.'.format(expected)
         )
+
+
+def limited_count(iterable, min, max, name='value', ex=RangeError):
+    """Validates that an iterable yields a number of items within the
+    [min, max] interval, consuming it only as far as needed.
+
+    Counterpart of limited_len() for iterators and generators, which have no
+    length: at most max + 1 items are consumed and kept in memory, so
+    oversized inputs are rejected as soon as they exceed the maximum, without
+    materializing them.
+
+    If the iterable is valid, the consumed items are returned, so they can
+    still be processed without a second pass over the input: a list of all
+    items if max is given, otherwise an iterator chaining the consumed items
+    with the rest of the iterable. Like any iterator, the latter can be
+    iterated only once: wrap it in list() or itertools.tee() if the items are
+    needed more than once.
+
+    Args:
+        iterable: the iterable whose items are to be counted
+        min: smallest acceptable number of items. Can be None if max is not
+             None. Must be <= max and >= 0.
+        max: greatest acceptable number of items. Can be None if min is not
+             None. Must be >= min and >= 0.
+        name: customizable name of the iterable that appears in the error
+              message
+        ex: exception type to throw in case the count is out of range
+
+    Returns:
+        a list of all items if max is given, otherwise a single-pass iterator
+        over all items
+
+    Raises:
+        RangeError or type(ex): if the number of items is not within the
+                                acceptable range.
+        ValueError: if the min, max extremes are not valid (e.g. negative,
+                    both None, min greater than max, NaN etc.)
+
+    Examples:
+            >>> limited_count((x for x in range(3)), 0, 10)
+            [0, 1, 2]
+            >>> limited_count(itertools.count(), 0, 10, name='upload')
+            rangeforce.RangeError: Length of upload must be in range [0,
+            10]. More than 10 found instead.
+    """
+    _validate_non_negative_interval_extremes(min, max)
+    _validate_interval(min, max)
+    iterator = iter(iterable)
+    if max is None or max == math.inf:
+        if min is None:
+            return iterator
+        elif min == math.inf:
+            items = list(iterator)
+        else:
+            items = list(itertools.islice(iterator, math.ceil(min)))
+        if len(items) < min:
+            raise _range_error(ex, 'length', name, len(items), min, max)
+        return itertools.chain(items, iterator)
+    items = list(itertools.islice(iterator, int(max) + 1))
+    if len(items) > max:
+        message = ('Length of {:} must be in range {:}. More than {:} found '
+                   'instead.'.format(name, _interval_to_str(min, max), max))
+        if ex.__init__ is RangeError.__init__:
+            raise ex(message, name=name, value=len(items), min=min, max=max,
+                     kind='length')
+        raise ex(message)
+    elif min is not None and len(items) < min:
+        raise _range_error(ex, 'length', name, len(items), min, max)
+    return items
+
+
+def limited_lens(items, min, max, name='value', offsets=False,
+                 ex=RangeError):
+    """Validates that each of many sized values has a length within the
+    [min, max] interval.
+
+    Batched counterpart of limited_len(), for collections of many short
+    values such as byte strings or packets: the interval is validated once
+    and all lengths are checked with min() and max() reductions, locating the
+    first offending item only on failure.
+
+    The lengths can also be given as an offsets array, as in the variable
+    length layouts of Apache Arrow: item i spans from offsets[i] to
+    offsets[i + 1], so N + 1 offsets describe N items. NumPy arrays of
+    offsets are processed with vectorized operations.
+
+    If any length is not valid, it raises an exception with the same
+    understandable error message limited_len() would raise for the first
+    offending item, with its index appended to the name.
+
+    Args:
+        items: sequence of sized values or, if offsets is true, of offsets
+        min: smallest acceptable length. Can be None if max is not None.
+             Must be <= max and >= 0.
+        max: greatest acceptable length. Can be None if min is not None.
+             Must be >= min and >= 0.
+        name: customizable name of the values that appears in the error
+              message
+        offsets: whether items are offsets rather than sized values
+        ex: exception type to throw in case a length is out of range
+
+    Returns:
+        the given items if all lengths are within [min, max]
+
+    Raises:
+        RangeError or type(ex): if any length is not within the acceptable
+                                range.
+        ValueError: if the min, max extremes are not valid (e.g. negative,
+                    both None, min greater than max, NaN etc.) or the
+                    offsets decrease.
+
+    Examples:
+            >>> limited_lens([b'ab', b'', b'abcd'], 0, 3, name='packet')
+            rangeforce.RangeError: Length of packet[2] must be in range [0,
+            3]. 4 found instead.
+            >>> limited_lens([0, 2, 2, 6], 0, 3, offsets=True)
+            rangeforce.RangeError: Length of value[2] must be in range [0,
+            3]. 4 found instead.
+    """
+    _validate_non_negative_interval_extremes(min, max)
+    _validate_interval(min, max)
+    lengths = _item_lengths(items, offsets)
+    if not len(lengths):
+        return items
+    lowest, highest = _min_max(lengths)
+    # Lengths are never negative, unless decreasing offsets are given.
+    lower = 0 if min is None else min
+    if lowest >= lower and (max is None or highest <= max):
+        return items
+    for index, length in enumerate(lengths):
+        if length < 0:
+            _reject_decreasing_offset(items, index)
+        elif ((min is not None and length < min)
+                or (max is not None and length > max)):
+            raise _range_error(ex, 'length', _indexed_name(name, index),
+                               int(length), min, max)
+    return items
+
+
+def exact_lens(items, expected, name='value', offsets=False, ex=RangeError):
+    """Validates that each of many sized values has an exact length.
+
+    Batched counterpart of exact_len(), checking all lengths in a single
+    pass. The lengths can be given as an offsets array as in limited_lens().
+    The expected length is either the same for all items or given per item.
+
+    If any length is not valid, it raises an exception with the same
+    understandable error message exact_len() would raise for the first
+    offending item, with its index appended to the name.
+
+    Args:
+        items: sequence of sized values or, if offsets is true, of offsets
+        expected: only acceptable length, an integer >= 0, or a sequence of
+                  the expected lengths of each item
+        name: customizable name of the values that appears in the error
+              message
+        offsets: whether items are offsets rather than sized values
+        ex: exception type to throw in case a length does not match
+
+    Returns:
+        the given items if all lengths match the expected
+
+    Raises:
+        RangeError or type(ex): if any length does not match the expected.
+        TypeError: if the expected length is not an integer
+        ValueError: if the expected length is negative or the offsets
+                    decrease.
+
+    Examples:
+            >>> exact_lens([b'ab', b'cd', b'e'], 2, name='pair')
+            rangeforce.RangeError: Length of pair[2] must be exactly 2. 1
+            found instead.
+            >>> exact_lens([b'ab', b'cde'], [2, 4])
+            rangeforce.RangeError: Length of value[1] must be exactly 4. 3
+            found instead.
+    """
+    lengths = _item_lengths(items, offsets)
+    if isinstance(expected, int):
+        _validate_expected_length(expected)
+        if not len(lengths) or _min_max(lengths) == (expected, expected):
+            return items
+        expected = itertools.repeat(expected)
+    else:
+        # NumPy and array.array sequences are converted to Python ints.
+        expected = (expected.tolist() if hasattr(expected, 'tolist')
+                    else list(expected))
+        for expected_length in expected:
+            _validate_expected_length(expected_length)
+        if len(expected) != len(lengths):
+            exact_len(expected, len(lengths), name='expected lengths',
+                      ex=ValueError)
+        if list(lengths) == expected:
+            return items
+    for index, (length, expected_length) in enumerate(zip(lengths,
+                                                          expected)):
+        if length < 0:
+            _reject_decreasing_offset(items, index)
+        elif length != expected_length:
+            raise _range_error(ex, 'exact_length', _indexed_name(name, index),
+                               int(length), expected_length, expected_length)
+    return items
+
+
+def _item_lengths(items, offsets):
+    if not offsets:
+        return list(map(len, items))
+    elif numpy is not None and isinstance(items, numpy.ndarray):
+        return numpy.diff(items)
+    return list(map(operator.sub, itertools.islice(items, 1, None), items))
+
+
+def _reject_decreasing_offset(offsets, index):
+    raise ValueError(
+        'Offsets must not decrease. {:} followed by {:} found at index '
+        '{:}.'.format(offsets[index], offsets[index + 1], index + 1)
+    )
+
+
+def _min_max(values):
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        return values.min(), values.max()
+    return builtins.min(values), builtins.max(values)
+
+
+def limited_array(array, min, max, name='Value', dtype=None, ex=RangeError):
+    """Validates that all elements of an array are within the [min, max]
+    interval.
+
+    The vectorized counterpart of limited(): the whole array is checked with
+    a few NumPy reductions instead of one Python-level call per element.
+    Requires NumPy.
+
+    If the array is valid, it returns the array itself (converted to a NumPy
+    array if it was not one already).
+    If any element is not valid, it raises an exception with the same
+    understandable error message limited() would raise for the first
+    offending element, with its index appended to the name.
+
+    Args:
+        array: the array-like whose elements are to be validated to be within
+               [min, max]
+        min: smallest acceptable value. Can be None if max is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be <= max.
+        max: greatest acceptable value. Can be None if min is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be >= min.
+        name: customizable name of the array that appears in the error
+              message
+        dtype: optional data type the elements have to be, either a NumPy
+               dtype or one of the Python types int, float, complex, bool
+        ex: exception type to throw in case a value is out of range
+
+    Returns:
+        the given array if all elements are within [min, max] and,
+        optionally, of the correct data type
+
+    Raises:
+        RangeError or type(ex): if any element is not within the acceptable
+                                range.
+        TypeError: if the elements are not of the acceptable data type, if
+                   specified.
+        ValueError: if the min, max extremes are not valid (e.g. both None,
+                    min greater than max, NaN etc.)
+        ImportError: if NumPy is not installed.
+
+    Examples:
+            >>> limited_array(numpy.array([0.5, 0.1]), 0, 1)  # Valid array
+            array([0.5, 0.1])
+            >>> limited_array([3, 500, 7], 0.1, 42)
+            rangeforce.RangeError: Value[1] must be in range [0.1, 42]. 500
+            found instead.
+            >>> limited_array([[1, 2], [3, 40]], 0, 24, name='Hours')
+            rangeforce.RangeError: Hours[1, 1] must be in range [0, 24]. 40
+            found instead.
+    """
+    _validate_interval(min, max)
+    array = _as_ndarray(array)
+    _validate_array_type(name, array, dtype)
+    if array.size == 0:
+        return array
+    # Fast path: two reductions. NaN propagates through min() and max(),
+    # failing the comparisons and falling through to the detailed scan.
+    if ((min is None or array.min() >= min)
+            and (max is None or array.max() <= max)):
+        return array
+    valid = numpy.ones(array.shape, dtype=bool)
+    if min is not None:
+        valid &= array >= min
+    if max is not None:
+        valid &= array <= max
+    index = numpy.unravel_index(numpy.argmin(valid), array.shape)
+    # Delegate to the scalar function for the usual error message.
+    limited(array[index].item(), min, max, _indexed_name(name, index),
+            ex=ex)
+    return array
+
+
+def _as_ndarray(array):
+    if numpy is None:
+        raise ImportError('NumPy is required for array validation.')
+    return numpy.asarray(array)
+
+
+_NUMPY_TYPE_KINDS = {
+    int: 'integer',
+    float: 'floating',
+    complex: 'complexfloating',
+    bool: 'bool_',
+}
+
+
+def _validate_array_type(name, array, dtype):
+    if dtype is None:
+        return
+    numpy_type = getattr(numpy, _NUMPY_TYPE_KINDS.get(dtype, ''), dtype)
+    if not numpy.issubdtype(array.dtype, numpy_type):
+        raise TypeError(
+            '{:} must be of type {:}. '
+            '{:} found instead.'.format(name,
+                                        getattr(dtype, '__name__', dtype),
+                                        array.dtype.name)
+        )
+
+
+def _indexed_name(name, index):
+    if isinstance(index, tuple):
+        index = ', '.join(str(i) for i in index)
+    return '{:}[{:}]'.format(name, index)
+
+
+def uint8_array(array, name='Value', ex=RangeError):
+    """Validates that all elements of an array fit in 8-bit unsigned integers.
+
+    Array counterpart of uint8(), see limited_array() for details.
+    """
+    return limited_array(array, *_FIXED_WIDTH_BOUNDS['uint8'], name=name,
+                         dtype=int, ex=ex)
+
+
+def uint16_array(array, name='Value', ex=RangeError):
+    """Validates that all elements of an array fit in 16-bit unsigned
+    integers.
+
+    Array counterpart of uint16(), see limited_array() for details.
+    """
+    return limited_array(array, *_FIXED_WIDTH_BOUNDS['uint16'], name=name,
+                         dtype=int, ex=ex)
+
+
+def uint32_array(array, name='Value', ex=RangeError):
+    """Validates that all elements of an array fit in 32-bit unsigned
+    integers.
+
+    Array counterpart of uint32(), see limited_array() for details.
+    """
+    return limited_array(array, *_FIXED_WIDTH_BOUNDS['uint32'], name=name,
+                         dtype=int, ex=ex)
+
+
+def uint64_array(array, name='Value', ex=RangeError):
+    """Validates that all elements of an array fit in 64-bit unsigned
+    integers.
+
+    Array counterpart of uint64(), see limited_array() for details.
+    """
+    return limited_array(array, *_FIXED_WIDTH_BOUNDS['uint64'], name=name,
+                         dtype=int, ex=ex)
+
+
+def uint_bits_array(array, bits, name='Value', ex=RangeError):
+    """Validates that all elements of an array fit in unsigned integers of
+    specified bitlength.
+
+    Array counterpart of uint_bits(), see limited_array() for details.
+    """
+    return limited_array(array, 0, (1 << bits) - 1, name=name, dtype=int,
+                         ex=ex)
+
+
+def int8_array(array, name='Value', ex=RangeError):
+    """Validates that all elements of an array fit in 8-bit signed integers.
+
+    Array counterpart of int8(), see limited_array() for details.
+    """
+    return limited_array(array, *_FIXED_WIDTH_BOUNDS['int8'], name=name,
+                         dtype=int, ex=ex)
+
+
+def int16_array(array, name='Value', ex=RangeError):
+    """Validates that all elements of an array fit in 16-bit signed integers.
+
+    Array counterpart of int16(), see limited_array() for details.
+    """
+    return limited_array(array, *_FIXED_WIDTH_BOUNDS['int16'], name=name,
+                         dtype=int, ex=ex)
+
+
+def int32_array(array, name='Value', ex=RangeError):
+    """Validates that all elements of an array fit in 32-bit signed integers.
+
+    Array counterpart of int32(), see limited_array() for details.
+    """
+    return limited_array(array, *_FIXED_WIDTH_BOUNDS['int32'], name=name,
+                         dtype=int, ex=ex)
+
+
+def int64_array(array, name='Value', ex=RangeError):
+    """Validates that all elements of an array fit in 64-bit signed integers.
+
+    Array counterpart of int64(), see limited_array() for details.
+    """
+    return limited_array(array, *_FIXED_WIDTH_BOUNDS['int64'], name=name,
+                         dtype=int, ex=ex)
+
+
+class Validator(object):
+    """Reusable, precompiled range check with the semantics of limited().
+
+    The [min, max] interval is validated and the range part of the error
+    message is formatted only once, at construction time. Calling the
+    validator then costs little more than the bare comparisons, which makes
+    it the preferred choice for checks with constant bounds executed in hot
+    code paths.
+
+    Unbounded extremes (None) are replaced internally by -inf and +inf, so
+    closed and half-open intervals are checked with the same single chained
+    comparison, which also rejects NaN.
+
+    Args:
+        min: smallest acceptable value. Can be None if max is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be <= max.
+        max: greatest acceptable value. Can be None if min is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be >= min.
+        name: customizable name of the value that appears in the error message
+        dtype: optional data type the value has to be
+        ex: exception type to throw in case the value is out of range
+
+    Raises:
+        ValueError: if the min, max extremes are not valid (e.g. both None,
+                    min greater than max, NaN etc.)
+
+    Examples:
+            >>> hours = Validator(0, 24, name='Hours of sleep', dtype=int)
+            >>> hours(8)
+            8
+            >>> hours(25)
+            rangeforce.RangeError: Hours of sleep must be in range [0, 24].
+            25 found instead.
+            >>> Validator.uint16()(70000)
+            rangeforce.RangeError: Value must be in range [0, 65535]. 70000
+            found instead.
+    """
+    __slots__ = ('min', 'max', 'name', 'dtype', 'ex',
+                 '_lower', '_upper', '_interval', '_prefix')
+
+    def __init__(self, min, max, name='Value', dtype=None, ex=RangeError):
+        _validate_interval(min, max)
+        self.min = min
+        self.max = max
+        self.name = name
+        self.dtype = dtype
+        self.ex = ex
+        self._lower = -math.inf if min is None else min
+        self._upper = math.inf if max is None else max
+        self._interval = _interval_to_str(min, max)
+        self._prefix = '{:} must be in range {:}. '.format(name,
+                                                           self._interval)
+
+    def __call__(self, value):
+        """Validates that value is within the [min, max] interval.
+
+        Args:
+            value: the value to be validated to be within [min, max]
+
+        Returns:
+            the given value if within [min, max] and, optionally, of the
+            correct data type
+
+        Raises:
+            RangeError or type(ex): if the value is not within the acceptable
+                                    range.
+            TypeError: if the value is not of the acceptable data type, if
+                       specified.
+        """
+        try:
+            if ((self.dtype is None or isinstance(value, self.dtype))
+                    and self._lower <= value <= self._upper):
+                return value
+        except ArithmeticError:
+            if _within(value, self._lower, self._upper):
+                return value
+        self._reject(value)
+
+    def __contains__(self, value):
+        try:
+            return self._lower <= value <= self._upper
+        except ArithmeticError:
+            return _within(value, self._lower, self._upper)
+
+    def __repr__(self):
+        return '{:}({!r}, {!r}, name={!r}, dtype={:}, ex={:})'.format(
+            type(self).__name__, self.min, self.max, self.name,
+            getattr(self.dtype, '__name__', self.dtype), self.ex.__name__)
+
+    def _reject(self, value, name=None):
+        if name is None:
+            name = self.name
+        _validate_type(name, value, self.dtype)
+        if self.ex.__init__ is RangeError.__init__:
+            raise self.ex(name=name, value=value, min=self.min, max=self.max,
+                          kind='range')
+        elif name is self.name:
+            prefix = self._prefix
+        else:
+            prefix = '{:} must be in range {:}. '.format(name, self._interval)
+        raise self.ex(prefix + '{:} found instead.'.format(value))
+
+    @classmethod
+    def uint8(cls, name='Value', ex=RangeError):
+        """Validator with the bounds of uint8()."""
+        return cls(*_FIXED_WIDTH_BOUNDS['uint8'], name=name, dtype=int, ex=ex)
+
+    @classmethod
+    def uint16(cls, name='Value', ex=RangeError):
+        """Validator with the bounds of uint16()."""
+        return cls(*_FIXED_WIDTH_BOUNDS['uint16'], name=name, dtype=int,
+                   ex=ex)
+
+    @classmethod
+    def uint32(cls, name='Value', ex=RangeError):
+        """Validator with the bounds of uint32()."""
+        return cls(*_FIXED_WIDTH_BOUNDS['uint32'], name=name, dtype=int,
+                   ex=ex)
+
+    @classmethod
+    def uint64(cls, name='Value', ex=RangeError):
+        """Validator with the bounds of uint64()."""
+        return cls(*_FIXED_WIDTH_BOUNDS['uint64'], name=name, dtype=int,
+                   ex=ex)
+
+    @classmethod
+    def uint_bits(cls, bits, name='Value', ex=RangeError):
+        """Validator with the bounds of uint_bits()."""
+        return cls(0, (1 << bits) - 1, name=name, dtype=int, ex=ex)
+
+    @classmethod
+    def int8(cls, name='Value', ex=RangeError):
+        """Validator with the bounds of int8()."""
+        return cls(*_FIXED_WIDTH_BOUNDS['int8'], name=name, dtype=int, ex=ex)
+
+    @classmethod
+    def int16(cls, name='Value', ex=RangeError):
+        """Validator with the bounds of int16()."""
+        return cls(*_FIXED_WIDTH_BOUNDS['int16'], name=name, dtype=int, ex=ex)
+
+    @classmethod
+    def int32(cls, name='Value', ex=RangeError):
+        """Validator with the bounds of int32()."""
+        return cls(*_FIXED_WIDTH_BOUNDS['int32'], name=name, dtype=int, ex=ex)
+
+    @classmethod
+    def int64(cls, name='Value', ex=RangeError):
+        """Validator with the bounds of int64()."""
+        return cls(*_FIXED_WIDTH_BOUNDS['int64'], name=name, dtype=int, ex=ex)
+
+
+def _interval_to_str(min, max):
+    if min is None:
+        return ']-inf, {:}]'.format(max)
+    elif max is None:
+        return '[{:}, +inf['.format(min)
+    else:
+        return '[{:}, {:}]'.format(min, max)
+
+
+class IntervalSet(object):
+    """Validator of values that must be in any of many [min, max] intervals.
+
+    The intervals are validated, sorted and merged where they overlap once,
+    at construction time. Each check then costs a binary search (bisect) on
+    the sorted lower extremes, O(log n) in the amount of intervals, instead
+    of one limited() call per interval. Whole arrays are checked with
+    numpy.searchsorted() when NumPy is available.
+
+    On failure, the RangeError reports the nearest allowed intervals below
+    and above the value as its min and max attributes.
+
+    Can be used as field specification of RecordValidator and checked().
+
+    Args:
+        intervals: iterable of (min, max) pairs with the semantics of the
+                   limited() extremes. Only the lowest min and the highest
+                   max can be None, for unbounded intervals.
+        name: customizable name of the value that appears in the error message
+        dtype: optional data type the value has to be
+        ex: exception type to throw in case the value is out of the intervals
+
+    Raises:
+        ValueError: if no intervals are given or any of the min, max extremes
+                    are not valid (e.g. both None, min greater than max, NaN
+                    etc.)
+
+    Examples:
+            >>> ports = IntervalSet([(20, 23), (80, 80), (443, 443),
+            ...                      (8000, 8999)], name='Port', dtype=int)
+            >>> ports(8080)
+            8080
+            >>> ports(100)
+            rangeforce.RangeError: Port must be in one of the allowed ranges,
+            the nearest being [80, 80] and [443, 443]. 100 found instead.
+    """
+    __slots__ = ('intervals', 'name', 'dtype', 'ex', '_lowers', '_uppers')
+
+    def __init__(self, intervals, name='Value', dtype=None, ex=RangeError):
+        bounded = []
+        for min, max in intervals:
+            _validate_interval(min, max)
+            bounded.append((-math.inf if min is None else min,
+                            math.inf if max is None else max))
+        if not bounded:
+            raise ValueError('At least one interval is required.')
+        bounded.sort()
+        lowers = [bounded[0][0]]
+        uppers = [bounded[0][1]]
+        for lower, upper in bounded[1:]:
+            if lower <= uppers[-1]:
+                uppers[-1] = builtins.max(uppers[-1], upper)
+            else:
+                lowers.append(lower)
+                uppers.append(upper)
+        self._lowers = lowers
+        self._uppers = uppers
+        self.intervals = tuple(
+            (None if lower == -math.inf else lower,
+             None if upper == math.inf else upper)
+            for lower, upper in zip(lowers, uppers))
+        self.name = name
+        self.dtype = dtype
+        self.ex = ex
+
+    def __call__(self, value, name=None):
+        """Validates that value is within any of the intervals.
+
+        Args:
+            value: the value to be validated
+            name: name of the value in the error message, overriding the one
+                  given at construction
+
+        Returns:
+            the given value if within any of the intervals and, optionally,
+            of the correct data type
+
+        Raises:
+            RangeError or type(ex): if the value is not within any of the
+                                    intervals.
+            TypeError: if the value is not of the acceptable data type, if
+                       specified.
+        """
+        if ((self.dtype is None or isinstance(value, self.dtype))
+                and value in self):
+            return value
+        self._reject(value, name)
+
+    def __contains__(self, value):
+        try:
+            index = bisect.bisect_right(self._lowers, value) - 1
+            return index >= 0 and value <= self._uppers[index]
+        except ArithmeticError:
+            # Decimal NaNs signal InvalidOperation on ordering comparisons.
+            if _within(value, None, None):
+                raise
+            return False
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def __repr__(self):
+        return '{:}({!r}, name={!r}, dtype={:}, ex={:})'.format(
+            type(self).__name__, list(self.intervals), self.name,
+            getattr(self.dtype, '__name__', self.dtype), self.ex.__name__)
+
+    def validate_array(self, array, name=None):
+        """Validates that every element of an array is within any of the
+        intervals.
+
+        NumPy arrays are checked with a single numpy.searchsorted() call,
+        any other iterable with one binary search per item.
+
+        Args:
+            array: the values to be validated
+            name: name of the values in the error message, overriding the
+                  one given at construction
+
+        Returns:
+            the given array, if all of its elements are valid
+
+        Raises:
+            RangeError or type(ex): if any element is not within any of the
+                                    intervals. The message refers to the
+                                    first invalid one as name[index].
+            TypeError: if the elements are not of the acceptable data type,
+                       if specified.
+        """
+        if name is None:
+            name = self.name
+        if numpy is not None and isinstance(array, numpy.ndarray):
+            _validate_array_type(name, array, self.dtype)
+            if array.size == 0:
+                return array
+            values = array.reshape(-1)
+            valid = self._valid_mask(values)
+            if not valid.all():
+                position = int(numpy.argmin(valid))
+                index = numpy.unravel_index(position, array.shape)
+                self._reject(values[position].item(), _indexed_name(
+                    name, index if array.ndim > 1 else index[0]))
+            return array
+        for index, value in enumerate(array):
+            if ((self.dtype is None or isinstance(value, self.dtype))
+                    and value in self):
+                continue
+            self._reject(value, _indexed_name(name, index))
+        return array
+
+    def _valid_mask(self, values):
+        indices = numpy.searchsorted(self._lowers, values, side='right') - 1
+        uppers = numpy.asarray(self._uppers)[numpy.maximum(indices, 0)]
+        return (indices >= 0) & (values <= uppers)
+
+    def _reject(self, value, name=None):
+        if name is None:
+            name = self.name
+        _validate_type(name, value, self.dtype)
+        try:
+            index = bisect.bisect_right(self._lowers, value)
+        except ArithmeticError:
+            # Decimal NaNs, placed after all intervals as float NaNs are.
+            index = len(self._lowers)
+        below = self.intervals[index - 1] if index > 0 else None
+        above = self.intervals[index] if index < len(self.intervals) else None
+        raise _range_error(self.ex, 'intervals', name, value, below, above)
+
+
+class Domain(object):
+    """Validator of integers that must be in an enumerated set of values.
+
+    Small domains, spanning at most 65536 values (e.g. any uint8 or uint16
+    codes), are stored as a lookup table, a bytearray with one entry per
+    value of the span set to 1 if the value is allowed: checks are a
+    subtraction and an index. Larger domains are stored as a frozenset.
+    Both give O(1) scalar checks. Byte buffers are checked with a single
+    bytes.translate() call and NumPy arrays with a gather from the table.
+
+    If a width is given, the values are first checked to fit it with the
+    semantics of the fixed-width helpers (uint8() etc.), so the width and
+    the membership are validated in one call.
+
+    Can be used as field specification of RecordValidator and checked().
+
+    Args:
+        allowed: iterable of the acceptable integers, at least one
+        name: customizable name of the value that appears in the error message
+        width: optional fixed width the values must fit: either one of
+               'uint8', 'uint16', 'uint32', 'uint64', 'int8', 'int16',
+               'int32', 'int64' or an integer struct format code
+        ex: exception type to throw in case the value is not allowed
+
+    Raises:
+        TypeError: if any allowed value is not an integer
+        ValueError: if no values are allowed, the width is unknown or any
+                    allowed value does not fit it
+
+    Examples:
+            >>> opcode = Domain([0x01, 0x02, 0x10, 0x7F], name='Opcode',
+            ...                 width='uint8')
+            >>> opcode(0x10)
+            16
+            >>> opcode(3)
+            rangeforce.RangeError: Opcode must be one of 1, 2, 16, 127. 3
+            found instead.
+            >>> opcode(300)
+            rangeforce.RangeError: Opcode must be in range [0, 255]. 300
+            found instead.
+    """
+    __slots__ = ('values', 'name', 'width', 'ex', '_set', '_table',
+                 '_offset', '_lower', '_upper')
+
+    # Largest span of values stored as lookup table, enough for uint16.
+    TABLE_SPAN = 1 << 16
+
+    def __init__(self, allowed, name='Value', width=None, ex=RangeError):
+        values = sorted(frozenset(allowed))
+        if not values:
+            raise ValueError('At least one allowed value is required.')
+        for value in values:
+            _validate_type('Allowed value', value, int)
+        if width is None:
+            lower, upper = values[0], values[-1]
+        else:
+            lower, upper = _width_bounds(width)
+            if values[0] < lower or values[-1] > upper:
+                raise ValueError(
+                    'Allowed values must fit the {:} width, in range {:}. '
+                    '{:} found instead.'.format(
+                        width, _interval_to_str(lower, upper),
+                        values[0] if values[0] < lower else values[-1]))
+        self.values = tuple(values)
+        self.name = name
+        self.width = width
+        self.ex = ex
+        self._lower = lower
+        self._upper = upper
+        if upper - lower < self.TABLE_SPAN:
+            self._set = None
+            self._offset = lower
+            self._table = bytearray(upper - lower + 1)
+            for value in values:
+                self._table[value - lower] = 1
+        else:
+            self._set = frozenset(values)
+            self._offset = None
+            self._table = None
+
+    def __call__(self, value, name=None):
+        """Validates that value is one of the allowed values.
+
+        Args:
+            value: the integer to be validated
+            name: name of the value in the error message, overriding the one
+                  given at construction
+
+        Returns:
+            the given value if allowed
+
+        Raises:
+            RangeError or type(ex): if the value does not fit the width or
+                                    is not one of the allowed values.
+            TypeError: if the value is not an integer.
+        """
+        if value in self:
+            return value
+        self._reject(value, name)
+
+    def __contains__(self, value):
+        if not isinstance(value, int):
+            return False
+        elif self._table is None:
+            return value in self._set
+        index = value - self._offset
+        return 0 <= index < len(self._table) and self._table[index] == 1
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return '{:}({!r}, name={!r}, width={!r}, ex={:})'.format(
+            type(self).__name__, list(self.values), self.name, self.width,
+            self.ex.__name__)
+
+    def validate_array(self, array, name=None):
+        """Validates that every element of an array is one of the allowed
+        values.
+
+        NumPy arrays of integers are checked with a gather from the lookup
+        table (or numpy.isin() for large domains), bytes-like objects of
+        single bytes with bytes.translate() and any other iterable item by
+        item.
+
+        Args:
+            array: the integers to be validated
+            name: name of the values in the error message, overriding the
+                  one given at construction
+
+        Returns:
+            the given array, if all of its elements are valid
+
+        Raises:
+            RangeError or type(ex): if any element does not fit the width or
+                                    is not one of the allowed values. The
+                                    message refers to the first invalid one
+                                    as name[index].
+            TypeError: if the elements are not integers.
+        """
+        if name is None:
+            name = self.name
+        if numpy is not None and isinstance(array, numpy.ndarray):
+            _validate_array_type(name, array, int)
+            if array.size == 0:
+                return array
+            values = array.reshape(-1)
+            valid = self._valid_mask(values)
+            if not valid.all():
+                position = int(numpy.argmin(valid))
+                index = numpy.unravel_index(position, array.shape)
+                self._reject(values[position].item(),
+                             _indexed_name(name, index if array.ndim > 1
+                                           else index[0]))
+            return array
+        if isinstance(array, (bytes, bytearray, memoryview)):
+            view = _flat_view(array)
+            if view.format in ('B', 'b', 'c') and self._table is not None:
+                signed = view.format == 'b'
+                if not view.tobytes().translate(None, self._bytes(signed)):
+                    return array
+            array = view.cast('B') if view.format == 'c' else view
+        for index, value in enumerate(array):
+            if value not in self:
+                self._reject(value, _indexed_name(name, index))
+        return array
+
+    def _valid_mask(self, values):
+        if self._table is None:
+            return numpy.isin(values, self.values)
+        inside = (values >= self._lower) & (values <= self._upper)
+        valid = numpy.zeros(values.shape, dtype=bool)
+        if not inside.any():
+            return valid
+        values = values[inside]
+        # Indices into the table, avoiding overflows of the array data type:
+        # signed integers fit int64, unsigned ones are not below the start.
+        if values.dtype.kind == 'u':
+            start = builtins.max(self._offset, 0)
+            indices = (values - values.dtype.type(start)).astype(numpy.intp)
+            indices += start - self._offset
+        else:
+            indices = values.astype(numpy.int64) - self._offset
+        valid[inside] = numpy.frombuffer(self._table, numpy.uint8)[indices]
+        return valid
+
+    def _bytes(self, signed):
+        # The raw bytes of the allowed values, to be deleted by translate().
+        return bytes(value & 0xFF for value in self.values
+                     if (-128 <= value < 128 if signed else 0 <= value < 256))
+
+    def _reject(self, value, name=None):
+        if name is None:
+            name = self.name
+        _validate_type(name, value, int)
+        if not self._lower <= value <= self._upper and self.width is not None:
+            raise _range_error(self.ex, 'range', name, value, self._lower,
+                               self._upper)
+        raise _range_error(self.ex, 'domain', name, value, self.values, None)
+
+
+def limited_iter(iterable, min, max, name='Value', dtype=None, ex=RangeError):
+    """Lazily validates that every item of an iterable is within the
+    [min, max] interval.
+
+    Generator counterpart of limited(), yielding the items one by one as they
+    are validated, so it can be placed inside a streaming pipeline without
+    materializing the whole input. The interval is validated only once,
+    before the first item is consumed.
+
+    If an item is not valid, it raises an exception with the same
+    understandable error message limited() would raise, with the position of
+    the item in the stream appended to the name.
+
+    Args:
+        iterable: the items to be validated to be within [min, max]
+        min: smallest acceptable value. Can be None if max is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be <= max.
+        max: greatest acceptable value. Can be None if min is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be >= min.
+        name: customizable name of the values that appears in the error
+              message
+        dtype: optional data type the items have to be
+        ex: exception type to throw in case an item is out of range
+
+    Yields:
+        the given items, if within [min, max] and, optionally, of the correct
+        data type
+
+    Raises:
+        RangeError or type(ex): if an item is not within the acceptable
+                                range.
+        TypeError: if an item is not of the acceptable data type, if
+                   specified.
+        ValueError: if the min, max extremes are not valid (e.g. both None,
+                    min greater than max, NaN etc.)
+
+    Examples:
+            >>> list(limited_iter([1, 2, 3], 0, 10))
+            [1, 2, 3]
+            >>> sum(limited_iter(iter([1, 2, 30]), 0, 10, name='Sample'))
+            rangeforce.RangeError: Sample[2] must be in range [0, 10]. 30
+            found instead.
+    """
+    validator = Validator(min, max, name, dtype, ex)
+    lower = validator._lower
+    upper = validator._upper
+    for index, value in enumerate(iterable):
+        try:
+            valid = ((dtype is None or isinstance(value, dtype))
+                     and lower <= value <= upper)
+        except ArithmeticError:
+            valid = _within(value, lower, upper)
+        if valid:
+            yield value
+        else:
+            validator._reject(value, _indexed_name(name, index))
+
+
+def clip_iter(iterable, min, max):
+    """Lazily clips (limits) every item of an iterable to the given limits.
+
+    Generator counterpart of clip(), yielding the items one by one.
+
+    Args:
+        iterable: the items to be limited to [min, max]
+        min: smallest acceptable value
+        max: greatest acceptable value
+
+    Yields:
+        each item if within [min, max] or min if the item is smaller than
+        min or max if the item is greater than max.
+
+    Examples:
+            >>> list(clip_iter([-5, 3, 50], 0, 10))
+            [0, 3, 10]
+    """
+    for value in iterable:
+        if value < min:
+            yield min
+        elif value > max:
+            yield max
+        else:
+            yield value
+
+
+async def alimited_iter(aiterable, min, max, name='Value', dtype=None,
+                        ex=RangeError, batched=False):
+    """Lazily validates that every item of an async iterable is within the
+    [min, max] interval.
+
+    Asynchronous counterpart of limited_iter(), to be used with async for
+    on async iterators, such as the decoders of asyncio.StreamReader data.
+
+    In batched mode the async iterable provides chunks of items (lists,
+    bytes-like objects, NumPy arrays etc.) as they are received, which are
+    validated whole and yielded unchanged, reducing the per-item overhead
+    of the await machinery to once per chunk. Bytes-like objects and NumPy
+    arrays are validated with reductions in C.
+
+    If an item is not valid, it raises an exception with the same
+    understandable error message limited() would raise, with the position of
+    the item in the stream (counted across chunks, in batched mode) appended
+    to the name.
+
+    Args:
+        aiterable: async iterable of the items, or of chunks of items if
+                   batched, to be validated to be within [min, max]
+        min: smallest acceptable value. Can be None if max is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be <= max.
+        max: greatest acceptable value. Can be None if min is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be >= min.
+        name: customizable name of the values that appears in the error
+              message
+        dtype: optional data type the items have to be
+        ex: exception type to throw in case an item is out of range
+        batched: whether the async iterable provides chunks of items
+
+    Yields:
+        the given items (or chunks), if within [min, max] and, optionally,
+        of the correct data type
+
+    Raises:
+        RangeError or type(ex): if an item is not within the acceptable
+                                range.
+        TypeError: if an item is not of the acceptable data type, if
+                   specified.
+        ValueError: if the min, max extremes are not valid (e.g. both None,
+                    min greater than max, NaN etc.)
+
+    Examples:
+            >>> async for sample in alimited_iter(samples(), 0, 10):
+            ...     print(sample)
+            >>> async for chunk in alimited_iter(chunks(), 0, 10,
+            ...                                  batched=True):
+            ...     process(chunk)
+            rangeforce.RangeError: Value[70000] must be in range [0, 10]. 30
+            found instead.
+    """
+    validator = Validator(min, max, name, dtype, ex)
+    lower = validator._lower
+    upper = validator._upper
+    position = 0
+    async for item in aiterable:
+        if batched:
+            count, index, value = _first_invalid_in_chunk(item, validator)
+            if index is not None:
+                validator._reject(value, _indexed_name(name, position + index))
+            position += count
+        else:
+            try:
+                valid = ((dtype is None or isinstance(item, dtype))
+                         and lower <= item <= upper)
+            except ArithmeticError:
+                valid = _within(item, lower, upper)
+            if not valid:
+                validator._reject(item, _indexed_name(name, position))
+            position += 1
+        yield item
+
+
+def _first_invalid_in_chunk(chunk, validator):
+    # Amount of items in the chunk, index and value of the first invalid one
+    # (None, None if all are valid).
+    if numpy is not None and isinstance(chunk, numpy.ndarray):
+        _validate_array_type(validator.name, chunk, validator.dtype)
+        values = chunk.reshape(-1)
+        valid = (values >= validator._lower) & (values <= validator._upper)
+        if valid.all():
+            return values.size, None, None
+        index = int(numpy.argmin(valid))
+        return values.size, index, values[index].item()
+    if validator.dtype is None and isinstance(
+            chunk, (bytes, bytearray, memoryview)):
+        view = _flat_view(chunk)
+        index = _first_out_of_range(view, validator.min, validator.max)
+        return len(view), index, None if index is None else view[index]
+    count = 0
+    for value in chunk:
+        try:
+            valid = ((validator.dtype is None
+                      or isinstance(value, validator.dtype))
+                     and validator._lower <= value <= validator._upper)
+        except ArithmeticError:
+            valid = _within(value, validator._lower, validator._upper)
+        if not valid:
+            return count, count, value
+        count += 1
+    return count, None, None
+
+
+async def aclip_iter(aiterable, min, max, batched=False):
+    """Lazily clips (limits) every item of an async iterable to the given
+    limits.
+
+    Asynchronous counterpart of clip_iter(). In batched mode the async
+    iterable provides chunks of items, which are clipped whole: NumPy arrays
+    with numpy.clip(), any other chunk into a list.
+
+    Args:
+        aiterable: async iterable of the items, or of chunks of items if
+                   batched, to be limited to [min, max]
+        min: smallest acceptable value
+        max: greatest acceptable value
+        batched: whether the async iterable provides chunks of items
+
+    Yields:
+        each item (or chunk of items) if within [min, max] or min if the
+        item is smaller than min or max if the item is greater than max.
+
+    Examples:
+            >>> async for sample in aclip_iter(samples(), 0, 10):
+            ...     print(sample)
+    """
+    async for item in aiterable:
+        if not batched:
+            yield min if item < min else max if item > max else item
+        elif numpy is not None and isinstance(item, numpy.ndarray):
+            yield numpy.clip(item, min, max)
+        else:
+            yield [min if value < min else max if value > max else value
+                   for value in item]
+
+
+def clip_buffer(buffer, min, max, out=None):
+    """Clips (limits) all elements of a buffer to the given limits, in place.
+
+    Bulk counterpart of clip() operating on NumPy arrays, array.array objects
+    and writable memoryviews (or anything supporting the buffer protocol)
+    without allocating a new container: the elements are clamped in place
+    or, if given, into the caller-provided output buffer, which must have the
+    same length and element format.
+
+    NaN elements are left untouched, as clip() does.
+
+    Args:
+        buffer: the elements to be limited to [min, max]
+        min: smallest acceptable value
+        max: greatest acceptable value
+        out: optional writable buffer to store the clipped elements into,
+             leaving the input buffer untouched
+
+    Returns:
+        the number of elements that were smaller than min or greater than max
+        and have thus been saturated
+
+    Raises:
+        TypeError: if the buffer to be written is read-only.
+        ValueError: if the output buffer has a different length or element
+                    format than the input buffer.
+
+    Examples:
+            >>> samples = array.array('h', [-300, 20, 300])
+            >>> clip_buffer(samples, -255, 255)
+            2
+            >>> samples
+            array('h', [-255, 20, 255])
+    """
+    if numpy is not None and isinstance(buffer, numpy.ndarray):
+        return _clip_ndarray(buffer, min, max, out)
+    source = _flat_view(buffer)
+    target = source if out is None else _flat_view(out)
+    if target.readonly:
+        raise TypeError('Buffer to be clipped must be writable.')
+    if target is not source:
+        exact_len(target, len(source), name='output buffer', ex=ValueError)
+        if target.format != source.format:
+            raise ValueError(
+                'Output buffer must have element format {:}. '
+                '{:} found instead.'.format(source.format, target.format)
+            )
+        target[:] = source
+    elif not source or (builtins.min(source) >= min
+                        and builtins.max(source) <= max):
+        return 0
+    saturated = 0
+    for index, value in enumerate(target):
+        if value < min:
+            target[index] = min
+            saturated += 1
+        elif value > max:
+            target[index] = max
+            saturated += 1
+    return saturated
+
+
+def _clip_ndarray(array, min, max, out):
+    if out is None:
+        out = array
+    elif not isinstance(out, numpy.ndarray):
+        # Same checks as for the output buffers of any other input.
+        target = _flat_view(out)
+        if target.readonly:
+            raise TypeError('Buffer to be clipped must be writable.')
+        exact_len(target, array.size, name='output buffer', ex=ValueError)
+        try:
+            same_format = numpy.dtype(target.format) == array.dtype
+        except TypeError:
+            same_format = False
+        if not same_format:
+            raise ValueError(
+                'Output buffer must have element format {:}. '
+                '{:} found instead.'.format(array.dtype.char, target.format)
+            )
+        out = numpy.frombuffer(target, dtype=array.dtype).reshape(array.shape)
+    saturated = (numpy.count_nonzero(array < min)
+                 + numpy.count_nonzero(array > max))
+    numpy.clip(array, min, max, out=out)
+    return int(saturated)
+
+
+def saturate(array, width, name='Value', tolerance=None, ex=RangeError):
+    """Converts an array of numbers to a fixed-width integer type,
+    saturating the out-of-range elements to the bounds of the type.
+
+    The bounds are the ones of the fixed-width helpers (uint8() etc.). NumPy
+    arrays of any numeric data type are clamped and cast in a single
+    numpy.clip() pass writing directly into the new array of the target
+    type, without intermediate wide copies. Any other iterable of numbers,
+    such as array.array objects, is converted item by item into an
+    array.array. Floats are truncated towards zero, as int() does.
+
+    Optionally, the conversion is refused if too many elements would be
+    saturated, which usually means the input is not in the expected scale.
+
+    Args:
+        array: the numbers to be converted
+        width: the target type: either one of 'uint8', 'uint16', 'uint32',
+               'uint64', 'int8', 'int16', 'int32', 'int64' or an integer
+               struct format code
+        name: customizable name of the values that appears in the error
+              message
+        tolerance: optional greatest acceptable fraction of saturated
+                   elements, in [0, 1]
+        ex: exception type to throw in case of NaN elements or too many
+            saturated elements
+
+    Returns:
+        a tuple of the converted array (a NumPy array for NumPy input, an
+        array.array otherwise) and the number of saturated elements
+
+    Raises:
+        RangeError or type(ex): if an element is NaN or if the fraction of
+                                saturated elements is greater than the
+                                tolerance.
+        ValueError: if the width is unknown or the tolerance is not in
+                    [0, 1].
+
+    Examples:
+            >>> saturate(array.array('d', [-1e6, 0.5, 40000.0]), 'int16')
+            (array('h', [-32768, 0, 32767]), 2)
+            >>> saturate(numpy.array([1.0, 300.0]), 'uint8', tolerance=0.1)
+            rangeforce.RangeError: Saturated fraction of Value must be in
+            range [0, 0.1]. 0.5 found instead.
+    """
+    min, max = _width_bounds(width)
+    if tolerance is not None:
+        limited(tolerance, 0, 1, name='Tolerance', ex=ValueError)
+    if numpy is not None and isinstance(array, numpy.ndarray):
+        return _saturate_ndarray(array, width, min, max, name, tolerance, ex)
+    # Counted and clamped in a single pass, straight into the target array.
+    converted = _array.array(_WIDTH_TYPECODES.get(width, width))
+    append = converted.append
+    saturated = 0
+    for index, value in enumerate(array):
+        if value != value:
+            raise _range_error(ex, 'range', _indexed_name(name, index),
+                               value, min, max)
+        elif value < min:
+            append(min)
+            saturated += 1
+        elif value > max:
+            append(max)
+            saturated += 1
+        else:
+            append(int(value))
+    _check_saturated_fraction(saturated, len(converted), name, tolerance, ex)
+    return converted, saturated
+
+
+# Typecodes of the array module for the fixed-width names.
+_WIDTH_TYPECODES = {
+    'uint8': 'B', 'uint16': 'H', 'uint32': 'I', 'uint64': 'Q',
+    'int8': 'b', 'int16': 'h', 'int32': 'i', 'int64': 'q',
+}
+
+
+def _saturate_ndarray(array, width, min, max, name, tolerance, ex):
+    lower, upper = min, max
+    if array.dtype.kind == 'f':
+        nans = numpy.isnan(array)
+        if nans.any():
+            position = int(numpy.argmax(nans.reshape(-1)))
+            index = numpy.unravel_index(position, array.shape)
+            raise _range_error(ex, 'range', _indexed_name(
+                name, index if array.ndim > 1 else index[0]),
+                array.reshape(-1)[position].item(), min, max)
+        # The float nearest to the upper bound may be greater than it, e.g.
+        # 2 ** 63 for int64: clamp to the greatest float below it instead.
+        upper = array.dtype.type(max)
+        if int(upper) > max:
+            upper = numpy.nextafter(upper, array.dtype.type(0))
+    elif array.dtype.kind in 'iu':
+        # Bounds beyond the range of the input type are never exceeded.
+        info = numpy.iinfo(array.dtype)
+        lower = builtins.max(min, info.min)
+        upper = builtins.min(max, info.max)
+    saturated = int(numpy.count_nonzero(array < lower)
+                    + numpy.count_nonzero(array > upper))
+    _check_saturated_fraction(saturated, array.size, name, tolerance, ex)
+    out = numpy.empty(array.shape, dtype=_WIDTH_TYPECODES.get(width, width))
+    numpy.clip(array, lower, upper, out=out, casting='unsafe')
+    if upper < max:
+        # Only for floats above the greatest float below the upper bound.
+        numpy.copyto(out, max, where=array > upper)
+    return out, saturated
+
+
+def _check_saturated_fraction(saturated, total, name, tolerance, ex):
+    if tolerance is not None and saturated > tolerance * total:
+        raise _range_error(ex, 'range', 'Saturated fraction of {:}'.format(
+            name), saturated / total, 0, tolerance)
+
+
+def min_width(values, signed=None, name='Value', ex=RangeError):
+    """Narrowest fixed-width integer type all values fit in.
+
+    Computes the smallest and greatest value in a single reduction (in C for
+    NumPy arrays and buffers) instead of trying every width in turn, then
+    picks the narrowest of the widths of the fixed-width helpers (uint8()
+    etc.) that fits both.
+
+    Args:
+        values: the integers, as NumPy array, buffer or any iterable
+        signed: True for signed widths only, False for unsigned widths only,
+                None for unsigned widths if no value is negative, signed
+                otherwise
+        name: customizable name of the values that appears in the error
+              message
+        ex: exception type to throw in case no width fits the values
+
+    Returns:
+        the name of the width, e.g. 'uint16', accepted by saturate() and
+        fixed_width_buffer(). The narrowest one if there are no values.
+
+    Raises:
+        RangeError or type(ex): if the values do not fit even the 64 bits
+                                widths or are negative for unsigned widths.
+        TypeError: if the values are not integers.
+
+    Examples:
+            >>> min_width([0, 200, 17])
+            'uint8'
+            >>> min_width([-1, 200])
+            'int16'
+            >>> min_width([0, 200], signed=True)
+            'int16'
+    """
+    extremes = _integer_extremes(values, name)
+    if signed is None:
+        signed = extremes is not None and extremes[0] < 0
+    widths = ('int8', 'int16', 'int32', 'int64') if signed else (
+        'uint8', 'uint16', 'uint32', 'uint64')
+    if extremes is None:
+        return widths[0]
+    smallest, greatest = extremes
+    for width in widths:
+        min, max = _FIXED_WIDTH_BOUNDS[width]
+        if min <= smallest and greatest <= max:
+            return width
+    min, max = _FIXED_WIDTH_BOUNDS[width]
+    raise _range_error(ex, 'range', name,
+                       smallest if smallest < min else greatest, min, max)
+
+
+def min_bits(values, name='Value', ex=RangeError):
+    """Fewest bits of an unsigned integer all values fit in.
+
+    The counterpart of min_width() for the widths of uint_bits(), computed
+    in a single reduction as well.
+
+    Args:
+        values: the non-negative integers, as NumPy array, buffer or any
+                iterable
+        name: customizable name of the values that appears in the error
+              message
+        ex: exception type to throw in case of negative values
+
+    Returns:
+        the amount of bits, to be used with uint_bits(). 0 if the values are
+        all zero or there are none.
+
+    Raises:
+        RangeError or type(ex): if any value is negative.
+        TypeError: if the values are not integers.
+
+    Examples:
+            >>> min_bits([0, 5, 3])
+            3
+    """
+    extremes = _integer_extremes(values, name)
+    if extremes is None:
+        return 0
+    smallest, greatest = extremes
+    if smallest < 0:
+        raise _range_error(ex, 'range', name, smallest, 0, None)
+    return greatest.bit_length()
+
+
+def fits(values, width):
+    """Whether all values fit a fixed-width integer type.
+
+    Checks the smallest and greatest value, computed in a single reduction,
+    against the bounds of the width.
+
+    Args:
+        values: the integers, as NumPy array, buffer or any iterable
+        width: either one of 'uint8', 'uint16', 'uint32', 'uint64', 'int8',
+               'int16', 'int32', 'int64' or an integer struct format code
+
+    Returns:
+        True if all values fit the width, also if there are none.
+
+    Raises:
+        TypeError: if the values are not integers.
+        ValueError: if the width is unknown.
+
+    Examples:
+            >>> fits([0, 200], 'uint8')
+            True
+            >>> fits([0, 200], 'int8')
+            False
+    """
+    min, max = _width_bounds(width)
+    extremes = _integer_extremes(values, 'Value')
+    return extremes is None or (min <= extremes[0] and extremes[1] <= max)
+
+
+def _integer_extremes(values, name):
+    # Smallest and greatest of the integers as Python ints, None if there are
+    # none. Every element is type-checked in the same pass.
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        _validate_array_type(name, values, int)
+        if values.size == 0:
+            return None
+        return int(values.min()), int(values.max())
+    try:
+        view = _flat_view(values)
+    except TypeError:
+        pass
+    else:
+        if len(view.format) == 1 and view.format in _INTEGER_FORMATS:
+            # The format guarantees ints: the reductions run in C.
+            if not view:
+                return None
+            return builtins.min(view), builtins.max(view)
+        values = view
+    smallest = greatest = None
+    for value in values:
+        if not isinstance(value, int):
+            _validate_type(name, value, int)
+        if smallest is None:
+            smallest = greatest = value
+        elif value < smallest:
+            smallest = value
+        elif value > greatest:
+            greatest = value
+    return None if smallest is None else (smallest, greatest)
+
+
+def _flat_view(buffer, format=None):
+    view = memoryview(buffer)
+    if view.ndim != 1 or (format is not None and format != view.format):
+        view = view.cast('B').cast(format or view.format)
+    return view
+
+
+def limited_buffer(buffer, min, max, name='Value', format=None,
+                   ex=RangeError):
+    """Validates that all elements of a buffer are within the [min, max]
+    interval, using only the standard library.
+
+    Bulk counterpart of limited() for array.array objects, memoryviews and
+    anything else supporting the buffer protocol, such as packed binary
+    payloads. The buffer is never copied: it is read through a memoryview,
+    optionally cast to the given struct format code. The elements are first
+    checked with min() and max() reductions; the slower element-by-element
+    scan runs only on failure, to locate the first offending element.
+
+    If any element is not valid, it raises an exception with the same
+    understandable error message limited() would raise for the first
+    offending element, with its index appended to the name.
+
+    Args:
+        buffer: the object supporting the buffer protocol whose elements are
+                to be validated to be within [min, max]
+        min: smallest acceptable value. Can be None if max is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be <= max.
+        max: greatest acceptable value. Can be None if min is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be >= min.
+        name: customizable name of the buffer that appears in the error
+              message
+        format: optional native struct format code (e.g. 'B', 'h', 'I', 'q',
+                'd') the buffer is interpreted as. Defaults to the buffer's
+                own format, e.g. the typecode of an array.array.
+        ex: exception type to throw in case a value is out of range
+
+    Returns:
+        the given buffer if all elements are within [min, max]
+
+    Raises:
+        RangeError or type(ex): if any element is not within the acceptable
+                                range.
+        ValueError: if the min, max extremes are not valid (e.g. both None,
+                    min greater than max, NaN etc.)
+        TypeError: if the buffer cannot be cast to the format.
+
+    Examples:
+            >>> limited_buffer(array.array('d', [0.5, 0.1]), 0, 1)
+            array('d', [0.5, 0.1])
+            >>> limited_buffer(b'\\x00\\x10\\xff', 0, 127, name='Byte')
+            rangeforce.RangeError: Byte[2] must be in range [0, 127]. 255
+            found instead.
+            >>> limited_buffer(b'\\x00\\x00\\xff\\xff', 0, 10, format='h')
+            rangeforce.RangeError: Value[1] must be in range [0, 10]. -1
+            found instead.
+    """
+    _validate_interval(min, max)
+    view = _flat_view(buffer, format)
+    index = _first_out_of_range(view, min, max)
+    if index is not None:
+        limited(view[index], min, max, _indexed_name(name, index), ex=ex)
+    return buffer
+
+
+def fixed_width_buffer(buffer, width, name='Value', format=None,
+                       ex=RangeError):
+    """Validates that all elements of a buffer fit in a fixed-width integer.
+
+    Buffer counterpart of uint8() ... int64(): the bounds are inferred from
+    the native size and signedness of the given struct format code, so for
+    example 'H' checks the elements as uint16() would. Useful to validate
+    a buffer of wide integers before packing it into a narrower format.
+    See limited_buffer() for details.
+
+    Args:
+        buffer: the object supporting the buffer protocol whose elements are
+                to be validated
+        width: native integer struct format code the elements have to fit in
+               (e.g. 'B', 'h', 'I', 'q') or one of the names 'uint8' ...
+               'int64'
+        name: customizable name of the buffer that appears in the error
+              message
+        format: optional native struct format code the buffer is interpreted
+                as. Defaults to the buffer's own format.
+        ex: exception type to throw in case a value is out of range
+
+    Returns:
+        the given buffer if all elements fit in the given width
+
+    Raises:
+        RangeError or type(ex): if any element does not fit.
+        TypeError: if the elements are not integers, e.g. of format 'd'.
+        ValueError: if the width is not an integer format.
+
+    Examples:
+            >>> fixed_width_buffer(array.array('q', [1, 70000]), 'H')
+            rangeforce.RangeError: Value[1] must be in range [0, 65535].
+            70000 found instead.
+    """
+    min, max = _width_bounds(width)
+    view = _flat_view(buffer, format)
+    _validate_integer_format(name, view.format)
+    if _width_bounds(view.format) == (min, max):
+        return buffer  # The elements fit by construction.
+    index = _first_out_of_range(view, min, max)
+    if index is not None:
+        _limited_int(view[index], min, max, _indexed_name(name, index), ex)
+    return buffer
+
+
+_INTEGER_FORMATS = 'bBhHiIlLqQnN'
+
+
+def _validate_integer_format(name, format):
+    # Counterpart of _validate_type(name, value, int) for buffer elements.
+    if not (len(format) == 1 and format in _INTEGER_FORMATS):
+        raise TypeError(
+            '{:} must be of type int. Elements of format {!r} found '
+            'instead.'.format(name, format)
+        )
+
+
+def _width_bounds(width):
+    if isinstance(width, str) and width in _FIXED_WIDTH_BOUNDS:
+        return _FIXED_WIDTH_BOUNDS[width]
+    elif not (isinstance(width, str) and len(width) == 1
+              and width in _INTEGER_FORMATS):
+        raise ValueError(
+            'Width must be an integer format code or one of {:}. '
+            '{!r} found instead.'.format(', '.join(_FIXED_WIDTH_BOUNDS),
+                                         width)
+        )
+    bits = struct.calcsize(width) * 8
+    if width.islower():
+        return -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+    else:
+        return 0, (1 << bits) - 1
+
+
+def _first_out_of_range(view, min, max):
+    # Index of the first element of the flat memoryview outside of the
+    # interval, None if all are within. Reductions in C first, Python loop
+    # only on failure.
+    if not view:
+        return None
+    if ((min is None or builtins.min(view) >= min)
+            and (max is None or builtins.max(view) <= max)):
+        # min() and max() may skip NaN: the sum is NaN if any element is.
+        total = sum(view) if view.format in 'efd' else 0
+        if total == total:
+            return None
+    for index, value in enumerate(view):
+        if not ((min is None or value >= min)
+                and (max is None or value <= max)):
+            return index
+    return None
+
+
+# Bytes of a file mapped at once by limited_file() and fixed_width_file().
+_FILE_CHUNK_SIZE = 1 << 24
+
+
+def limited_file(path, min, max, format, name='Value', offset=0,
+                 byteorder=None, chunk_size=_FILE_CHUNK_SIZE, ex=RangeError):
+    """Validates that all elements of a binary file are within the
+    [min, max] interval, without loading the file into memory.
+
+    File counterpart of limited_buffer() for raw dumps larger than the
+    available memory. The file is memory-mapped one page-aligned chunk at a
+    time, with sequential access hints where supported, and each chunk is
+    unmapped once checked, so the resident memory stays bounded by the chunk
+    size. Chunks are checked with NumPy reductions when NumPy is available,
+    with the standard library otherwise.
+
+    If any element is not valid, it raises an exception with the same
+    understandable error message limited() would raise for the first
+    offending element, with its index and byte offset in the file appended
+    to the name.
+
+    Args:
+        path: path of the file to be validated
+        min: smallest acceptable value. Can be None if max is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be <= max.
+        max: greatest acceptable value. Can be None if min is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be >= min.
+        format: native struct format code (e.g. 'B', 'h', 'I', 'q', 'd') of
+                the elements of the file
+        name: customizable name of the elements that appears in the error
+              message
+        offset: bytes at the beginning of the file to be skipped, e.g. a
+                header
+        byteorder: 'little' or 'big' if the file was not written with the
+                   native byte order
+        chunk_size: bytes of the file mapped at once, rounded to whole
+                    elements
+        ex: exception type to throw in case a value is out of range
+
+    Returns:
+        the number of validated elements
+
+    Raises:
+        RangeError or type(ex): if any element is not within the acceptable
+                                range.
+        ValueError: if the min, max extremes are not valid (e.g. both None,
+                    min greater than max, NaN etc.) or the size of the file
+                    after the offset is not a multiple of the element size.
+        OSError: if the file cannot be read.
+
+    Examples:
+            >>> limited_file('samples.bin', -2048, 2047, 'h')
+            134217728
+            >>> limited_file('samples.bin', -1024, 1023, 'h', name='Sample')
+            rangeforce.RangeError: Sample[1048580] at byte offset 2097160
+            must be in range [-1024, 1023]. 2000 found instead.
+    """
+    _validate_interval(min, max)
+    return _scan_file(path, min, max, format, name, offset, byteorder,
+                      chunk_size, functools.partial(limited, ex=ex))
+
+
+def fixed_width_file(path, width, format, name='Value', offset=0,
+                     byteorder=None, chunk_size=_FILE_CHUNK_SIZE,
+                     ex=RangeError):
+    """Validates that all elements of a binary file fit in a fixed-width
+    integer, without loading the file into memory.
+
+    File counterpart of fixed_width_buffer(), e.g. to check that a dump of
+    uint32 counters fits in uint16 before narrowing it. See limited_file()
+    for details.
+
+    Args:
+        path: path of the file to be validated
+        width: native integer struct format code the elements have to fit in
+               (e.g. 'B', 'h', 'I', 'q') or one of the names 'uint8' ...
+               'int64'
+        format: native struct format code of the elements of the file
+        name: customizable name of the elements that appears in the error
+              message
+        offset: bytes at the beginning of the file to be skipped, e.g. a
+                header
+        byteorder: 'little' or 'big' if the file was not written with the
+                   native byte order
+        chunk_size: bytes of the file mapped at once, rounded to whole
+                    elements
+        ex: exception type to throw in case a value is out of range
+
+    Returns:
+        the number of validated elements
+
+    Raises:
+        RangeError or type(ex): if any element does not fit.
+        TypeError: if the format is not an integer one, e.g. 'd'.
+        ValueError: if the width is not an integer format or the size of the
+                    file after the offset is not a multiple of the element
+                    size.
+        OSError: if the file cannot be read.
+
+    Examples:
+            >>> fixed_width_file('counters.bin', 'uint16', 'I')
+            rangeforce.RangeError: Value[7] at byte offset 28 must be in
+            range [0, 65535]. 70000 found instead.
+    """
+    min, max = _width_bounds(width)
+    _validate_integer_format(name, format)
+
+    def check(value, min, max, name):
+        return _limited_int(value, min, max, name, ex)
+
+    return _scan_file(path, min, max, format, name, offset, byteorder,
+                      chunk_size, check)
+
+
+def _scan_file(path, min, max, format, name, offset, byteorder, chunk_size,
+               check):
+    itemsize = struct.calcsize(format)
+    swap = byteorder not in (None, sys.byteorder)
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if offset > size or (size - offset) % itemsize:
+            raise ValueError(
+                'File size after the offset must be a multiple of {:} bytes. '
+                '{:} found instead.'.format(itemsize, size - offset))
+        position = offset
+        while position < size:
+            end = builtins.min(position + builtins.max(chunk_size, itemsize),
+                               size)
+            end -= (end - position) % itemsize
+            # Mappings must start at multiples of the allocation granularity.
+            start = position - position % mmap.ALLOCATIONGRANULARITY
+            with mmap.mmap(file.fileno(), end - start, access=mmap.ACCESS_READ,
+                           offset=start) as mapped:
+                if hasattr(mapped, 'madvise') and hasattr(
+                        mmap, 'MADV_SEQUENTIAL'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                index, value = _first_out_of_range_in_chunk(
+                    mapped, position - start, end - position, format, swap,
+                    min, max)
+            if index is not None:
+                element = (position - offset) // itemsize + index
+                check(value, min, max, '{:}[{:}] at byte offset {:}'.format(
+                    name, element, position + index * itemsize))
+            position = end
+    return (size - offset) // itemsize
+
+
+def _first_out_of_range_in_chunk(mapped, start, length, format, swap, min,
+                                 max):
+    # Index and value of the first element of the mapped bytes outside of
+    # the interval, None, None if all are within. The views of the mapping
+    # are released on return, so it can be closed.
+    if numpy is not None:
+        dtype = numpy.dtype(format)
+        values = numpy.frombuffer(mapped, dtype.newbyteorder() if swap
+                                  else dtype, length // dtype.itemsize, start)
+        lower = -math.inf if min is None else min
+        upper = math.inf if max is None else max
+        # NaN propagates through min() and max(), failing the comparisons.
+        if values.min() >= lower and values.max() <= upper:
+            return None, None
+        index = int(numpy.argmin((values >= lower) & (values <= upper)))
+        return index, values[index].item()
+    view = memoryview(mapped)[start:start + length]
+    if swap:
+        values = _array.array(format)
+        values.frombytes(view)
+        values.byteswap()
+        view = memoryview(values)
+    else:
+        view = view.cast(format)
+    index = _first_out_of_range(view, min, max)
+    return index, None if index is None else view[index]
+
+
+class Range(object):
+    """Specification of an acceptable interval.
+
+    Used as metadata of typing.Annotated hints for the checked() decorator,
+    as in Annotated[int, Range(0, 255)], and accepted wherever a (min, max,
+    dtype) tuple is, e.g. in the specifications of RecordValidator. The
+    interval is validated once, at construction.
+
+    Args:
+        min: smallest acceptable value. Can be None if max is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be <= max.
+        max: greatest acceptable value. Can be None if min is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be >= min.
+        dtype: optional data type the value has to be
+
+    Raises:
+        ValueError: if the min, max extremes are not valid (e.g. both None,
+                    min greater than max, NaN etc.)
+    """
+    __slots__ = ('min', 'max', 'dtype')
+
+    def __init__(self, min, max, dtype=None):
+        _validate_interval(min, max)
+        self.min = min
+        self.max = max
+        self.dtype = dtype
+
+    def __repr__(self):
+        return '{:}({!r}, {!r}, dtype={:})'.format(
+            type(self).__name__, self.min, self.max,
+            getattr(self.dtype, '__name__', self.dtype))
+
+
+class Exactly(object):
+    """Specification of the only acceptable value.
+
+    Counterpart of Range with the semantics of exactly(), NaN being equal to
+    NaN, accepted wherever a specification is, e.g. by RecordValidator,
+    checked() and validate_columns().
+
+    Args:
+        expected: only acceptable value. Not None. Can be NaN.
+        dtype: optional data type the value has to be
+    """
+    __slots__ = ('expected', 'dtype')
+
+    def __init__(self, expected, dtype=None):
+        self.expected = expected
+        self.dtype = dtype
+
+    def __repr__(self):
+        return '{:}({!r}, dtype={:})'.format(
+            type(self).__name__, self.expected,
+            getattr(self.dtype, '__name__', self.dtype))
+
+
+class Length(object):
+    """Specification of the acceptable length of a sized value.
+
+    Used in the specifications of RecordValidator to validate the length of
+    a field with the semantics of limited_len() or, if expected is given, of
+    exact_len(). The bounds are validated once, at construction.
+
+    Args:
+        min: smallest acceptable length. Can be None if max is not None.
+             Must be <= max and >= 0.
+        max: greatest acceptable length. Can be None if min is not None.
+             Must be >= min and >= 0.
+        expected: only acceptable length, alternative to min and max.
+                  Must be an integer >= 0.
+
+    Raises:
+        TypeError: if the expected length is not an integer
+        ValueError: if the min, max extremes or the expected length are not
+                    valid (e.g. negative, both None, min greater than max, NaN
+                    etc.)
+
+    Examples:
+            >>> Length(0, 16)  # Like limited_len(value, 0, 16)
+            >>> Length(expected=2)  # Like exact_len(value, 2)
+    """
+    __slots__ = ('min', 'max', 'expected', '_lower', '_upper')
+
+    def __init__(self, min=None, max=None, expected=None):
+        if expected is not None:
+            _validate_expected_length(expected)
+            self._lower = self._upper = expected
+        else:
+            _validate_non_negative_interval_extremes(min, max)
+            _validate_interval(min, max)
+            self._lower = -math.inf if min is None else min
+            self._upper = math.inf if max is None else max
+        self.min = min
+        self.max = max
+        self.expected = expected
+
+    def __repr__(self):
+        if self.expected is not None:
+            return '{:}(expected={!r})'.format(type(self).__name__,
+                                               self.expected)
+        return '{:}({!r}, {!r})'.format(type(self).__name__, self.min,
+                                        self.max)
+
+    def _reject(self, sized, name, ex):
+        length = len(sized)
+        if self.expected is not None:
+            raise _range_error(ex, 'exact_length', name, length,
+                               self.expected, self.expected)
+        raise _range_error(ex, 'length', name, length, self.min, self.max)
+
+
+class RecordValidator(object):
+    """Precompiled validator of the fields of a record, such as a dictionary
+    decoded from a JSON payload.
+
+    The whole specification is compiled once, at construction, into a single
+    generated function with the bounds of every field bound to it, so
+    validating a record costs about as much as the hand-written comparisons.
+    The field names are used as names in the error messages.
+
+    Each field is specified as one of:
+
+    - a (min, max) or (min, max, dtype) tuple or a Range: same as limited()
+    - a Validator: same bounds, data type and exception type, but with the
+      field name in the error messages
+    - a Length: same as limited_len() or exact_len()
+    - one of the fixed-width or sign helpers such as uint16: inlined
+    - any other callable, invoked as function(value, name=field)
+
+    Args:
+        spec: dictionary mapping field names to their specification
+        ex: exception type to throw in case a field is out of range, for the
+            fields specified as tuples, helpers or Length
+
+    Raises:
+        TypeError: if a specification is not supported
+        ValueError: if the bounds of a specification are not valid (e.g. both
+                    None, min greater than max, NaN etc.)
+
+    Examples:
+            >>> payload = RecordValidator({
+            ...     'port': uint16,
+            ...     'ratio': (0.0, 1.0, float),
+            ...     'tags': Length(0, 16),
+            ... })
+            >>> payload({'port': 80, 'ratio': 0.5, 'tags': []})
+            {'port': 80, 'ratio': 0.5, 'tags': []}
+            >>> payload({'port': 80, 'ratio': 1.5, 'tags': []})
+            rangeforce.RangeError: ratio must be in range [0.0, 1.0]. 1.5
+            found instead.
+    """
+
+    def __init__(self, spec, ex=RangeError):
+        self.spec = dict(spec)
+        self.ex = ex
+        self.validate = _compile_record(self.spec, ex)
+
+    def __call__(self, record):
+        """Validates the fields of a record.
+
+        Args:
+            record: mapping with all the fields of the specification. Other
+                    fields are ignored.
+
+        Returns:
+            the given record if all fields are valid
+
+        Raises:
+            RangeError or type(ex): if a field is not within the acceptable
+                                    range.
+            TypeError: if a field is not of the acceptable data type, if
+                       specified.
+            KeyError: if a field is missing.
+        """
+        return self.validate(record)
+
+    def __repr__(self):
+        return '{:}({!r})'.format(type(self).__name__, self.spec)
+
+
+def _compile_spec(spec, name, ex):
+    # Normalizes a field specification into a Validator, a Length or a
+    # callable with signature (value, name).
+    if isinstance(spec, tuple) and len(spec) in (2, 3):
+        dtype = spec[2] if len(spec) == 3 else None
+        return Validator(spec[0], spec[1], name, dtype, ex)
+    elif isinstance(spec, Range):
+        return Validator(spec.min, spec.max, name, spec.dtype, ex)
+    elif isinstance(spec, Validator):
+        return Validator(spec.min, spec.max, name, spec.dtype, spec.ex)
+    elif isinstance(spec, Length):
+        return spec
+    elif isinstance(spec, Exactly):
+        return functools.partial(exactly, expected=spec.expected,
+                                 dtype=spec.dtype, ex=ex)
+    elif callable(spec) and spec in _INTEGER_HELPER_BOUNDS:
+        min, max = _INTEGER_HELPER_BOUNDS[spec]
+        return Validator(min, max, name, int, ex)
+    elif callable(spec):
+        return spec
+    raise TypeError(
+        'Specification of {:} must be a tuple, Range, Exactly, Validator, '
+        'Length or callable. {:} found instead.'.format(
+            name, type(spec).__name__)
+    )
+
+
+def _compile_record(spec, ex):
+    lines = ['def validate(record):']
+    namespace = {'isinstance': isinstance, 'len': len, 'within': _within}
+    for index, (field, field_spec) in enumerate(spec.items()):
+        check = _compile_spec(field_spec, field, ex)
+        namespace.update({
+            'field_{:}'.format(index): field,
+            'check_{:}'.format(index): check,
+            'lower_{:}'.format(index): getattr(check, '_lower', None),
+            'upper_{:}'.format(index): getattr(check, '_upper', None),
+            'dtype_{:}'.format(index): getattr(check, 'dtype', None),
+        })
+        lines.append('    value = record[field_{:}]'.format(index))
+        if isinstance(check, Validator):
+            # Decimal NaNs raise on the chained comparison: the fallback
+            # rejects them as limited() does.
+            lines.append('    try:')
+            if check.dtype is not None:
+                lines.append(
+                    '        valid = (isinstance(value, dtype_{0:}) '
+                    'and lower_{0:} <= value <= upper_{0:})'.format(index))
+            else:
+                lines.append(
+                    '        valid = lower_{0:} <= value <= upper_{0:}'
+                    .format(index))
+            lines.append('    except ArithmeticError:')
+            lines.append(
+                '        valid = within(value, lower_{0:}, upper_{0:})'
+                .format(index))
+            lines.append('    if not valid:')
+            lines.append('        check_{:}._reject(value)'.format(index))
+        elif isinstance(check, Length):
+            lines.append('    if not lower_{0:} <= len(value) <= upper_{0:}:'
+                         .format(index))
+            lines.append('        check_{0:}._reject(value, field_{0:}, ex)'
+                         .format(index))
+        else:
+            lines.append('    check_{0:}(value, name=field_{0:})'
+                         .format(index))
+    lines.append('    return record')
+    namespace['ex'] = ex
+    exec('\n'.join(lines), namespace)
+    return namespace['validate']
+
+
+def validate_columns(data, spec, mask=False, ex=RangeError):
+    """Validates the columns of a table, one whole column at a time.
+
+    Columnar counterpart of RecordValidator for pandas DataFrames and
+    dictionaries of equal-length columns (lists, NumPy arrays etc.). Each
+    column is checked with vectorized NumPy operations instead of one call
+    per row, which is orders of magnitude faster than applying limited() to
+    every row. NumPy is required.
+
+    The specification of each column is any of the ones accepted by
+    RecordValidator: a (min, max) or (min, max, dtype) tuple, a Range,
+    an Exactly, a Validator, a Length (the lengths of the values, e.g. of
+    strings), an integer helper as uint16, a Domain or an IntervalSet. Any
+    other callable with signature (value, name) is called once per row.
+
+    Either the first violation is raised, in the order of the
+    specification, naming the column and the row (the index label, for
+    DataFrames), or a mask of the invalid rows is returned.
+
+    Args:
+        data: DataFrame or dictionary of equal-length columns
+        spec: dictionary of column names and their specifications
+        mask: whether to return the mask of invalid rows instead of raising
+        ex: exception type to throw in case a value is out of range
+
+    Returns:
+        the given data if all columns are valid or, with mask, a boolean
+        NumPy array with True for each row with an invalid value
+
+    Raises:
+        RangeError or type(ex): if any value is invalid and mask is False.
+        TypeError: if a column is not of the acceptable data type, if
+                   specified, or a specification is of an unknown type.
+        ValueError: if the columns have different lengths or a
+                    specification is not valid.
+        KeyError: if a specified column is missing.
+        ImportError: if NumPy is not installed.
+
+    Examples:
+            >>> validate_columns(frame, {'port': uint16,
+            ...                          'hours': (0, 24, int),
+            ...                          'name': Length(1, 32)})
+            rangeforce.RangeError: port[row-7] must be in range [0, 65535].
+            70000 found instead.
+            >>> validate_columns(frame, {'hours': (0, 24)}, mask=True)
+            array([False, False,  True])
+    """
+    if numpy is None:
+        raise ImportError('NumPy is required for columnar validation.')
+    labels = getattr(data, 'index', None)
+    if labels is not None:
+        rows = len(data)
+    else:
+        # The length of a dictionary is its number of columns.
+        rows = len(next(iter(data.values()), ()))
+    bad = numpy.zeros(rows, dtype=bool)
+    for name, field_spec in spec.items():
+        column = data[name]
+        exact_len(column, rows, name='column {:}'.format(name),
+                  ex=ValueError)
+        values = column.to_numpy() if hasattr(column, 'to_numpy') else (
+            numpy.asarray(column))
+        valid = _valid_column(column, values, field_spec, name, ex)
+        if mask:
+            bad |= ~valid
+        elif not valid.all():
+            row = int(numpy.argmin(valid))
+            value = values[row]
+            if isinstance(value, numpy.generic):
+                value = value.item()
+            _argument_check(field_spec, _indexed_name(
+                name, row if labels is None else labels[row]), ex)(value)
+    return bad if mask else data
+
+
+def _valid_column(column, values, spec, name, ex):
+    # Boolean mask of the valid values of the column.
+    if isinstance(spec, Exactly):
+        _validate_array_type(name, values, spec.dtype)
+        expected = spec.expected
+        if expected != expected:
+            return values != values
+        return values == expected
+    check = _compile_spec(spec, name, ex)
+    if isinstance(check, Length):
+        lengths = numpy.fromiter(map(len, column), numpy.intp, len(column))
+        return (lengths >= check._lower) & (lengths <= check._upper)
+    elif isinstance(check, Validator):
+        _validate_array_type(name, values, check.dtype)
+        return (values >= check._lower) & (values <= check._upper)
+    elif isinstance(check, Domain):
+        _validate_array_type(name, values, int)
+        return check._valid_mask(values)
+    elif isinstance(check, IntervalSet):
+        _validate_array_type(name, values, check.dtype)
+        return check._valid_mask(values)
+    valid = numpy.ones(len(values), dtype=bool)
+    for row, value in enumerate(column):
+        try:
+            check(value, name=name)
+        except (RangeError, ex):
+            valid[row] = False
+    return valid
+
+
+# Whether checked() validates the arguments: disabled when running Python
+# with -O or with the environment variable RANGEFORCE_DISABLE_CHECKS set to
+# a non-empty value, making the decorated functions the original ones.
+CHECKS_ENABLED = __debug__ and not os.environ.get('RANGEFORCE_DISABLE_CHECKS')
+
+
+def checked(_function=None, *, _ex=RangeError, **specs):
+    """Decorator validating the arguments of a function.
+
+    The parameters to validate and their specification are given as keyword
+    arguments, in any of the forms accepted by RecordValidator, or as
+    typing.Annotated hints with a Range, Length or Validator in their
+    metadata. The parameter names are used as names in the error messages.
+
+    The signature is inspected only once, at decoration time, so each call
+    costs little more than the validations themselves. Default values of the
+    parameters are not validated. If CHECKS_ENABLED is false (Python run with
+    -O or the RANGEFORCE_DISABLE_CHECKS environment variable set), the
+    original function is returned undecorated, costing nothing at all.
+
+    The own arguments of the decorator are prefixed with an underscore, so
+    parameters of any other name, including function and ex, can be
+    specified.
+
+    Args:
+        _function: the function to decorate, when used without arguments as
+                   @checked
+        _ex: exception type to throw in case an argument is out of range,
+             for the arguments specified as tuples, Range, helpers or Length
+        **specs: mapping of the parameter names to their specification
+
+    Returns:
+        the decorated function or, when called with specifications only, the
+        decorator
+
+    Raises:
+        TypeError: if a specification is not supported or names a parameter
+                   that does not exist or is variadic (*args, **kwargs)
+
+    Examples:
+            >>> @checked(port=uint16, timeout=(0, 60))
+            ... def connect(host, port, timeout=10):
+            ...     pass
+            >>> connect('localhost', 70000)
+            rangeforce.RangeError: port must be in range [0, 65535]. 70000
+            found instead.
+            >>> @checked
+            ... def set_level(level: Annotated[int, Range(0, 255)]):
+            ...     pass
+            >>> set_level(level=300)
+            rangeforce.RangeError: level must be in range [0, 255]. 300
+            found instead.
+    """
+    if _function is None:
+        return functools.partial(checked, _ex=_ex, **specs)
+    elif not CHECKS_ENABLED:
+        return _function
+    import inspect
+
+    specs = dict(_annotated_specs(_function), **specs)
+    parameters = list(inspect.signature(_function).parameters.values())
+    positions = {parameter.name: index
+                 for index, parameter in enumerate(parameters)
+                 if parameter.kind in (parameter.POSITIONAL_ONLY,
+                                       parameter.POSITIONAL_OR_KEYWORD)}
+    keywords = {parameter.name for parameter in parameters
+                if parameter.kind != parameter.VAR_POSITIONAL
+                and parameter.kind != parameter.VAR_KEYWORD}
+    checks = []
+    for name, spec in specs.items():
+        if name not in keywords:
+            raise TypeError(
+                '{:}() has no checkable parameter {:}.'.format(
+                    _function.__name__, name)
+            )
+        checks.append((positions.get(name, sys.maxsize), name,
+                       _argument_check(spec, name, _ex)))
+
+    @functools.wraps(_function)
+    def wrapper(*args, **kwargs):
+        for position, name, check in checks:
+            if position < len(args):
+                check(args[position])
+            elif name in kwargs:
+                check(kwargs[name])
+        return _function(*args, **kwargs)
+
+    return wrapper
+
+
+def _annotated_specs(function):
+    import typing
+
+    try:
+        hints = typing.get_type_hints(function, include_extras=True)
+    except (NameError, TypeError):
+        hints = getattr(function, '__annotations__', {})
+    specs = {}
+    for name, hint in hints.items():
+        for item in getattr(hint, '__metadata__', ()):
+            if isinstance(item, (Range, Length, Validator)):
+                specs[name] = item
+    return specs
+
+
+def _argument_check(spec, name, ex):
+    # Compiled specification as callable with the value as only argument.
+    check = _compile_spec(spec, name, ex)
+    if isinstance(check, Validator):
+        return check
+    elif isinstance(check, Length):
+        def check_length(sized):
+            if not check._lower <= len(sized) <= check._upper:
+                check._reject(sized, name, ex)
+            return sized
+
+        return check_length
+    return functools.partial(check, name=name)
+
+
+class FieldReport(object):
+    """Validation results of a single named value, part of a
+    ValidationReport.
+
+    Attributes:
+        checked: number of values checked
+        failed: number of invalid values
+        examples: list of (index, value, exception) tuples of the first
+                  invalid values, up to the maximum number of examples of the
+                  report
+        ranges: indices of all invalid values, as sorted list of
+                [start, stop) tuples of consecutive indices
+    """
+    __slots__ = ('checked', 'failed', 'examples', 'ranges')
+
+    def __init__(self):
+        self.checked = 0
+        self.failed = 0
+        self.examples = []
+        self.ranges = []
+
+    def __repr__(self):
+        return '{:}(checked={!r}, failed={!r}, ranges={!r})'.format(
+            type(self).__name__, self.checked, self.failed, self.ranges)
+
+    def _add_failure(self, index, value, error, max_examples):
+        self.failed += 1
+        if len(self.examples) < max_examples:
+            self.examples.append((index, value, error))
+        self._add_range(index, index + 1)
+
+    def _add_range(self, start, stop):
+        ranges = self.ranges
+        if not ranges or ranges[-1][1] < start:
+            ranges.append((start, stop))
+        elif ranges[-1][1] == start:
+            ranges[-1] = (ranges[-1][0], stop)
+        else:
+            # Out of order: merged with the neighbouring ranges it touches.
+            position = bisect.bisect_right(ranges, (start, math.inf))
+            low = high = position
+            if position and ranges[position - 1][1] >= start:
+                low -= 1
+                start = ranges[low][0]
+                stop = builtins.max(stop, ranges[low][1])
+            while high < len(ranges) and ranges[high][0] <= stop:
+                stop = builtins.max(stop, ranges[high][1])
+                high += 1
+            ranges[low:high] = [(start, stop)]
+
+
+class ValidationReport(object):
+    """Collects all validation failures in a single pass instead of raising
+    on the first one.
+
+    Validations run through the report with check(), check_each() or
+    check_array() using the regular Rangeforce functions; the exceptions they
+    raise are caught and recorded per name, so the messages are exactly the
+    ones the functions would have raised. Only the first few offending values
+    are kept with their messages, while the indices of all of them are stored
+    compactly as ranges of consecutive indices.
+
+    Args:
+        max_examples: maximum number of invalid values, with their exception,
+                      stored for each name
+
+    Examples:
+            >>> report = ValidationReport()
+            >>> report.check_each(limited, [1, 30, 40, 2, 50], 0, 24,
+            ...                   name='Hours')
+            False
+            >>> report.fields['Hours'].ranges
+            [(1, 3), (4, 5)]
+            >>> print(report)
+            Hours: 3 of 5 values invalid at indices 1-2, 4. Hours must be in
+            range [0, 24]. 30 found instead.
+    """
+
+    def __init__(self, max_examples=10):
+        self.max_examples = max_examples
+        self.fields = {}
+
+    @property
+    def ok(self):
+        """True if no invalid values have been found."""
+        return not any(field.failed for field in self.fields.values())
+
+    @property
+    def failed(self):
+        """Total number of invalid values found."""
+        return sum(field.failed for field in self.fields.values())
+
+    def check(self, function, value, *args, name='Value', index=None,
+              **kwargs):
+        """Validates a single value, recording the failure instead of raising.
+
+        Args:
+            function: Rangeforce function to validate the value with, such as
+                      limited, exactly, limited_len or uint16
+            value: the value to be validated, passed as first argument
+            *args: further positional arguments of the function (e.g. min and
+                   max of limited)
+            name: name of the value, passed to the function and used as key
+                  in the report
+            index: index of the value, by default the number of values
+                   checked so far with the same name
+            **kwargs: further keyword arguments of the function
+
+        Returns:
+            True if the value is valid, False otherwise.
+        """
+        field = self._field(name)
+        if index is None:
+            index = field.checked
+        field.checked += 1
+        try:
+            function(value, *args, name=name, **kwargs)
+        except kwargs.get('ex', RangeError) as error:
+            field._add_failure(index, value, error, self.max_examples)
+            return False
+        return True
+
+    def check_each(self, function, values, *args, name='Value', start=0,
+                   **kwargs):
+        """Validates every item of an iterable in one pass, recording the
+        failures instead of raising.
+
+        For limited() and the integer helpers, the bounds are validated only
+        once for the whole batch.
+
+        Args:
+            function: Rangeforce function to validate each item with, such as
+                      limited, exactly, limited_len or uint16
+            values: iterable of the values to be validated
+            *args: further positional arguments of the function (e.g. min and
+                   max of limited)
+            name: name of the values, passed to the function and used as key
+                  in the report
+            start: index of the first item
+            **kwargs: further keyword arguments of the function
+
+        Returns:
+            True if all values are valid, False otherwise.
+        """
+        field = self._field(name)
+        ex = kwargs.get('ex', RangeError)
+        if function is limited:
+            validator = Validator(*args, name=name, **kwargs)
+        elif function in _INTEGER_HELPER_BOUNDS and not args:
+            validator = Validator(*_INTEGER_HELPER_BOUNDS[function],
+                                  name=name, dtype=int, ex=ex)
+        else:
+            def validator(value):
+                return function(value, *args, name=name, **kwargs)
+        failed = field.failed
+        count = 0
+        try:
+            for count, value in enumerate(values, 1):
+                try:
+                    validator(value)
+                except ex as error:
+                    field._add_failure(start + count - 1, value, error,
+                                       self.max_examples)
+        finally:
+            # Also counted if another exception escapes.
+            field.checked += count
+        return field.failed == failed
+
+    def check_array(self, array, min, max, name='Value', dtype=None,
+                    ex=RangeError):
+        """Validates all elements of an array as limited_array() does, in a
+        vectorized single pass, recording the failures instead of raising.
+
+        Requires NumPy. The array is flattened and indices refer to the
+        flattened array.
+
+        Returns:
+            True if all elements are valid, False otherwise.
+        """
+        _validate_interval(min, max)
+        array = _as_ndarray(array).ravel()
+        _validate_array_type(name, array, dtype)
+        field = self._field(name)
+        valid = numpy.ones(array.shape, dtype=bool)
+        if min is not None:
+            valid &= array >= min
+        if max is not None:
+            valid &= array <= max
+        invalid = numpy.flatnonzero(~valid)
+        offset = field.checked
+        field.checked += array.size
+        if not invalid.size:
+            return True
+        for index in invalid[:builtins.max(
+                0, self.max_examples - len(field.examples))]:
+            value = array[index].item()
+            try:
+                limited(value, min, max, name, ex=ex)
+            except ex as error:
+                field.examples.append((offset + int(index), value, error))
+        breaks = numpy.flatnonzero(numpy.diff(invalid) != 1) + 1
+        starts = invalid[numpy.concatenate(([0], breaks))]
+        stops = invalid[numpy.concatenate((breaks - 1, [-1]))] + 1
+        for start, stop in zip(starts.tolist(), stops.tolist()):
+            field._add_range(offset + start, offset + stop)
+        field.failed += invalid.size
+        return False
+
+    def raise_first(self):
+        """Raises the first recorded exception, if any."""
+        for field in self.fields.values():
+            if field.examples:
+                raise field.examples[0][2]
+
+    def __str__(self):
+        lines = []
+        for name, field in self.fields.items():
+            if not field.failed:
+                continue
+            indices = ', '.join(
+                str(start) if stop == start + 1
+                else '{:}-{:}'.format(start, stop - 1)
+                for start, stop in field.ranges)
+            lines.append('{:}: {:} of {:} values invalid at indices {:}. '
+                         '{:}'.format(name, field.failed, field.checked,
+                                      indices, field.examples[0][2]
+                                      if field.examples else ''))
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return '{:}({!r})'.format(type(self).__name__, self.fields)
+
+    def _field(self, name):
+        try:
+            return self.fields[name]
+        except KeyError:
+            field = self.fields[name] = FieldReport()
+            return field
+
+
+class Registry(object):
+    """Named validators loaded from a configuration file.
+
+    Keeps the limits of an application in one JSON, TOML or INI file
+    instead of the code. All specifications are compiled into validators
+    when loading, which runs all sanity checks of the intervals, so invalid
+    configurations fail at startup rather than at the first validation. The
+    validators are then looked up by name in a dictionary.
+
+    The file can be reloaded at runtime, e.g. to tune the limits without
+    restarting: the new validators are compiled aside and swapped in with a
+    single assignment, so concurrent lookups see either all old or all new
+    validators. If the new file is invalid, the old validators are kept.
+
+    Specifications in JSON and TOML files are objects of names, each one
+    with either:
+
+    - a string: a helper name as "uint16" or a range as "0:24", "0.5:" or
+      ":100", as in the command line;
+    - a [min, max] or [min, max, dtype] list, with null for unbounded
+      extremes in JSON and dtype one of "int", "float";
+    - a table of: min, max and dtype, with absent keys for unbounded
+      extremes; width for the bounds of a fixed-width helper; values (and
+      optionally width) for a Domain; intervals (and optionally dtype) for
+      an IntervalSet; length as [min, max] or exact integer for the length
+      checks of limited_len() and exact_len().
+
+    INI files have any sections, each option being a name with a string
+    specification as value, e.g. "Hours of sleep = 0:24".
+
+    Args:
+        path: optional file to load immediately. Its format is inferred from
+              the extension: .json, .toml (Python 3.11 or the tomli package
+              required), .ini or .cfg.
+        ex: exception type to throw in case a value is out of range
+
+    Raises:
+        ValueError: if any specification is invalid.
+        OSError: if the file cannot be read.
+
+    Examples:
+            >>> limits = Registry('limits.toml')
+            >>> limits['Hours of sleep'](8)
+            8
+            >>> limits['Hours of sleep'](25)
+            rangeforce.RangeError: Hours of sleep must be in range [0, 24].
+            25 found instead.
+            >>> limits.reload_if_changed()
+            False
+    """
+
+    def __init__(self, path=None, ex=RangeError):
+        self.path = path
+        self.ex = ex
+        self._checks = {}
+        self._stamp = None
+        if path is not None:
+            self.load(path)
+
+    def __getitem__(self, name):
+        return self._checks[name]
+
+    def __contains__(self, name):
+        return name in self._checks
+
+    def __iter__(self):
+        return iter(self._checks)
+
+    def __len__(self):
+        return len(self._checks)
+
+    def __repr__(self):
+        return '{:}({!r}, names={:})'.format(type(self).__name__, self.path,
+                                             len(self._checks))
+
+    def load(self, path):
+        """Replaces all validators with the ones specified in a file.
+
+        Args:
+            path: the JSON, TOML, INI file with the specifications
+
+        Raises:
+            ValueError: if any specification is invalid or the file format
+                        is unknown.
+            OSError: if the file cannot be read.
+        """
+        stamp = _file_stamp(path)
+        self.update(_read_specs(path), replace=True)
+        self.path = path
+        self._stamp = stamp
+
+    def update(self, specs, replace=False):
+        """Adds or replaces validators from a dictionary of specifications.
+
+        Args:
+            specs: dictionary of names and specifications, in the formats of
+                   the JSON files or any specification accepted by
+                   RecordValidator
+            replace: whether to drop all current validators
+
+        Raises:
+            ValueError: if any specification is invalid.
+        """
+        checks = {} if replace else dict(self._checks)
+        for name, spec in specs.items():
+            try:
+                checks[name] = _compile_registry_spec(spec, name, self.ex)
+            except (TypeError, ValueError) as error:
+                raise ValueError(
+                    'Invalid specification of {:}: {:}'.format(name, error))
+        self._checks = checks  # Atomic swap.
+
+    def reload(self):
+        """Loads again the file the validators were loaded from.
+
+        Raises:
+            ValueError: if any specification is invalid or no file was
+                        loaded.
+            OSError: if the file cannot be read.
+        """
+        if self.path is None:
+            raise ValueError('No file to reload.')
+        self.load(self.path)
+
+    def reload_if_changed(self):
+        """Loads again the file, if modified since it was loaded.
+
+        Cheap enough to be called periodically, e.g. once per request batch,
+        as it only compares the modification time and size of the file.
+
+        Returns:
+            True if the file was reloaded, False otherwise
+
+        Raises:
+            ValueError: if any specification is invalid or no file was
+                        loaded.
+            OSError: if the file cannot be read.
+        """
+        if self.path is None:
+            raise ValueError('No file to reload.')
+        if _file_stamp(self.path) == self._stamp:
+            return False
+        self.load(self.path)
+        return True
+
+
+# Default registry, empty until a file is loaded with registry.load().
+registry = Registry()
+
+_DTYPE_NAMES = {'int': int, 'float': float}
+
+
+def _file_stamp(path):
+    status = os.stat(path)
+    return status.st_mtime_ns, status.st_size
+
+
+def _read_specs(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.json':
+        import json
+
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    elif extension == '.toml':
+        try:
+            import tomllib
+        except ImportError:
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ImportError('TOML files require Python 3.11 or the '
+                                  'tomli package.')
+        with open(path, 'rb') as file:
+            return tomllib.load(file)
+    elif extension in ('.ini', '.cfg'):
+        import configparser
+
+        parser = configparser.ConfigParser(delimiters=('=',),
+                                           interpolation=None)
+        parser.optionxform = str  # Names are case sensitive.
+        with open(path, encoding='utf-8') as file:
+            parser.read_file(file)
+        specs = {}
+        for section in parser.sections():
+            for name, spec in parser.items(section):
+                if name in specs:
+                    raise ValueError(
+                        'Duplicate specification of {:}.'.format(name))
+                specs[name] = spec
+        return specs
+    raise ValueError(
+        'File format must be one of .json, .toml, .ini, .cfg. {!r} found '
+        'instead.'.format(extension))
+
+
+def _compile_registry_spec(spec, name, ex):
+    # Callable with the value as only argument.
+    if isinstance(spec, str):
+        spec = _parse_spec_text(spec, name, ex)
+    elif isinstance(spec, list) and len(spec) in (2, 3):
+        spec = Range(spec[0], spec[1], _registry_dtype(
+            spec[2] if len(spec) == 3 else None))
+    elif isinstance(spec, dict):
+        spec = _registry_table_spec(spec, name, ex)
+    return _argument_check(spec, name, ex)
+
+
+def _registry_table_spec(table, name, ex):
+    keys = frozenset(table)
+    if keys <= {'min', 'max', 'dtype'}:
+        return Range(table.get('min'), table.get('max'),
+                     _registry_dtype(table.get('dtype')))
+    elif keys == {'width'}:
+        min, max = _width_bounds(table['width'])
+        return Validator(min, max, name, int, ex)
+    elif keys <= {'values', 'width'} and 'values' in keys:
+        return Domain(table['values'], name, table.get('width'), ex)
+    elif keys <= {'intervals', 'dtype'} and 'intervals' in keys:
+        return IntervalSet(table['intervals'], name,
+                           _registry_dtype(table.get('dtype')), ex)
+    elif keys == {'length'} and isinstance(table['length'], list):
+        return Length(*table['length'])
+    elif keys == {'length'}:
+        return Length(expected=table['length'])
+    raise ValueError('Unknown combination of keys {:}.'.format(
+        ', '.join(sorted(keys))))
+
+
+def _registry_dtype(dtype):
+    if dtype is None:
+        return None
+    elif dtype not in _DTYPE_NAMES:
+        raise ValueError('Data type must be one of {:}. {!r} found '
+                         'instead.'.format(', '.join(_DTYPE_NAMES), dtype))
+    return _DTYPE_NAMES[dtype]
+
+
+class _Stats(object):
+    # Aggregated counters of the instrumented functions, see enable_stats().
+
+    def __init__(self):
+        import threading
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.counters = {}
+
+    @property
+    def busy(self):
+        # True while measuring a call in this thread, so nested calls of
+        # instrumented functions are not measured again.
+        return getattr(self._local, 'busy', False)
+
+    def measure(self, function, name, *args):
+        self._local.busy = True
+        failed = True
+        start = time.perf_counter()
+        try:
+            result = function(*args)
+            failed = False
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            self._local.busy = False
+            key = (function.__name__, name)
+            with self._lock:
+                counter = self.counters.get(key)
+                if counter is None:
+                    counter = self.counters[key] = [0, 0, 0.0]
+                counter[0] += 1
+                counter[1] += failed
+                counter[2] += elapsed
+
+
+_stats = None
+
+
+def enable_stats():
+    """Starts collecting statistics about the validations.
+
+    Once enabled, every call of limited(), exactly(), limited_len(),
+    exact_len() and of the fixed-width and sign helpers is counted per
+    function and value name, together with the failed calls (raising any
+    exception) and the cumulative time spent. Collection is thread-safe.
+    While disabled, which is the default, the only cost is one check of a
+    global variable per call.
+
+    Enabling again keeps the statistics collected so far.
+    """
+    global _stats
+    if _stats is None:
+        _stats = _Stats()
+
+
+def disable_stats():
+    """Stops collecting statistics about the validations and discards them."""
+    global _stats
+    _stats = None
+
+
+def stats_snapshot():
+    """Returns a copy of the statistics collected since enable_stats().
+
+    Returns:
+        a dictionary mapping each function name to a dictionary mapping each
+        value name to a dictionary with the number of 'calls', of 'failures'
+        and the cumulative 'seconds'. Empty if the statistics are disabled.
+
+    Examples:
+            >>> enable_stats()
+            >>> uint8(300, name='Distance')
+            rangeforce.RangeError: Distance must be in range [0, 255]. 300
+            found instead.
+            >>> stats_snapshot()
+            {'uint8': {'Distance': {'calls': 1, 'failures': 1,
+            'seconds': 1.9e-06}}}
+    """
+    stats = _stats
+    snapshot = {}
+    if stats is None:
+        return snapshot
+    with stats._lock:
+        counters = list(stats.counters.items())
+    for (function, name), (calls, failures, seconds) in counters:
+        snapshot.setdefault(function, {})[name] = {
+            'calls': calls,
+            'failures': failures,
+            'seconds': seconds,
+        }
+    return snapshot
+
+
+def write_stats_prometheus(path):
+    """Writes the statistics collected since enable_stats() to a file in the
+    Prometheus text exposition format.
+
+    The file is replaced atomically, so it can be read at any time, for
+    example by the textfile collector of the Prometheus node exporter. The
+    metrics are rangeforce_calls_total, rangeforce_failures_total and
+    rangeforce_seconds_total, labelled by function and value name.
+
+    Args:
+        path: the file to write
+    """
+    metrics = [
+        ('calls', 'Number of validations.'),
+        ('failures', 'Number of failed validations.'),
+        ('seconds', 'Cumulative time spent validating, in seconds.'),
+    ]
+    snapshot = stats_snapshot()
+    lines = []
+    for metric, description in metrics:
+        lines.append('# HELP rangeforce_{:}_total {:}'.format(metric,
+                                                               description))
+        lines.append('# TYPE rangeforce_{:}_total counter'.format(metric))
+        for function, names in sorted(snapshot.items()):
+            for name, counters in sorted(names.items()):
+                lines.append(
+                    'rangeforce_{:}_total{{function="{:}",name="{:}"}} '
+                    '{!r}'.format(metric, function, _prometheus_escape(name),
+                                  counters[metric]))
+    temporary = '{:}.{:}.tmp'.format(path, os.getpid())
+    with open(temporary, 'w') as file:
+        file.write('\n'.join(lines) + '\n')
+    os.replace(temporary, path)
+
+
+def _prometheus_escape(label):
+    return (str(label).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def main(argv=None):
+    """Command line interface validating columns of CSV or JSON-lines files.
+
+    Run as `python -m rangeforce`, see `python -m rangeforce --help`. The file
+    is read in chunks of rows, so arbitrarily large files are validated in
+    constant memory. Each column is validated with a fixed-width or sign
+    helper name (e.g. `--col port=uint16`) or a `min:max` interval, where
+    either extreme can be empty for an unbounded one
+    (e.g. `--col temp=-40:125`, `--col count=0:`).
+
+    Args:
+        argv: command line arguments, defaults to sys.argv[1:]
+
+    Returns:
+        the exit code: 0 if all values are valid, 1 if any is not, 2 on
+        usage errors or unreadable input.
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='python -m rangeforce',
+        description='Validates the range of columns of CSV or JSON-lines '
+                    'files in constant memory.')
+    parser.add_argument('file', help='file to validate, "-" for stdin')
+    parser.add_argument('--col', '-c', action='append', required=True,
+                        type=_parse_column_argument, dest='columns',
+                        metavar='NAME=SPEC',
+                        help='column and its range: a helper name such as '
+                             'uint16 or positive_int, or MIN:MAX with '
+                             'either extreme optionally empty')
+    parser.add_argument('--format', '-f', choices=('csv', 'jsonl'),
+                        help='input format, inferred from the file '
+                             'extension by default')
+    parser.add_argument('--delimiter', '-d', default=',',
+                        help='CSV field delimiter (default: ",")')
+    parser.add_argument('--chunk-size', '-n', type=_parse_chunk_size,
+                        default=10000,
+                        help='rows read and validated at once '
+                             '(default: 10000)')
+    parser.add_argument('--all', '-a', action='store_true',
+                        help='report all invalid rows instead of stopping '
+                             'at the first one')
+    parser.add_argument('--quiet', '-q', action='store_true',
+                        help='do not print the throughput')
+    args = parser.parse_args(argv)
+    file_format = args.format or (
+        'jsonl' if args.file.endswith(('.jsonl', '.ndjson')) else 'csv')
+    report = ValidationReport() if args.all else None
+    start = time.perf_counter()
+    rows = 0
+    read_chunks = (_read_csv_chunks if file_format == 'csv'
+                   else _read_jsonl_chunks)
+    file = None
+    try:
+        file = sys.stdin if args.file == '-' else open(args.file, newline='')
+        for chunk in read_chunks(file, args, [c for c, _ in args.columns]):
+            if report is not None:
+                for values, (column, validator) in zip(chunk, args.columns):
+                    report.check_each(_cli_check, values, validator,
+                                      name=column, start=rows + 1)
+            else:
+                failure = _first_cli_failure(chunk, args.columns)
+                if failure is not None:
+                    index, column, error = failure
+                    rows += index
+                    raise RangeError('Row {:}, column {:}: {:}'.format(
+                        rows + 1, column, error))
+            rows += len(chunk[0])
+    except RangeError as error:
+        _print_throughput(args, rows, start)
+        print(error, file=sys.stderr)
+        return 1
+    except (OSError, ValueError) as error:
+        print('Error: {:}'.format(error), file=sys.stderr)
+        return 2
+    finally:
+        if file is not None and file is not sys.stdin:
+            file.close()
+    _print_throughput(args, rows, start)
+    if report is not None and not report.ok:
+        print(report, file=sys.stderr)
+        return 1
+    return 0
+
+
+def _print_throughput(args, rows, start):
+    elapsed = time.perf_counter() - start
+    if not args.quiet:
+        print('Validated {:} rows in {:.3f} s ({:.0f} rows/s).'.format(
+            rows, elapsed, rows / elapsed if elapsed else math.inf),
+            file=sys.stderr)
+
+
+def _parse_chunk_size(text):
+    import argparse
+
+    try:
+        return positive_int(int(text), name='Chunk size',
+                            ex=argparse.ArgumentTypeError)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            'Chunk size must be an integer. {!r} found instead.'.format(text))
+
+
+def _parse_column_argument(text):
+    import argparse
+
+    column, separator, spec = text.partition('=')
+    try:
+        if not column or not separator:
+            raise ValueError('Expected NAME=SPEC. {!r} found instead.'.format(
+                text))
+        return column, _parse_spec_text(spec, column, RangeError)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error))
+
+
+def _parse_spec_text(spec, name, ex):
+    # Validator from a helper name, e.g. 'uint16', or MIN:MAX with optional
+    # extremes, e.g. '0:24' or '0.5:'.
+    for helper, (min, max) in _INTEGER_HELPER_BOUNDS.items():
+        if helper.__name__ == spec:
+            return Validator(min, max, name, int, ex)
+    low, separator, high = spec.partition(':')
+    if not separator:
+        raise ValueError(
+            'Range must be a helper name or MIN:MAX. {!r} found '
+            'instead.'.format(spec))
+    return Validator(_parse_number(low) if low else None,
+                     _parse_number(high) if high else None, name, None, ex)
+
+
+def _parse_number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _read_csv_chunks(file, args, columns):
+    # Yields the chunks as lists of column values, in the order of columns.
+    import csv
+    reader = csv.reader(file, delimiter=args.delimiter)
+    header = next(reader, [])
+    missing = [column for column in columns if column not in header]
+    if missing:
+        raise ValueError('Columns not found in the header: {:}.'.format(
+            ', '.join(missing)))
+    positions = [header.index(column) for column in columns]
+    width = builtins.max(positions) + 1
+    rows = (row for row in reader if row)  # Blank lines are skipped.
+    first_row = 1
+    while True:
+        chunk = list(itertools.islice(rows, args.chunk_size))
+        if not chunk:
+            return
+        try:
+            yield [[row[position] for row in chunk] for position in positions]
+        except IndexError:
+            for number, row in enumerate(chunk, first_row):
+                if len(row) < width:
+                    raise ValueError(
+                        'Row {:} has {:} fields, at least {:} expected.'
+                        .format(number, len(row), width))
+        first_row += len(chunk)
+
+
+def _read_jsonl_chunks(file, args, columns):
+    import json
+
+    lines = (line for line in file if line.strip())
+    while True:
+        rows = [json.loads(line) for line in
+                itertools.islice(lines, args.chunk_size)]
+        if not rows:
+            return
+        try:
+            yield [[row[column] for row in rows] for column in columns]
+        except KeyError as error:
+            raise ValueError('Column {:} missing in a row.'.format(error))
+
+
+def _first_cli_failure(chunk, columns):
+    # Index in the chunk, column and error of the first invalid value in row
+    # order, None if all are valid. Each column is scanned only up to the
+    # first failure found so far.
+    failure = None
+    for values, (column, validator) in zip(chunk, columns):
+        stop = len(values) if failure is None else failure[0]
+        for index in range(stop):
+            try:
+                _cli_check(values[index], validator, column)
+            except RangeError as error:
+                failure = index, column, error
+                break
+    return failure
+
+
+def _cli_check(value, validator, name):
+    # Unparsable values and wrong types are reported as invalid values, both
+    # in fail-fast and in report mode.
+    if isinstance(value, str):
+        try:
+            value = _parse_number(value)
+        except ValueError:
+            raise RangeError('{:} must be a number. {!r} found instead.'
+                             .format(name, value))
+    try:
+        return validator(value)
+    except TypeError as error:
+        raise RangeError(str(error))
+
+
+def limited_parallel(buffer, min, max, name='Value', format=None,
+                     ex=RangeError, workers=None, chunk_size=None):
+    """Validates that all elements of a large buffer are within the
+    [min, max] interval, using multiple processes.
+
+    Multi-core counterpart of limited_array() and limited_buffer(). The
+    worker processes attach to a block of shared memory by name, so the data
+    is never pickled. Each worker scans its chunks and the results are merged
+    in the order of the chunks, so the reported element is always the first
+    offending one of the whole buffer, regardless of scheduling.
+
+    Data already in a multiprocessing.shared_memory.SharedMemory block is
+    validated without any copy, by passing the block itself as buffer. Any
+    other buffer is copied once into a temporary block, as a fallback.
+
+    Worth it only for very large buffers: starting the processes costs
+    far more than validating a few million elements in a single one.
+    Requires Python 3.8 or later, for multiprocessing.shared_memory.
+
+    Args:
+        buffer: SharedMemory block, NumPy array or object supporting the
+                buffer protocol whose elements are to be validated to be
+                within [min, max]
+        min: smallest acceptable value. Can be None if max is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be <= max.
+        max: greatest acceptable value. Can be None if min is not None.
+             Can be +inf, -inf. Cannot be NaN. Must be >= min.
+        name: customizable name of the buffer that appears in the error
+              message
+        format: optional native struct format code the buffer is interpreted
+                as. Defaults to the buffer's own format.
+        ex: exception type to throw in case a value is out of range
+        workers: number of worker processes, defaults to the number of CPUs
+        chunk_size: number of elements validated by a worker at once,
+                    defaults to splitting the buffer in 4 chunks per worker
+
+    Returns:
+        the given buffer if all elements are within [min, max]
+
+    Raises:
+        RangeError or type(ex): if any element is not within the acceptable
+                                range.
+        ValueError: if the min, max extremes are not valid (e.g. both None,
+                    min greater than max, NaN etc.) or the worker count or
+                    chunk size are not positive.
+    """
+    _validate_interval(min, max)
+    results = _run_parallel(buffer, format, min, max, False, workers,
+                            chunk_size)
+    offending = [index for index in results if index is not None]
+    if offending:
+        index = builtins.min(offending)
+        position = index
+        if (numpy is not None and isinstance(buffer, numpy.ndarray)
+                and buffer.ndim > 1):
+            position = numpy.unravel_index(index, buffer.shape)
+        view = _parallel_view(buffer, format)
+        try:
+            limited(view[index], min, max, _indexed_name(name, position),
+                    ex=ex)
+        finally:
+            view.release()
+    return buffer
+
+
+def clip_parallel(buffer, min, max, format=None, workers=None,
+                  chunk_size=None):
+    """Clips (limits) all elements of a large buffer to the given limits, in
+    place, using multiple processes.
+
+    Multi-core counterpart of clip_buffer(). A SharedMemory block, passed as
+    buffer, is clipped directly by the worker processes. Any other buffer is
+    copied once into a temporary block of shared memory, clipped there
+    (without pickling the data) and copied back, as a fallback.
+    Requires Python 3.8 or later, as limited_parallel().
+
+    Args:
+        buffer: SharedMemory block or writable NumPy array or object
+                supporting the buffer protocol whose elements are to be
+                limited to [min, max]
+        min: smallest acceptable value
+        max: greatest acceptable value
+        format: optional native struct format code the buffer is interpreted
+                as. Defaults to the buffer's own format.
+        workers: number of worker processes, defaults to the number of CPUs
+        chunk_size: number of elements clipped by a worker at once, defaults
+                    to splitting the buffer in 4 chunks per worker
+
+    Returns:
+        the number of elements that were smaller than min or greater than max
+        and have thus been saturated
+
+    Raises:
+        TypeError: if the buffer is read-only.
+        ValueError: if the worker count or chunk size are not positive.
+    """
+    return sum(_run_parallel(buffer, format, min, max, True, workers,
+                             chunk_size))
+
+
+def _run_parallel(buffer, format, min, max, clip, workers, chunk_size):
+    # Runs the chunks in a process pool, returning the per-chunk results in
+    # order. The workers attach to the given SharedMemory block or, for any
+    # other buffer, to a temporary copy of it.
+    from multiprocessing import shared_memory
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    positive_int(workers, 'Worker count', ex=ValueError)
+    source = _parallel_view(buffer, format)
+    try:
+        if clip and source.readonly:
+            raise TypeError('Buffer to be clipped must be writable.')
+        length = len(source)
+        if not length:
+            return []
+        if chunk_size is None:
+            chunk_size = -(-length // (workers * 4))
+        positive_int(chunk_size, 'Chunk size', ex=ValueError)
+        bounds = [(start, builtins.min(start + chunk_size, length))
+                  for start in range(0, length, chunk_size)]
+        if isinstance(buffer, shared_memory.SharedMemory):
+            return _run_parallel_pool(buffer.name, source.format, bounds,
+                                      min, max, clip, workers)
+        shared = shared_memory.SharedMemory(create=True, size=source.nbytes)
+        try:
+            target = shared.buf[:source.nbytes].cast(source.format)
+            try:
+                target[:] = source
+                results = _run_parallel_pool(shared.name, source.format,
+                                             bounds, min, max, clip, workers)
+                if clip:
+                    source[:] = target
+            finally:
+                target.release()
+        finally:
+            shared.close()
+            shared.unlink()
+        return results
+    finally:
+        source.release()
+
+
+def _parallel_view(buffer, format):
+    # Flat view of the elements of a buffer or of a whole SharedMemory block.
+    from multiprocessing import shared_memory
+
+    if isinstance(buffer, shared_memory.SharedMemory):
+        buffer = buffer.buf
+    return _flat_view(buffer, format)
+
+
+def _run_parallel_pool(shared_name, format, bounds, min, max, clip, workers):
+    from concurrent.futures import ProcessPoolExecutor
+
+    tasks = [(shared_name, format, start, stop, min, max, clip)
+             for start, stop in bounds]
+    with ProcessPoolExecutor(builtins.min(workers, len(tasks))) as pool:
+        return list(pool.map(_run_parallel_chunk, tasks))
+
+
+def _run_parallel_chunk(task):
+    # Worker side of _run_parallel(): index of the first offending element
+    # of the chunk (None if all valid) or number of clipped elements.
+    from multiprocessing import shared_memory
+
+    shared_name, format, start, stop, min, max, clip = task
+    shared = shared_memory.SharedMemory(name=shared_name)
+    try:
+        itemsize = struct.calcsize(format)
+        view = shared.buf[start * itemsize:stop * itemsize].cast(format)
+        try:
+            if numpy is not None:
+                chunk = numpy.frombuffer(view, dtype=format)
+                if clip:
+                    result = _clip_ndarray(chunk, min, max, None)
+                else:
+                    valid = numpy.ones(chunk.shape, dtype=bool)
+                    if min is not None:
+                        valid &= chunk >= min
+                    if max is not None:
+                        valid &= chunk <= max
+                    result = None if valid.all() else int(
+                        numpy.argmin(valid))
+                del chunk
+            elif clip:
+                result = clip_buffer(view, min, max)
+            else:
+                result = _first_out_of_range(view, min, max)
+        finally:
+            view.release()
+    finally:
+        shared.close()
+    if not clip and result is not None:
+        result += start
+    return result
+
+
+if __name__ == '__main__':
+    sys.exit(main())
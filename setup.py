@@ -40,11 +40,9 @@ setup(
         'License :: OSI Approved :: BSD License',
         'Topic :: Software Development',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
         'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
     ],
-    python_requires='>=3',
+    python_requires='>=3.6',
 )
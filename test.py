@@ -5,11 +5,30 @@
 # Released under the BSD 3-Clause License
 
 """Unit tests of the rangeforce module."""
+import array
+import asyncio
+import contextlib
+import decimal
+import fractions
+import io
 import math
+import os
+import sys
+import tempfile
 import unittest
+import unittest.mock
 
 import rangeforce as rf
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
 
 class TestClip(unittest.TestCase):
     def test_in_range(self):
@@ -108,6 +127,25 @@ class TestUnsignedInts(unittest.TestCase):
             self.assertEqual(i, rf.uint_bits(i, 4))
             self.assertIs(i, rf.uint_bits(i, 4))
 
+    def test_uint_bits_beyond_float_range(self):
+        value = 2 ** 4000 - 1
+        self.assertIs(value, rf.uint_bits(value, 4000))
+        expected_message = 'Value must be in range [0, 255]. ' \
+                           '{:} found instead.'.format(2 ** 2000)
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.uint_bits(2 ** 2000, 8)
+        self.assertEqual(expected_message, str(ex.exception))
+        self.assertRaises(rf.RangeError, rf.uint_bits, -2 ** 4000, 4000)
+        self.assertRaises(rf.RangeError, rf.uint64, 2 ** 4000)
+        self.assertRaises(rf.RangeError, rf.int64, -2 ** 4000)
+        self.assertIs(value, rf.positive_int(value))
+
+    def test_uint_bits_type(self):
+        expected_message = 'Value must be of type int. float found instead.'
+        with self.assertRaises(TypeError) as ex:
+            rf.uint_bits(1.0, 8)
+        self.assertEqual(expected_message, str(ex.exception))
+
 
 class TestSignedInts(unittest.TestCase):
     def test_int8(self):
@@ -371,6 +409,44 @@ class TestLimited(unittest.TestCase):
         with self.assertRaises(TypeError) as ex:
             rf.limited(2.0, 100, 1000, dtype=int, ex=FileNotFoundError)
 
+    def test_integers_beyond_float_range(self):
+        huge = 2 ** 2000
+        self.assertIs(huge, rf.limited(huge, 0, None))
+        self.assertIs(huge, rf.limited(huge, None, huge))
+        self.assertIs(huge, rf.limited(huge, -huge, huge))
+        self.assertRaises(rf.RangeError, rf.limited, huge, 0, 10)
+        self.assertRaises(rf.RangeError, rf.limited, -huge, 0, None)
+
+    def test_decimal(self):
+        self.assertEqual(decimal.Decimal('0.5'),
+                         rf.limited(decimal.Decimal('0.5'), 0, 1))
+        for min, max, interval in [(0, 1, '[0, 1]'), (0, None, '[0, +inf['),
+                                   (None, 1, ']-inf, 1]')]:
+            expected_message = 'Value must be in range {:}. ' \
+                               'NaN found instead.'.format(interval)
+            with self.assertRaises(rf.RangeError) as ex:
+                rf.limited(decimal.Decimal('NaN'), min, max)
+            self.assertEqual(expected_message, str(ex.exception))
+        self.assertRaises(ValueError, rf.limited, 0,
+                          decimal.Decimal('NaN'), None)
+
+    def test_other_ordered_types(self):
+        self.assertEqual(fractions.Fraction(1, 3),
+                         rf.limited(fractions.Fraction(1, 3), 0, 1))
+        self.assertEqual('b', rf.limited('b', 'a', 'c'))
+        expected_message = 'Value must be in range [a, c]. d found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited('d', 'a', 'c')
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_subclass_with_nan(self):
+        class MyFloat(float):
+            pass
+
+        self.assertEqual(0.5, rf.limited(MyFloat(0.5), 0, 1))
+        self.assertRaises(rf.RangeError, rf.limited, MyFloat('nan'), 0, 1)
+        self.assertRaises(rf.RangeError, rf.limited, MyFloat('nan'), 0, None)
+
 
 class TestExact(unittest.TestCase):
     def test_exact(self):
@@ -399,6 +475,16 @@ class TestExact(unittest.TestCase):
     def test_nan_equal_to_nan(self):
         self.assertTrue(math.isnan(rf.exactly(math.nan, math.nan)))
 
+    def test_decimal_and_huge_integers(self):
+        nan = decimal.Decimal('NaN')
+        self.assertIs(nan, rf.exactly(nan, nan))
+        self.assertIs(nan, rf.exactly(nan, math.nan))
+        self.assertRaises(rf.RangeError, rf.exactly, decimal.Decimal(1), nan)
+        self.assertRaises(rf.RangeError, rf.exactly, nan, 1)
+        huge = 2 ** 2000
+        self.assertIs(huge, rf.exactly(huge, huge))
+        self.assertRaises(rf.RangeError, rf.exactly, huge, huge + 1)
+
     def test_custom_value_name(self):
         expected_message = 'HELLO must be exactly NaN. ' \
                            '2 found instead.'
@@ -630,3 +716,1967 @@ class TestExactLen(unittest.TestCase):
         with self.assertRaises(FileNotFoundError) as ex:
             rf.exact_len([2], 100, name='HELLO', ex=FileNotFoundError)
         self.assertEqual(expected_message, str(ex.exception))
+
+
+@unittest.skipIf(np is None, 'NumPy not installed')
+class TestLimitedArray(unittest.TestCase):
+    def test_in_range(self):
+        array = np.arange(100)
+        self.assertIs(array, rf.limited_array(array, 0, 99))
+        self.assertIs(array, rf.limited_array(array, None, 99))
+        self.assertIs(array, rf.limited_array(array, 0, None))
+        self.assertIs(array, rf.limited_array(array, -math.inf, math.inf))
+
+    def test_empty(self):
+        array = np.array([], dtype=float)
+        self.assertIs(array, rf.limited_array(array, 0, 1))
+
+    def test_converts_sequences(self):
+        result = rf.limited_array([1, 2, 3], 0, 3)
+        self.assertIsInstance(result, np.ndarray)
+        self.assertEqual([1, 2, 3], result.tolist())
+
+    def test_out_of_range(self):
+        expected_message = 'Value[2] must be in range [0, 24]. ' \
+                           '50 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_array([1, 2, 50, 70], 0, 24)
+        self.assertEqual(expected_message, str(ex.exception))
+        expected_message = 'Value[1] must be in range ]-inf, 24]. ' \
+                           '50 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_array([1, 50, 2], None, 24)
+        self.assertEqual(expected_message, str(ex.exception))
+        expected_message = 'Value[0] must be in range [0, +inf[. ' \
+                           '-1 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_array([-1, 50, 2], 0, None)
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_multidimensional_index(self):
+        expected_message = 'Hours[1, 0] must be in range [0, 24]. ' \
+                           '40 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_array([[1, 2], [40, 3]], 0, 24, name='Hours')
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_nan(self):
+        expected_message = 'Value[1] must be in range [0, +inf[. ' \
+                           'nan found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_array([1.0, math.nan], 0, None)
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_invalid_interval(self):
+        self.assertRaises(ValueError, rf.limited_array, [1], None, None)
+        self.assertRaises(ValueError, rf.limited_array, [1], 2, 1)
+        self.assertRaises(ValueError, rf.limited_array, [1], math.nan, 1)
+
+    def test_enforce_type(self):
+        rf.limited_array(np.array([1, 2], dtype=np.int8), 0, 2, dtype=int)
+        rf.limited_array(np.array([1.0]), 0, 2, dtype=np.float64)
+        expected_message = 'Value must be of type int. ' \
+                           'float64 found instead.'
+        with self.assertRaises(TypeError) as ex:
+            rf.limited_array(np.array([1.0]), 0, 2, dtype=int)
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_custom_exception_type(self):
+        self.assertRaises(FileNotFoundError, rf.limited_array, [5], 0, 1,
+                          ex=FileNotFoundError)
+
+    def test_fixed_width(self):
+        self.assertEqual(255, rf.uint8_array([0, 255])[1])
+        self.assertRaises(rf.RangeError, rf.uint8_array, [0, 256])
+        self.assertRaises(rf.RangeError, rf.uint16_array, [-1])
+        self.assertRaises(rf.RangeError, rf.uint32_array, [2 ** 32])
+        rf.uint64_array(np.array([2 ** 64 - 1], dtype=np.uint64))
+        self.assertRaises(rf.RangeError, rf.uint_bits_array, [0, 8], 3)
+        rf.uint_bits_array([0, 7], 3)
+        self.assertRaises(rf.RangeError, rf.int8_array, [-129])
+        self.assertRaises(rf.RangeError, rf.int16_array, [2 ** 15])
+        self.assertRaises(rf.RangeError, rf.int32_array, [2 ** 31])
+        rf.int64_array([-2 ** 63, 2 ** 63 - 1])
+        self.assertRaises(TypeError, rf.int32_array, [1.0])
+        expected_message = 'Distance[1] must be in range [0, 255]. ' \
+                           '-3 found instead.'
+        with self.assertRaises(OverflowError) as ex:
+            rf.uint8_array([1, -3], 'Distance', ex=OverflowError)
+        self.assertEqual(expected_message, str(ex.exception))
+
+
+class TestValidator(unittest.TestCase):
+    def test_in_range(self):
+        validator = rf.Validator(0, 99)
+        for i in range(100):
+            self.assertIs(i, validator(i))
+        self.assertEqual(0.5, rf.Validator(None, 1)(0.5))
+        self.assertEqual(-5, rf.Validator(None, 1)(-5))
+        self.assertEqual(10 ** 30, rf.Validator(0, None)(10 ** 30))
+        self.assertEqual(math.inf, rf.Validator(0, None)(math.inf))
+
+    def test_same_messages_as_limited(self):
+        cases = [(-1, 0, 24), (25, 0, 24), (25, None, 24), (-1, 0, None),
+                 (math.nan, 0, 24), (math.nan, None, 24),
+                 (math.nan, 0, None), (-math.inf, 0, None)]
+        for value, min, max in cases:
+            with self.assertRaises(rf.RangeError) as expected:
+                rf.limited(value, min, max, name='HELLO')
+            with self.assertRaises(rf.RangeError) as ex:
+                rf.Validator(min, max, name='HELLO')(value)
+            self.assertEqual(str(expected.exception), str(ex.exception))
+
+    def test_invalid_interval(self):
+        self.assertRaises(ValueError, rf.Validator, None, None)
+        self.assertRaises(ValueError, rf.Validator, 2, 1)
+        self.assertRaises(ValueError, rf.Validator, math.nan, 1)
+        self.assertRaises(ValueError, rf.Validator, 1, math.nan)
+
+    def test_enforce_type(self):
+        validator = rf.Validator(0, 10, name='HELLO', dtype=int)
+        self.assertEqual(2, validator(2))
+        expected_message = 'HELLO must be of type int. float found instead.'
+        with self.assertRaises(TypeError) as ex:
+            validator(2.0)
+        self.assertEqual(expected_message, str(ex.exception))
+        with self.assertRaises(TypeError):
+            rf.Validator(0, 10, dtype=int, ex=FileNotFoundError)(20.0)
+
+    def test_custom_exception_type(self):
+        expected_message = 'Value must be in range [0, 10]. ' \
+                           '20 found instead.'
+        with self.assertRaises(FileNotFoundError) as ex:
+            rf.Validator(0, 10, ex=FileNotFoundError)(20)
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_contains(self):
+        self.assertIn(5, rf.Validator(0, 10))
+        self.assertNotIn(11, rf.Validator(0, 10))
+        self.assertNotIn(math.nan, rf.Validator(0, None))
+        self.assertNotIn(decimal.Decimal('NaN'), rf.Validator(0, None))
+
+    def test_decimal_nan(self):
+        for validator in (rf.Validator(0, 1), rf.Validator(None, 1),
+                          rf.Validator(0, 1, dtype=decimal.Decimal)):
+            self.assertEqual(decimal.Decimal('0.5'),
+                             validator(decimal.Decimal('0.5')))
+            for nan in ('NaN', 'sNaN'):
+                with self.assertRaises(rf.RangeError) as ex:
+                    validator(decimal.Decimal(nan))
+                self.assertTrue(str(ex.exception).endswith(
+                    '{:} found instead.'.format(nan)))
+
+    def test_fixed_width(self):
+        for width in ['uint8', 'uint16', 'uint32', 'uint64',
+                      'int8', 'int16', 'int32', 'int64']:
+            validator = getattr(rf.Validator, width)(name='HELLO')
+            function = getattr(rf, width)
+            for value in [-2 ** 63 - 1, -129, -1, 0, 255, 2 ** 16, 2 ** 64]:
+                try:
+                    expected = function(value, name='HELLO')
+                except rf.RangeError as error:
+                    with self.assertRaises(rf.RangeError) as ex:
+                        validator(value)
+                    self.assertEqual(str(error), str(ex.exception))
+                else:
+                    self.assertIs(expected, validator(value))
+        self.assertEqual(7, rf.Validator.uint_bits(3)(7))
+        self.assertRaises(rf.RangeError, rf.Validator.uint_bits(3), 8)
+        self.assertRaises(TypeError, rf.Validator.uint8(), 1.0)
+
+
+class TestLimitedIter(unittest.TestCase):
+    def test_in_range(self):
+        self.assertEqual(list(range(100)),
+                         list(rf.limited_iter(range(100), 0, 99)))
+        self.assertEqual([1.5, -3], list(rf.limited_iter([1.5, -3], None, 2)))
+
+    def test_is_lazy(self):
+        def source():
+            yield 1
+            yield 2
+            raise AssertionError('Consumed too far')
+
+        iterator = rf.limited_iter(source(), 0, 10)
+        self.assertEqual(1, next(iterator))
+        self.assertEqual(2, next(iterator))
+
+    def test_decimal_nan(self):
+        expected_message = 'Value[1] must be in range [0, 1]. NaN found ' \
+                           'instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            list(rf.limited_iter([decimal.Decimal(0), decimal.Decimal('NaN')],
+                                 0, 1))
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_interval_validated_before_consuming(self):
+        self.assertRaises(ValueError, next, rf.limited_iter([1], None, None))
+        self.assertRaises(ValueError, next, rf.limited_iter([1], 3, 1))
+
+    def test_out_of_range_with_position(self):
+        expected_message = 'Sample[2] must be in range [0, 10]. ' \
+                           '30 found instead.'
+        iterator = rf.limited_iter(iter([1, 2, 30, 4]), 0, 10, name='Sample')
+        self.assertEqual(1, next(iterator))
+        self.assertEqual(2, next(iterator))
+        with self.assertRaises(rf.RangeError) as ex:
+            next(iterator)
+        self.assertEqual(expected_message, str(ex.exception))
+        expected_message = 'Value[0] must be in range [0, +inf[. ' \
+                           'nan found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            list(rf.limited_iter([math.nan], 0, None))
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_enforce_type(self):
+        expected_message = 'Value[1] must be of type int. ' \
+                           'float found instead.'
+        with self.assertRaises(TypeError) as ex:
+            list(rf.limited_iter([1, 2.0], 0, 10, dtype=int))
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_custom_exception_type(self):
+        with self.assertRaises(FileNotFoundError):
+            list(rf.limited_iter([100], 0, 10, ex=FileNotFoundError))
+
+
+class TestClipIter(unittest.TestCase):
+    def test_clip(self):
+        self.assertEqual([0, 3, 10, 10],
+                         list(rf.clip_iter(iter([-5, 3, 10, 50]), 0, 10)))
+        self.assertEqual([rf.clip(i, -10, 20) for i in range(-50, 50)],
+                         list(rf.clip_iter(range(-50, 50), -10, 20)))
+
+
+class TestClipBuffer(unittest.TestCase):
+    def test_array_in_place(self):
+        samples = array.array('h', [-300, 20, 300, -255, 255])
+        self.assertEqual(2, rf.clip_buffer(samples, -255, 255))
+        self.assertEqual(array.array('h', [-255, 20, 255, -255, 255]),
+                         samples)
+        self.assertEqual(0, rf.clip_buffer(samples, -255, 255))
+        self.assertEqual(0, rf.clip_buffer(array.array('d'), 0, 1))
+
+    def test_memoryview(self):
+        data = bytearray([0, 50, 100, 200])
+        self.assertEqual(2, rf.clip_buffer(memoryview(data), 10, 150))
+        self.assertEqual(bytearray([10, 50, 100, 150]), data)
+
+    def test_nan_untouched(self):
+        samples = array.array('d', [math.nan, -2.0, 0.5])
+        self.assertEqual(1, rf.clip_buffer(samples, 0.0, 1.0))
+        self.assertTrue(math.isnan(samples[0]))
+        self.assertEqual([0.0, 0.5], samples.tolist()[1:])
+
+    def test_output_buffer(self):
+        samples = array.array('i', [-5, 3, 50])
+        out = array.array('i', [0, 0, 0])
+        self.assertEqual(2, rf.clip_buffer(samples, 0, 10, out=out))
+        self.assertEqual(array.array('i', [-5, 3, 50]), samples)
+        self.assertEqual(array.array('i', [0, 3, 10]), out)
+        self.assertRaises(ValueError, rf.clip_buffer, samples, 0, 10,
+                          array.array('i', [0]))
+        self.assertRaises(ValueError, rf.clip_buffer, samples, 0, 10,
+                          array.array('d', [0, 0, 0]))
+
+    def test_read_only(self):
+        self.assertRaises(TypeError, rf.clip_buffer, b'abc', 0, 10)
+
+    @unittest.skipIf(np is None, 'NumPy not installed')
+    def test_ndarray(self):
+        samples = np.array([[-1.0, 0.5], [2.0, math.nan]])
+        self.assertEqual(2, rf.clip_buffer(samples, 0, 1))
+        self.assertEqual([-0.0, 0.5, 1.0], samples.ravel()[:3].tolist())
+        out = np.zeros(3, dtype=np.int64)
+        samples = np.array([-5, 3, 50], dtype=np.int64)
+        self.assertEqual(2, rf.clip_buffer(samples, 0, 10, out=out))
+        self.assertEqual([-5, 3, 50], samples.tolist())
+        self.assertEqual([0, 3, 10], out.tolist())
+        out = array.array('q', [0, 0, 0])
+        self.assertEqual(2, rf.clip_buffer(samples, 0, 10, out=out))
+        self.assertEqual(array.array('q', [0, 3, 10]), out)
+        self.assertRaises(TypeError, rf.clip_buffer, samples, 0, 10,
+                          out=bytes(24))
+        self.assertRaises(ValueError, rf.clip_buffer, samples, 0, 10,
+                          out=array.array('q', [0, 0]))
+        self.assertRaises(ValueError, rf.clip_buffer, samples, 0, 10,
+                          out=array.array('d', [0, 0, 0]))
+
+
+class TestRangeError(unittest.TestCase):
+    def test_structured_attributes(self):
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited(25, 0, 24, name='Hours')
+        error = ex.exception
+        self.assertEqual(('Hours', 25, 0, 24, 'range'),
+                         (error.name, error.value, error.min, error.max,
+                          error.kind))
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.exactly(2, 7, name='Days')
+        error = ex.exception
+        self.assertEqual(('Days', 2, 7, 7, 'exact'),
+                         (error.name, error.value, error.min, error.max,
+                          error.kind))
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_len([1, 2, 3], 0, 2, name='groups')
+        error = ex.exception
+        self.assertEqual(('groups', 3, 0, 2, 'length'),
+                         (error.name, error.value, error.min, error.max,
+                          error.kind))
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.exact_len([1], 2, name='pairs')
+        error = ex.exception
+        self.assertEqual(('pairs', 1, 2, 2, 'exact_length'),
+                         (error.name, error.value, error.min, error.max,
+                          error.kind))
+
+    def test_lazy_message(self):
+        error = rf.RangeError(name='Value', value=5, min=0, max=1,
+                              kind='range')
+        self.assertEqual((), error._args)
+        expected_message = 'Value must be in range [0, 1]. 5 found instead.'
+        self.assertEqual(expected_message, str(error))
+        self.assertEqual((expected_message,), error.args)
+        self.assertEqual('RangeError({!r})'.format(expected_message),
+                         repr(error))
+
+    def test_plain_message(self):
+        error = rf.RangeError('Custom message')
+        self.assertEqual('Custom message', str(error))
+        self.assertEqual(('Custom message',), error.args)
+        self.assertIsNone(error.kind)
+        self.assertEqual('', str(rf.RangeError()))
+        self.assertEqual((), rf.RangeError().args)
+        error = rf.RangeError('Custom message', 42)
+        self.assertEqual(('Custom message', 42), error.args)
+        self.assertEqual("('Custom message', 42)", str(error))
+        self.assertEqual("RangeError('Custom message', 42)", repr(error))
+        self.assertIsNone(error.name)
+
+    def test_subclass(self):
+        class PortError(rf.RangeError):
+            pass
+
+        with self.assertRaises(PortError) as ex:
+            rf.uint16(70000, name='port', ex=PortError)
+        error = ex.exception
+        self.assertEqual(('port', 70000, 0, 65535, 'range'),
+                         (error.name, error.value, error.min, error.max,
+                          error.kind))
+        self.assertEqual('port must be in range [0, 65535]. 70000 found '
+                         'instead.', str(error))
+        with self.assertRaises(PortError) as ex:
+            rf.Validator(0, 1, name='ratio', ex=PortError)(2)
+        self.assertEqual('ratio', ex.exception.name)
+
+    def test_subclass_with_own_constructor(self):
+        class LegacyError(rf.RangeError):
+            def __init__(self, message):
+                super().__init__(message)
+
+        expected_message = 'Value must be in range [0, 255]. 300 found ' \
+                           'instead.'
+        for function in (lambda: rf.uint8(300, ex=LegacyError),
+                         lambda: rf.limited(300, 0, 255, ex=LegacyError),
+                         lambda: rf.Validator(0, 255, ex=LegacyError)(300)):
+            with self.assertRaises(LegacyError) as ex:
+                function()
+            self.assertEqual(expected_message, str(ex.exception))
+            self.assertIsNone(ex.exception.kind)
+        self.assertRaises(LegacyError, rf.limited_count, range(300), 0, 255,
+                          ex=LegacyError)
+
+    def test_pickle(self):
+        import pickle
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.uint8(300)
+        error = pickle.loads(pickle.dumps(ex.exception))
+        self.assertEqual(str(ex.exception), str(error))
+        self.assertEqual(300, error.value)
+        self.assertEqual('range', error.kind)
+        error = pickle.loads(pickle.dumps(rf.RangeError('Custom', 42)))
+        self.assertEqual(('Custom', 42), error.args)
+
+
+class TestLimitedBuffer(unittest.TestCase):
+    def test_in_range(self):
+        samples = array.array('d', [0.5, 0.1, 1.0])
+        self.assertIs(samples, rf.limited_buffer(samples, 0, 1))
+        self.assertIs(samples, rf.limited_buffer(samples, None, 1))
+        self.assertIs(samples, rf.limited_buffer(samples, 0, None))
+        data = bytes(range(100))
+        self.assertIs(data, rf.limited_buffer(data, 0, 99))
+        empty = array.array('h')
+        self.assertIs(empty, rf.limited_buffer(empty, 0, 1))
+
+    def test_out_of_range(self):
+        expected_message = 'Byte[2] must be in range [0, 127]. ' \
+                           '255 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_buffer(b'\x00\x10\xff\x80', 0, 127, name='Byte')
+        self.assertEqual(expected_message, str(ex.exception))
+        expected_message = 'Value[1] must be in range ]-inf, 10]. ' \
+                           '11 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_buffer(array.array('i', [1, 11, 12]), None, 10)
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_nan(self):
+        expected_message = 'Value[1] must be in range [0, 5]. ' \
+                           'nan found instead.'
+        for samples in ([1.0, math.nan, 2.0], [math.nan, 1.0], [1.0, math.nan]):
+            with self.assertRaises(rf.RangeError) as ex:
+                rf.limited_buffer(array.array('d', samples), 0, 5)
+            self.assertIn('nan found instead', str(ex.exception))
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_buffer(array.array('f', [1.0, math.nan]), 0, 5)
+        self.assertEqual(expected_message, str(ex.exception))
+        # Infinities of both signs sum up to NaN: still valid.
+        samples = array.array('d', [-math.inf, math.inf])
+        self.assertIs(samples, rf.limited_buffer(samples, -math.inf, None))
+
+    def test_format_cast(self):
+        expected_message = 'Value[1] must be in range [0, 10]. ' \
+                           '-1 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_buffer(b'\x00\x00\xff\xff', 0, 10, format='h')
+        self.assertEqual(expected_message, str(ex.exception))
+        matrix = memoryview(bytes(6)).cast('B', shape=[2, 3])
+        self.assertIs(matrix, rf.limited_buffer(matrix, 0, 0))
+
+    def test_invalid_interval(self):
+        self.assertRaises(ValueError, rf.limited_buffer, b'', None, None)
+        self.assertRaises(ValueError, rf.limited_buffer, b'', 1, 0)
+
+    def test_custom_exception_type(self):
+        self.assertRaises(FileNotFoundError, rf.limited_buffer, b'\x05', 0, 1,
+                          ex=FileNotFoundError)
+
+
+class TestFixedWidthBuffer(unittest.TestCase):
+    def test_fits(self):
+        values = array.array('q', [0, 255, 65535])
+        self.assertIs(values, rf.fixed_width_buffer(values, 'H'))
+        self.assertIs(values, rf.fixed_width_buffer(values, 'uint16'))
+        self.assertIs(values, rf.fixed_width_buffer(values, 'i'))
+        values = array.array('H', [0, 65535])
+        self.assertIs(values, rf.fixed_width_buffer(values, 'H'))
+
+    def test_same_message_as_scalar_helpers(self):
+        for width, values in [('uint8', [1, 256]), ('int8', [1, -129]),
+                              ('uint16', [1, 70000]), ('int16', [1, -40000]),
+                              ('uint32', [1, -1]), ('int32', [2 ** 31, 0])]:
+            index = 1 if values[0] == 1 else 0
+            with self.assertRaises(rf.RangeError) as expected:
+                getattr(rf, width)(values[index],
+                                   name='Value[{:}]'.format(index))
+            with self.assertRaises(rf.RangeError) as ex:
+                rf.fixed_width_buffer(array.array('q', values), width)
+            self.assertEqual(str(expected.exception), str(ex.exception))
+
+    def test_format_code_bounds(self):
+        self.assertRaises(rf.RangeError, rf.fixed_width_buffer,
+                          array.array('q', [128]), 'b')
+        self.assertRaises(rf.RangeError, rf.fixed_width_buffer,
+                          array.array('q', [-1]), 'Q')
+        self.assertRaises(rf.RangeError, rf.fixed_width_buffer,
+                          array.array('B', [200]), 'b')
+
+    def test_invalid_width(self):
+        self.assertRaises(ValueError, rf.fixed_width_buffer, b'', 'd')
+        self.assertRaises(ValueError, rf.fixed_width_buffer, b'', 'uint7')
+        self.assertRaises(ValueError, rf.fixed_width_buffer, b'', '')
+        self.assertRaises(ValueError, rf.fixed_width_buffer, b'', 'hH')
+        self.assertRaises(ValueError, rf.fixed_width_buffer, b'', 16)
+        self.assertRaises(ValueError, rf.fixed_width_buffer, b'', [16])
+
+    def test_non_integer_elements(self):
+        expected_message = "Value must be of type int. Elements of format " \
+                           "'d' found instead."
+        for samples in ([1.5], [300.5], []):
+            with self.assertRaises(TypeError) as ex:
+                rf.fixed_width_buffer(array.array('d', samples), 'B')
+            self.assertEqual(expected_message, str(ex.exception))
+        self.assertRaises(TypeError, rf.fixed_width_buffer, bytes(8), 'B',
+                          format='d')
+
+
+class TestRecordValidator(unittest.TestCase):
+    def setUp(self):
+        self.validator = rf.RecordValidator({
+            'port': rf.uint16,
+            'ratio': (0.0, 1.0, float),
+            'offset': (None, 10),
+            'tags': rf.Length(0, 2),
+            'pair': rf.Length(expected=2),
+            'count': rf.Validator(0, None, dtype=int),
+            'custom': lambda value, name: rf.limited(value, 0, 1, name=name),
+        })
+        self.record = {'port': 80, 'ratio': 0.5, 'offset': -3, 'tags': [],
+                       'pair': 'ab', 'count': 3, 'custom': 1, 'other': None}
+
+    def test_valid(self):
+        self.assertIs(self.record, self.validator(self.record))
+        self.assertIs(self.record, self.validator.validate(self.record))
+
+    def assert_message(self, field, value, expected_message,
+                       exception=rf.RangeError):
+        record = dict(self.record)
+        record[field] = value
+        with self.assertRaises(exception) as ex:
+            self.validator(record)
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_invalid(self):
+        self.assert_message('port', 70000, 'port must be in range '
+                                           '[0, 65535]. 70000 found instead.')
+        self.assert_message('port', 1.0, 'port must be of type int. '
+                                         'float found instead.', TypeError)
+        self.assert_message('ratio', 1.5, 'ratio must be in range '
+                                          '[0.0, 1.0]. 1.5 found instead.')
+        self.assert_message('ratio', math.nan, 'ratio must be in range '
+                                               '[0.0, 1.0]. nan found '
+                                               'instead.')
+        self.assert_message('offset', 11, 'offset must be in range '
+                                          ']-inf, 10]. 11 found instead.')
+        self.assert_message('tags', [1, 2, 3], 'Length of tags must be in '
+                                               'range [0, 2]. 3 found '
+                                               'instead.')
+        self.assert_message('pair', 'a', 'Length of pair must be exactly 2. '
+                                         '1 found instead.')
+        self.assert_message('count', -1, 'count must be in range [0, +inf[. '
+                                         '-1 found instead.')
+        self.assert_message('custom', 3, 'custom must be in range [0, 1]. '
+                                         '3 found instead.')
+        self.assert_message('offset', decimal.Decimal('NaN'),
+                            'offset must be in range ]-inf, 10]. NaN found '
+                            'instead.')
+        self.assert_message('ratio', decimal.Decimal('NaN'),
+                            'ratio must be of type float. Decimal found '
+                            'instead.', TypeError)
+
+    def test_missing_field(self):
+        record = dict(self.record)
+        del record['ratio']
+        self.assertRaises(KeyError, self.validator, record)
+
+    def test_custom_exception_type(self):
+        validator = rf.RecordValidator({'port': rf.uint16, 'name': rf.Length(
+            1, None)}, ex=FileNotFoundError)
+        self.assertRaises(FileNotFoundError, validator, {'port': -1})
+        self.assertRaises(FileNotFoundError, validator,
+                          {'port': 1, 'name': ''})
+
+    def test_invalid_spec(self):
+        self.assertRaises(ValueError, rf.RecordValidator, {'a': (2, 1)})
+        self.assertRaises(ValueError, rf.Length, -1, 2)
+        self.assertRaises(ValueError, rf.Length, None, None)
+        self.assertRaises(TypeError, rf.RecordValidator, {'a': 5})
+        self.assertRaises(TypeError, rf.RecordValidator, {'a': [0, 1]})
+        self.assertRaises(TypeError, rf.Length, expected=2.0)
+
+
+class TestValidationReport(unittest.TestCase):
+    def test_check_each(self):
+        report = rf.ValidationReport()
+        self.assertFalse(report.check_each(rf.limited, [1, 30, 40, 2, 50],
+                                           0, 24, name='Hours'))
+        field = report.fields['Hours']
+        self.assertEqual(5, field.checked)
+        self.assertEqual(3, field.failed)
+        self.assertEqual([(1, 3), (4, 5)], field.ranges)
+        self.assertEqual([1, 2, 4], [index for index, _, _ in field.examples])
+        self.assertEqual('Hours must be in range [0, 24]. 30 found instead.',
+                         str(field.examples[0][2]))
+        self.assertTrue(report.check_each(rf.limited, iter([]), 0, 24,
+                                          name='Hours'))
+        self.assertEqual(5, field.checked)
+        self.assertFalse(report.check_each(
+            rf.limited, [decimal.Decimal('NaN'), decimal.Decimal(1)], 0, 24,
+            name='Ratio'))
+        self.assertEqual([(0, 1)], report.fields['Ratio'].ranges)
+
+    def test_out_of_order_indices(self):
+        report = rf.ValidationReport()
+        for start, values in ((10, [50, 60]), (0, [50]), (5, [1, 50]),
+                              (2, [50, 50, 1]), (1, [50])):
+            report.check_each(rf.limited, values, 0, 24, name='Hours',
+                              start=start)
+        field = report.fields['Hours']
+        self.assertEqual([(0, 4), (6, 7), (10, 12)], field.ranges)
+        self.assertEqual(7, field.failed)
+        self.assertEqual(9, field.checked)
+
+    @unittest.skipIf(np is None, 'NumPy not installed')
+    def test_array_after_out_of_order_index(self):
+        report = rf.ValidationReport()
+        report.check(rf.limited, 50, 0, 24, name='Hours', index=100)
+        report.check_array(np.array([50, 1, 60, 70]), 0, 24, name='Hours')
+        self.assertEqual([(1, 2), (3, 5), (100, 101)],
+                         report.fields['Hours'].ranges)
+
+    def test_checked_counted_on_unexpected_exception(self):
+        report = rf.ValidationReport()
+        self.assertRaises(TypeError, report.check_each, rf.limited,
+                          [1, 30, 'x', 2], 0, 24, name='Hours')
+        self.assertEqual(3, report.fields['Hours'].checked)
+        self.assertEqual(1, report.fields['Hours'].failed)
+
+    def test_same_messages(self):
+        report = rf.ValidationReport()
+        report.check(rf.exactly, 3, 4, name='x')
+        report.check(rf.limited_len, [1], 2, 3, name='y')
+        report.check_each(rf.uint8, [300], name='z')
+        report.check_each(rf.exact_len, ['abc'], 2, name='w')
+        for name, expected_message in [
+                ('x', 'x must be exactly 4. 3 found instead.'),
+                ('y', 'Length of y must be in range [2, 3]. 1 found '
+                      'instead.'),
+                ('z', 'z must be in range [0, 255]. 300 found instead.'),
+                ('w', 'Length of w must be exactly 2. 3 found instead.')]:
+            self.assertEqual(expected_message,
+                             str(report.fields[name].examples[0][2]))
+
+    def test_scalar_collector(self):
+        report = rf.ValidationReport(max_examples=2)
+        self.assertTrue(report.ok)
+        for value in [1, -1, -2, 3, -4, -5]:
+            report.check(rf.limited, value, 0, None, name='Count')
+        field = report.fields['Count']
+        self.assertFalse(report.ok)
+        self.assertEqual(4, report.failed)
+        self.assertEqual(6, field.checked)
+        self.assertEqual([(1, 3), (4, 6)], field.ranges)
+        self.assertEqual(2, len(field.examples))
+        self.assertTrue(report.check(rf.limited, 2, 0, None, name='Count',
+                                     index=100))
+
+    def test_custom_exception_type(self):
+        report = rf.ValidationReport()
+        self.assertFalse(report.check(rf.limited, 5, 0, 1,
+                                      ex=FileNotFoundError))
+        self.assertIsInstance(report.fields['Value'].examples[0][2],
+                              FileNotFoundError)
+
+    def test_raise_first(self):
+        report = rf.ValidationReport()
+        report.raise_first()
+        report.check_each(rf.limited, [1, 2, 3, 50], 0, 24)
+        with self.assertRaises(rf.RangeError) as ex:
+            report.raise_first()
+        self.assertEqual(50, ex.exception.value)
+
+    def test_summary(self):
+        report = rf.ValidationReport()
+        report.check_each(rf.limited, [1, 30, 40, 2, 50], 0, 24,
+                          name='Hours')
+        report.check_each(rf.limited, [1], 0, 24, name='Valid')
+        self.assertEqual('Hours: 3 of 5 values invalid at indices 1-2, 4. '
+                         'Hours must be in range [0, 24]. 30 found instead.',
+                         str(report))
+
+    @unittest.skipIf(np is None, 'NumPy not installed')
+    def test_check_array(self):
+        report = rf.ValidationReport()
+        self.assertFalse(report.check_array(np.array([1, 50, 60, 2, 70]),
+                                            0, 24, name='A'))
+        self.assertFalse(report.check_array([80, 1], 0, 24, name='A'))
+        self.assertTrue(report.check_array([1.5], 0, 24, name='A'))
+        field = report.fields['A']
+        self.assertEqual(8, field.checked)
+        self.assertEqual(4, field.failed)
+        self.assertEqual([(1, 3), (4, 6)], field.ranges)
+        self.assertEqual('A must be in range [0, 24]. 50 found instead.',
+                         str(field.examples[0][2]))
+        self.assertEqual(5, field.examples[3][0])
+
+
+class TestCommandLine(unittest.TestCase):
+    def run_main(self, content, *args, suffix='.csv'):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data' + suffix)
+            with open(path, 'w') as file:
+                file.write(content)
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                code = rf.main([path, '--quiet'] + list(args))
+        return code, stderr.getvalue()
+
+    def test_valid_csv(self):
+        code, output = self.run_main('port,temp\n80,20.5\n8080,-40\n',
+                                     '--col', 'port=uint16',
+                                     '--col', 'temp=-40:125')
+        self.assertEqual(0, code)
+        self.assertEqual('', output)
+
+    def test_invalid_csv(self):
+        content = 'port,temp\n80,20.5\n70000,-40\n1,200\n'
+        code, output = self.run_main(content, '-c', 'port=uint16',
+                                     '-c', 'temp=-40:', '--chunk-size', '1')
+        self.assertEqual(1, code)
+        self.assertEqual('Row 2, column port: port must be in range '
+                         '[0, 65535]. 70000 found instead.\n', output)
+        code, output = self.run_main(content, '-c', 'temp=:125')
+        self.assertEqual(1, code)
+        self.assertEqual('Row 3, column temp: temp must be in range '
+                         ']-inf, 125]. 200 found instead.\n', output)
+        code, output = self.run_main('port\nabc\n', '-c', 'port=uint16')
+        self.assertEqual(1, code)
+        self.assertEqual("Row 1, column port: port must be a number. 'abc' "
+                         "found instead.\n", output)
+
+    def test_first_failing_row_across_columns(self):
+        content = 'port,temp\n80,20\n70000,30\n5,abc\n'
+        code, output = self.run_main(content, '-c', 'port=uint16',
+                                     '-c', 'temp=-40:125')
+        self.assertEqual(1, code)
+        self.assertEqual('Row 2, column port: port must be in range '
+                         '[0, 65535]. 70000 found instead.\n', output)
+        content = 'port,temp\n80,20\n70000,30\n5,200\n'
+        code, output = self.run_main(content, '-c', 'temp=-40:125',
+                                     '-c', 'port=uint16')
+        self.assertEqual(1, code)
+        self.assertEqual('Row 2, column port: port must be in range '
+                         '[0, 65535]. 70000 found instead.\n', output)
+        content = 'port,temp\n80,200\n70000,30\n'
+        code, output = self.run_main(content, '-c', 'port=uint16',
+                                     '-c', 'temp=-40:125')
+        self.assertEqual('Row 1, column temp: temp must be in range '
+                         '[-40, 125]. 200 found instead.\n', output)
+
+    def test_report_all_unparsable(self):
+        content = 'port,temp\n80,20\n70000,30\n5,abc\n'
+        code, output = self.run_main(content, '-c', 'port=uint16',
+                                     '-c', 'temp=-40:125', '--all')
+        self.assertEqual(1, code)
+        self.assertEqual('port: 1 of 3 values invalid at indices 2. port '
+                         'must be in range [0, 65535]. 70000 found '
+                         'instead.\ntemp: 1 of 3 values invalid at indices '
+                         "3. temp must be a number. 'abc' found instead.\n",
+                         output)
+
+    def test_report_all(self):
+        content = 'temp\n1\n200\n300\n4\n500\n'
+        code, output = self.run_main(content, '-c', 'temp=0:100', '--all',
+                                     '-n', '2')
+        self.assertEqual(1, code)
+        self.assertEqual('temp: 3 of 5 values invalid at indices 2-3, 5. '
+                         'temp must be in range [0, 100]. 200 found '
+                         'instead.\n', output)
+
+    def test_report_all_wrong_types(self):
+        code, output = self.run_main('port\n80\n1.5\n', '-c', 'port=uint16',
+                                     '--all')
+        self.assertEqual(1, code)
+        self.assertEqual('port: 1 of 2 values invalid at indices 2. port '
+                         'must be of type int. float found instead.\n',
+                         output)
+
+    def test_blank_and_short_rows(self):
+        code, output = self.run_main('port,temp\n80,20\n\n90,30\n',
+                                     '-c', 'temp=0:25')
+        self.assertEqual(1, code)
+        self.assertEqual('Row 2, column temp: temp must be in range [0, 25]. '
+                         '30 found instead.\n', output)
+        code, output = self.run_main('port,temp\n80,20\n90\n',
+                                     '-c', 'temp=0:25')
+        self.assertEqual(2, code)
+        self.assertEqual('Error: Row 2 has 1 fields, at least 2 expected.\n',
+                         output)
+
+    def test_throughput_printed_on_failure(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'data.csv')
+            with open(path, 'w') as file:
+                file.write('port\n80\n90\n70000\n')
+            for chunk_size in ('1', '10'):
+                stderr = io.StringIO()
+                with contextlib.redirect_stderr(stderr):
+                    code = rf.main([path, '-c', 'port=uint16', '-n',
+                                    chunk_size])
+                self.assertEqual(1, code)
+                self.assertTrue(
+                    stderr.getvalue().startswith('Validated 2 rows in '))
+
+    def test_jsonl(self):
+        content = '{"a": 1, "b": 2}\n\n{"a": -1, "b": 2}\n'
+        code, output = self.run_main(content, '-c', 'a=nonnegative_int',
+                                     suffix='.jsonl')
+        self.assertEqual(1, code)
+        self.assertEqual('Row 2, column a: a must be in range [0, +inf[. '
+                         '-1 found instead.\n', output)
+        code, output = self.run_main(content, '-c', 'b=2:2', '-f', 'jsonl',
+                                     suffix='.txt')
+        self.assertEqual(0, code)
+
+    def test_usage_errors(self):
+        code, output = self.run_main('port\n1\n', '-c', 'other=0:1')
+        self.assertEqual(2, code)
+        self.assertIn('other', output)
+        with contextlib.redirect_stderr(io.StringIO()):
+            for spec in ['port=5:1', 'port', 'port=abc', 'port=0:x']:
+                with self.assertRaises(SystemExit) as ex:
+                    rf.main(['file.csv', '-c', spec])
+                self.assertEqual(2, ex.exception.code)
+            for chunk_size in ['0', '-5', 'x']:
+                with self.assertRaises(SystemExit) as ex:
+                    rf.main(['file.csv', '-c', 'port=0:1', '-n', chunk_size])
+                self.assertEqual(2, ex.exception.code)
+
+
+@unittest.skipIf(sys.version_info < (3, 8),
+                 'multiprocessing.shared_memory requires Python 3.8')
+class TestParallel(unittest.TestCase):
+    def test_valid(self):
+        samples = array.array('d', range(10000))
+        self.assertIs(samples, rf.limited_parallel(samples, 0, 9999,
+                                                   workers=2))
+        empty = array.array('d')
+        self.assertIs(empty, rf.limited_parallel(empty, 0, 1))
+
+    def test_first_offender_regardless_of_chunking(self):
+        samples = array.array('i', range(10000))
+        samples[7777] = -1
+        samples[9000] = -5
+        samples[200] = 10 ** 6
+        expected_message = 'Sample[200] must be in range [0, 9999]. ' \
+                           '1000000 found instead.'
+        for workers, chunk_size in [(1, None), (2, 100), (3, 1), (2, 9999)]:
+            with self.assertRaises(rf.RangeError) as ex:
+                rf.limited_parallel(samples, 0, 9999, name='Sample',
+                                    workers=workers, chunk_size=chunk_size)
+            self.assertEqual(expected_message, str(ex.exception))
+
+    def test_invalid_arguments(self):
+        samples = array.array('i', range(10))
+        self.assertRaises(ValueError, rf.limited_parallel, samples, 1, 0)
+        self.assertRaises(ValueError, rf.limited_parallel, samples, 0, 1,
+                          workers=-1)
+        self.assertRaises(ValueError, rf.limited_parallel, samples, 0, 1,
+                          chunk_size=-5)
+        self.assertRaises(ValueError, rf.limited_parallel, samples, 0, 1,
+                          workers=0)
+        self.assertRaises(ValueError, rf.limited_parallel, samples, 0, 1,
+                          chunk_size=0)
+        self.assertRaises(TypeError, rf.clip_parallel, bytes(10), 0, 1)
+
+    def test_clip(self):
+        samples = array.array('h', range(-500, 500))
+        expected = array.array('h', [rf.clip(i, -100, 100)
+                                     for i in range(-500, 500)])
+        self.assertEqual(799, rf.clip_parallel(samples, -100, 100,
+                                               workers=2, chunk_size=64))
+        self.assertEqual(expected, samples)
+
+    def test_shared_memory(self):
+        from multiprocessing import shared_memory
+
+        shared = shared_memory.SharedMemory(create=True, size=4000)
+        try:
+            samples = shared.buf.cast('i')
+            samples[:] = array.array('i', range(1000))
+            samples[700] = -7
+            del samples
+            expected_message = 'Sample[700] must be in range [0, 999]. ' \
+                               '-7 found instead.'
+            with self.assertRaises(rf.RangeError) as ex:
+                rf.limited_parallel(shared, 0, 999, name='Sample',
+                                    format='i', workers=2)
+            self.assertEqual(expected_message, str(ex.exception))
+            attach = shared_memory.SharedMemory.__init__
+
+            def attach_only(self, name=None, create=False, *args, **kwargs):
+                # Workers attach by name, a copy would create a block.
+                assert not create, 'Copied'
+                attach(self, name, create, *args, **kwargs)
+
+            with unittest.mock.patch.object(shared_memory.SharedMemory,
+                                            '__init__', attach_only):
+                self.assertEqual(201, rf.clip_parallel(
+                    shared, 100, 899, format='i', workers=2))
+            self.assertIs(shared, rf.limited_parallel(
+                shared, 100, 899, format='i', workers=2))
+        finally:
+            shared.close()
+            shared.unlink()
+
+    @unittest.skipIf(np is None, 'NumPy not installed')
+    def test_ndarray(self):
+        samples = np.arange(20).reshape(4, 5)
+        samples[2, 3] = 99
+        expected_message = 'Value[2, 3] must be in range [0, 50]. ' \
+                           '99 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_parallel(samples, 0, 50, workers=2, chunk_size=3)
+        self.assertEqual(expected_message, str(ex.exception))
+        self.assertEqual(9, rf.clip_parallel(samples, 0, 10, workers=2))
+        self.assertEqual(10, samples.max())
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        rf.disable_stats()
+        rf.enable_stats()
+
+    def tearDown(self):
+        rf.disable_stats()
+
+    def test_disabled_by_default(self):
+        rf.disable_stats()
+        rf.limited(1, 0, 2)
+        self.assertEqual({}, rf.stats_snapshot())
+
+    def test_counts(self):
+        rf.limited(1, 0, 2, name='Hours')
+        rf.limited(1, 0, 2, name='Hours')
+        self.assertRaises(rf.RangeError, rf.uint8, 300, 'Distance')
+        self.assertRaises(TypeError, rf.exactly, 1.0, 1, dtype=int)
+        rf.limited_len([1], 0, 3, name='groups')
+        rf.exact_len([1], 1)
+        snapshot = rf.stats_snapshot()
+        self.assertEqual({'limited', 'uint8', 'exactly', 'limited_len',
+                          'exact_len'}, set(snapshot))
+        self.assertEqual(2, snapshot['limited']['Hours']['calls'])
+        self.assertEqual(0, snapshot['limited']['Hours']['failures'])
+        self.assertEqual(1, snapshot['uint8']['Distance']['failures'])
+        self.assertEqual(1, snapshot['exactly']['Value']['failures'])
+        self.assertGreater(snapshot['limited']['Hours']['seconds'], 0)
+        self.assertEqual(1, snapshot['limited_len']['groups']['calls'])
+
+    def test_nested_calls_not_counted(self):
+        self.assertRaises(rf.RangeError, rf.uint_bits, 8, 3)
+        self.assertEqual({'uint_bits'}, set(rf.stats_snapshot()))
+
+    def test_disabled_during_call(self):
+        # Another thread disabling the statistics between the checks of an
+        # instrumented function and the measurement.
+        stats = rf._stats
+
+        def busy():
+            rf.disable_stats()
+            return False
+
+        for function, args in ((rf.limited, (1, 0, 2)), (rf.uint8, (1,)),
+                               (rf.exact_len, ([1], 1))):
+            rf._stats = stats
+            with unittest.mock.patch.object(type(stats), 'busy',
+                                            property(lambda self: busy())):
+                function(*args)
+            self.assertIsNone(rf._stats)
+
+    def test_thread_safe(self):
+        import threading
+
+        def work():
+            for i in range(1000):
+                rf.uint16(i)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(4000, rf.stats_snapshot()['uint16']['Value']['calls'])
+
+    def test_prometheus(self):
+        rf.limited(1, 0, 2, name='Say "hi"')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'rangeforce.prom')
+            rf.write_stats_prometheus(path)
+            with open(path) as file:
+                lines = file.read().splitlines()
+        self.assertIn('# TYPE rangeforce_calls_total counter', lines)
+        self.assertIn('rangeforce_calls_total{function="limited",'
+                      'name="Say \\"hi\\""} 1', lines)
+        self.assertIn('rangeforce_failures_total{function="limited",'
+                      'name="Say \\"hi\\""} 0', lines)
+
+
+class TestChecked(unittest.TestCase):
+    def test_keyword_specs(self):
+        @rf.checked(port=rf.uint16, timeout=(0, 60), name=rf.Length(1, 3))
+        def connect(host, port, timeout=10, name='a'):
+            return host, port, timeout, name
+
+        self.assertEqual(('h', 80, 10, 'a'), connect('h', 80))
+        self.assertEqual(('h', 80, 5, 'abc'),
+                         connect(host='h', port=80, timeout=5, name='abc'))
+        self.assertEqual('connect', connect.__name__)
+        expected_message = 'port must be in range [0, 65535]. ' \
+                           '70000 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            connect('h', 70000)
+        self.assertEqual(expected_message, str(ex.exception))
+        with self.assertRaises(rf.RangeError) as ex:
+            connect('h', port=70000)
+        self.assertEqual(expected_message, str(ex.exception))
+        expected_message = 'timeout must be in range [0, 60]. ' \
+                           '61 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            connect('h', 80, 61)
+        self.assertEqual(expected_message, str(ex.exception))
+        expected_message = 'Length of name must be in range [1, 3]. ' \
+                           '0 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            connect('h', 80, name='')
+        self.assertEqual(expected_message, str(ex.exception))
+        self.assertRaises(TypeError, connect, 'h', 80.0)
+
+    @unittest.skipIf(sys.version_info < (3, 9),
+                     'typing.Annotated requires Python 3.9')
+    def test_annotated(self):
+        from typing import Annotated
+
+        @rf.checked
+        def set_level(level: Annotated[int, rf.Range(0, 255)],
+                      *values,
+                      gain: Annotated[float, rf.Range(0, 1, float)] = 0.5):
+            return level
+
+        self.assertEqual(3, set_level(3, 7, 8, 9, gain=1.0))
+        expected_message = 'level must be in range [0, 255]. ' \
+                           '300 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            set_level(level=300)
+        self.assertEqual(expected_message, str(ex.exception))
+        self.assertRaises(rf.RangeError, set_level, 1, gain=2.0)
+        self.assertRaises(TypeError, set_level, 1, gain=1)
+
+    def test_custom_exception_type(self):
+        @rf.checked(value=(0, 1), _ex=FileNotFoundError)
+        def function(value):
+            pass
+
+        self.assertRaises(FileNotFoundError, function, 5)
+
+    def test_parameters_named_as_decorator_arguments(self):
+        @rf.checked(function=(0, 1), ex=(2, 3))
+        def configure(function, ex):
+            return function, ex
+
+        self.assertEqual((1, 2), configure(1, ex=2))
+        self.assertRaises(rf.RangeError, configure, 5, 2)
+        self.assertRaises(rf.RangeError, configure, 1, ex=5)
+
+    def test_invalid_specs(self):
+        def function(value, *args, **kwargs):
+            pass
+
+        self.assertRaises(TypeError, rf.checked(other=(0, 1)), function)
+        self.assertRaises(TypeError, rf.checked(args=(0, 1)), function)
+        self.assertRaises(TypeError, rf.checked(value=5), function)
+        self.assertRaises(ValueError, rf.checked(value=(2, 1)), function)
+        self.assertRaises(ValueError, rf.Range, None, None)
+
+    def test_range_in_record_validator(self):
+        validator = rf.RecordValidator({'a': rf.Range(0, 1, int)})
+        self.assertRaises(rf.RangeError, validator, {'a': 2})
+        self.assertRaises(TypeError, validator, {'a': 0.5})
+
+    def test_disabled(self):
+        def function(value):
+            pass
+
+        enabled = rf.CHECKS_ENABLED
+        try:
+            rf.CHECKS_ENABLED = False
+            self.assertIs(function, rf.checked(value=(0, 1))(function))
+            self.assertIs(function, rf.checked(function))
+        finally:
+            rf.CHECKS_ENABLED = enabled
+
+
+class TestLimitedCount(unittest.TestCase):
+    def test_in_range(self):
+        self.assertEqual([0, 1, 2], rf.limited_count(iter(range(3)), 0, 10))
+        self.assertEqual([0, 1, 2], rf.limited_count(range(3), 3, 3))
+        self.assertEqual([], rf.limited_count(iter([]), None, 10))
+        self.assertEqual([1, 2], rf.limited_count([1, 2], 0, 2.5))
+
+    def test_unbounded_upper(self):
+        import itertools
+        items = rf.limited_count(itertools.count(), 5, None)
+        self.assertEqual(list(range(8)), list(itertools.islice(items, 8)))
+        self.assertEqual([1], list(rf.limited_count([1], 0, math.inf)))
+        self.assertEqual([1, 2], list(rf.limited_count([1, 2], None,
+                                                       math.inf)))
+        self.assertRaises(rf.RangeError, rf.limited_count, [1, 2], math.inf,
+                          None)
+
+    def test_stops_consuming_beyond_max(self):
+        import itertools
+        source = itertools.count()
+        expected_message = 'Length of upload must be in range [0, 10]. ' \
+                           'More than 10 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_count(source, 0, 10, name='upload')
+        self.assertEqual(expected_message, str(ex.exception))
+        self.assertEqual(11, ex.exception.value)
+        self.assertEqual(11, next(source))
+
+    def test_below_range(self):
+        expected_message = 'Length of value must be in range [2, 5]. ' \
+                           '1 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_count(iter([1]), 2, 5)
+        self.assertEqual(expected_message, str(ex.exception))
+        expected_message = 'Length of value must be in range [2, +inf[. ' \
+                           '1 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_count(iter([1]), 2, None)
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_invalid_interval(self):
+        self.assertRaises(ValueError, rf.limited_count, [], None, None)
+        self.assertRaises(ValueError, rf.limited_count, [], -1, 2)
+        self.assertRaises(ValueError, rf.limited_count, [], 3, 2)
+
+    def test_custom_exception_type(self):
+        with self.assertRaises(FileNotFoundError) as ex:
+            rf.limited_count(range(5), 0, 2, ex=FileNotFoundError)
+        self.assertEqual('Length of value must be in range [0, 2]. '
+                         'More than 2 found instead.', str(ex.exception))
+        self.assertRaises(FileNotFoundError, rf.limited_count, range(1), 2,
+                          None, ex=FileNotFoundError)
+
+
+class TestLimitedLens(unittest.TestCase):
+    def test_in_range(self):
+        packets = [b'ab', b'', b'abc']
+        self.assertIs(packets, rf.limited_lens(packets, 0, 3))
+        self.assertIs(packets, rf.limited_lens(packets, None, 3))
+        self.assertEqual([], rf.limited_lens([], 1, 3))
+        offsets = array.array('q', [0, 2, 2, 5])
+        self.assertIs(offsets, rf.limited_lens(offsets, 0, 3, offsets=True))
+
+    def test_same_message_as_limited_len(self):
+        for packets, min, max in [([b'ab', b'abcd'], 0, 3),
+                                  ([b'ab', b''], 1, None),
+                                  ([b'ab', b'abcd'], None, 3)]:
+            with self.assertRaises(rf.RangeError) as expected:
+                rf.limited_len(packets[1], min, max, name='packet[1]')
+            with self.assertRaises(rf.RangeError) as ex:
+                rf.limited_lens(packets, min, max, name='packet')
+            self.assertEqual(str(expected.exception), str(ex.exception))
+
+    def test_offsets(self):
+        expected_message = 'Length of value[2] must be in range [0, 3]. ' \
+                           '4 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_lens([0, 2, 2, 6, 20], 0, 3, offsets=True)
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_decreasing_offsets(self):
+        expected_message = 'Offsets must not decrease. 5 followed by 2 ' \
+                           'found at index 2.'
+        for min in (None, 0):
+            with self.assertRaises(ValueError) as ex:
+                rf.limited_lens([0, 5, 2], min, 10, offsets=True)
+            self.assertEqual(expected_message, str(ex.exception))
+
+    def test_invalid_interval(self):
+        self.assertRaises(ValueError, rf.limited_lens, [], -1, 3)
+        self.assertRaises(ValueError, rf.limited_lens, [], None, None)
+        self.assertRaises(ValueError, rf.limited_lens, [], 4, 3)
+
+    def test_custom_exception_type(self):
+        self.assertRaises(FileNotFoundError, rf.limited_lens, ['abc'], 0, 1,
+                          ex=FileNotFoundError)
+
+    @unittest.skipIf(np is None, 'NumPy not installed')
+    def test_ndarray_offsets(self):
+        offsets = np.array([0, 2, 2, 6])
+        self.assertIs(offsets, rf.limited_lens(offsets, 0, 4, offsets=True))
+        expected_message = 'Length of value[1] must be in range [1, +inf[. ' \
+                           '0 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.limited_lens(offsets, 1, None, offsets=True)
+        self.assertEqual(expected_message, str(ex.exception))
+        self.assertRaises(ValueError, rf.limited_lens, np.array([0, 5, 2]),
+                          None, 10, offsets=True)
+
+
+class TestExactLens(unittest.TestCase):
+    def test_proper_lengths(self):
+        pairs = [b'ab', 'cd', [1, 2]]
+        self.assertIs(pairs, rf.exact_lens(pairs, 2))
+        self.assertIs(pairs, rf.exact_lens(pairs, [2, 2, 2]))
+        self.assertIs(pairs, rf.exact_lens(pairs, array.array('q',
+                                                             [2, 2, 2])))
+        self.assertEqual([], rf.exact_lens([], 2))
+        self.assertEqual([0, 2, 4], rf.exact_lens([0, 2, 4], 2, offsets=True))
+
+    def test_wrong_length(self):
+        expected_message = 'Length of pair[2] must be exactly 2. ' \
+                           '1 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.exact_lens([b'ab', b'cd', b'e'], 2, name='pair')
+        self.assertEqual(expected_message, str(ex.exception))
+        expected_message = 'Length of value[1] must be exactly 4. ' \
+                           '3 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.exact_lens([b'ab', b'cde'], [2, 4])
+        self.assertEqual(expected_message, str(ex.exception))
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.exact_lens([0, 2, 5], [2, 4], offsets=True)
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_decreasing_offsets(self):
+        self.assertRaises(ValueError, rf.exact_lens, [0, 2, 1], 2,
+                          offsets=True)
+
+    def test_invalid_expected(self):
+        self.assertRaises(TypeError, rf.exact_lens, [b'a'], 1.0)
+        self.assertRaises(ValueError, rf.exact_lens, [b'a'], -1)
+        self.assertRaises(ValueError, rf.exact_lens, [b'a'], [-1])
+        self.assertRaises(ValueError, rf.exact_lens, [b'a'], [1, 2])
+        self.assertRaises(TypeError, rf.exact_lens, [b'a', b'b'], [1, 2.5])
+        self.assertRaises(TypeError, rf.exact_lens, [b'ab', b'b'], [2.5, 1])
+
+    def test_custom_exception_type(self):
+        self.assertRaises(FileNotFoundError, rf.exact_lens, ['abc'], 1,
+                          ex=FileNotFoundError)
+
+
+class TestIntervalSet(unittest.TestCase):
+    def setUp(self):
+        self.ports = rf.IntervalSet([(8000, 8999), (20, 23), (80, 80),
+                                     (21, 30), (8500, 9000)], name='Port')
+
+    def test_merged_intervals(self):
+        self.assertEqual(((20, 30), (80, 80), (8000, 9000)),
+                         self.ports.intervals)
+        self.assertEqual(3, len(self.ports))
+        unbounded = rf.IntervalSet([(5, None), (None, 0), (1, 2), (6, 7)])
+        self.assertEqual(((None, 0), (1, 2), (5, None)), unbounded.intervals)
+
+    def test_in_intervals(self):
+        for value in (20, 25, 30, 80, 8000, 8999, 9000, 80.0):
+            self.assertIs(value, self.ports(value))
+            self.assertIn(value, self.ports)
+        for value in (19, 31, 79.5, 81, 9001, math.nan, -math.inf,
+                      decimal.Decimal('NaN'), decimal.Decimal('sNaN')):
+            self.assertNotIn(value, self.ports)
+
+    def test_nearest_intervals_in_message(self):
+        for value, nearest in [(50, '[20, 30] and [80, 80]'),
+                               (5, '[20, 30]'),
+                               (10000, '[8000, 9000]'),
+                               (math.nan, '[8000, 9000]'),
+                               (decimal.Decimal('NaN'), '[8000, 9000]')]:
+            expected_message = 'Port must be in one of the allowed ranges, ' \
+                               'the nearest being {:}. {:} found ' \
+                               'instead.'.format(nearest, value)
+            with self.assertRaises(rf.RangeError) as ex:
+                self.ports(value)
+            self.assertEqual(expected_message, str(ex.exception))
+        self.assertEqual((8000, 9000), ex.exception.min)
+        self.assertIsNone(ex.exception.max)
+
+    def test_unbounded(self):
+        intervals = rf.IntervalSet([(None, 0), (10, None)])
+        self.assertEqual(-10 ** 100, intervals(-10 ** 100))
+        expected_message = 'Value must be in one of the allowed ranges, the ' \
+                           'nearest being ]-inf, 0] and [10, +inf[. 5 found ' \
+                           'instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            intervals(5)
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_invalid_intervals(self):
+        self.assertRaises(ValueError, rf.IntervalSet, [])
+        self.assertRaises(ValueError, rf.IntervalSet, [(0, 1), (3, 2)])
+        self.assertRaises(ValueError, rf.IntervalSet, [(0, math.nan)])
+        self.assertRaises(ValueError, rf.IntervalSet, [(None, None)])
+
+    def test_dtype_and_custom_exception_type(self):
+        intervals = rf.IntervalSet([(0, 1), (3, 4)], dtype=int,
+                                   ex=FileNotFoundError)
+        self.assertRaises(TypeError, intervals, 0.5)
+        self.assertRaises(FileNotFoundError, intervals, 2)
+
+    def test_validate_array(self):
+        values = [20, 80, 8500]
+        self.assertIs(values, self.ports.validate_array(values))
+        expected_message = 'Port[2] must be in one of the allowed ranges, ' \
+                           'the nearest being [20, 30] and [80, 80]. 40 ' \
+                           'found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            self.ports.validate_array(iter([20, 21, 40, 41]))
+        self.assertEqual(expected_message, str(ex.exception))
+
+    @unittest.skipIf(np is None, 'NumPy not installed')
+    def test_validate_ndarray(self):
+        values = np.array([[20, 80], [8000, 9000]])
+        self.assertIs(values, self.ports.validate_array(values))
+        empty = values[:0]
+        self.assertIs(empty, self.ports.validate_array(empty))
+        expected_message = 'Port[1, 0] must be in one of the allowed ' \
+                           'ranges, the nearest being [80, 80] and [8000, ' \
+                           '9000]. 81 found instead.'
+        values[1, 0] = 81
+        with self.assertRaises(rf.RangeError) as ex:
+            self.ports.validate_array(values)
+        self.assertEqual(expected_message, str(ex.exception))
+        with self.assertRaises(rf.RangeError) as ex:
+            self.ports.validate_array(np.array([20.0, math.nan]))
+        self.assertIn('Port[1]', str(ex.exception))
+
+    def test_as_record_field(self):
+        validator = rf.RecordValidator({'port': self.ports})
+        self.assertEqual({'port': 80}, validator({'port': 80}))
+        expected_message = 'port must be in one of the allowed ranges, the ' \
+                           'nearest being [80, 80] and [8000, 9000]. 81 ' \
+                           'found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            validator({'port': 81})
+        self.assertEqual(expected_message, str(ex.exception))
+
+
+class TestDomain(unittest.TestCase):
+    def setUp(self):
+        self.opcode = rf.Domain([0x7F, 0x01, 0x10, 0x02, 0x01],
+                                name='Opcode', width='uint8')
+
+    def test_allowed(self):
+        self.assertEqual((1, 2, 16, 127), self.opcode.values)
+        self.assertEqual(4, len(self.opcode))
+        for value in (1, 2, 16, 127):
+            self.assertIs(value, self.opcode(value))
+            self.assertIn(value, self.opcode)
+        for value in (0, 3, 128, 300, -1, 1.0, '1', None):
+            self.assertNotIn(value, self.opcode)
+
+    def test_not_allowed(self):
+        expected_message = 'Opcode must be one of 1, 2, 16, 127. 3 found ' \
+                           'instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            self.opcode(3)
+        self.assertEqual(expected_message, str(ex.exception))
+        self.assertEqual('domain', ex.exception.kind)
+        self.assertEqual((1, 2, 16, 127), ex.exception.min)
+
+    def test_width_checked_first(self):
+        expected_message = 'Opcode must be in range [0, 255]. 300 found ' \
+                           'instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            self.opcode(300)
+        self.assertEqual(expected_message, str(ex.exception))
+        self.assertRaises(rf.RangeError, rf.Domain([1, 2], width='B'), -1)
+
+    def test_type(self):
+        expected_message = 'Opcode must be of type int. float found instead.'
+        with self.assertRaises(TypeError) as ex:
+            self.opcode(1.0)
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_large_domain(self):
+        domain = rf.Domain(range(0, 1 << 20, 3))
+        self.assertIs(domain._table, None)
+        self.assertEqual(9, domain(9))
+        expected_message = 'Value must be one of the 349526 allowed values ' \
+                           'in [0, 1048575]. 10 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            domain(10)
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_invalid_domain(self):
+        self.assertRaises(ValueError, rf.Domain, [])
+        self.assertRaises(TypeError, rf.Domain, [1, 2.0])
+        self.assertRaises(ValueError, rf.Domain, [1, 300], width='uint8')
+        self.assertRaises(ValueError, rf.Domain, [1], width='float')
+
+    def test_custom_exception_type(self):
+        domain = rf.Domain([1, 2], width='uint8', ex=FileNotFoundError)
+        self.assertRaises(FileNotFoundError, domain, 3)
+        self.assertRaises(FileNotFoundError, domain, 256)
+
+    def test_validate_bytes(self):
+        data = b'\x01\x02\x10\x7f'
+        self.assertIs(data, self.opcode.validate_array(data))
+        buffer = bytearray(data)
+        self.assertIs(buffer, self.opcode.validate_array(buffer))
+        expected_message = 'Opcode[2] must be one of 1, 2, 16, 127. 5 found ' \
+                           'instead.'
+        for data in (b'\x01\x02\x05', memoryview(b'\x01\x02\x05').cast('c')):
+            with self.assertRaises(rf.RangeError) as ex:
+                self.opcode.validate_array(data)
+            self.assertEqual(expected_message, str(ex.exception))
+        signed = rf.Domain([-3, 5], width='int8')
+        data = array.array('b', [-3, 5, -3])
+        self.assertIs(data, signed.validate_array(data))
+
+    def test_validate_iterable(self):
+        expected_message = 'Opcode[1] must be in range [0, 255]. 300 found ' \
+                           'instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            self.opcode.validate_array(iter([1, 300]))
+        self.assertEqual(expected_message, str(ex.exception))
+
+    @unittest.skipIf(np is None, 'NumPy not installed')
+    def test_validate_ndarray(self):
+        values = np.array([[1, 2], [16, 127]], dtype=np.uint8)
+        self.assertIs(values, self.opcode.validate_array(values))
+        values[1, 0] = 3
+        expected_message = 'Opcode[1, 0] must be one of 1, 2, 16, 127. 3 ' \
+                           'found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            self.opcode.validate_array(values)
+        self.assertEqual(expected_message, str(ex.exception))
+        signed = rf.Domain([-128, 0, 127], width='int8')
+        with self.assertRaises(rf.RangeError) as ex:
+            signed.validate_array(np.array([0, 127, 200], dtype=np.uint8))
+        self.assertIn('[-128, 127]. 200', str(ex.exception))
+        huge = rf.Domain([2 ** 64 - 5, 2 ** 64 - 1])
+        values = np.array([2 ** 64 - 1, 2 ** 64 - 5], dtype=np.uint64)
+        self.assertIs(values, huge.validate_array(values))
+        large = rf.Domain(range(0, 1 << 20, 2))
+        values = np.array([0, 2, 3])
+        self.assertRaises(rf.RangeError, large.validate_array, values)
+        self.assertRaises(TypeError, self.opcode.validate_array,
+                          np.array([1.0]))
+
+    def test_as_record_field(self):
+        validator = rf.RecordValidator({'op': self.opcode})
+        expected_message = 'op must be one of 1, 2, 16, 127. 3 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            validator({'op': 3})
+        self.assertEqual(expected_message, str(ex.exception))
+
+
+async def _async_items(items):
+    for item in items:
+        yield item
+
+
+def _collect_async(aiterable):
+    async def collect():
+        return [item async for item in aiterable]
+
+    return asyncio.run(collect())
+
+
+@unittest.skipIf(sys.version_info < (3, 7),
+                 'asyncio.run() requires Python 3.7')
+class TestAsyncLimitedIter(unittest.TestCase):
+    def test_in_range(self):
+        self.assertEqual([1, 2, 3], _collect_async(
+            rf.alimited_iter(_async_items([1, 2, 3]), 0, 10)))
+        self.assertEqual([], _collect_async(
+            rf.alimited_iter(_async_items([]), 0, 10)))
+
+    def test_position_in_message(self):
+        expected_message = 'Sample[2] must be in range [0, 10]. 30 found ' \
+                           'instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            _collect_async(rf.alimited_iter(_async_items([1, 2, 30]), 0, 10,
+                                            name='Sample'))
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_type_and_custom_exception_type(self):
+        self.assertRaises(TypeError, _collect_async, rf.alimited_iter(
+            _async_items([1, 2.0]), 0, 10, dtype=int))
+        self.assertRaises(FileNotFoundError, _collect_async, rf.alimited_iter(
+            _async_items([1, 20]), 0, 10, ex=FileNotFoundError))
+
+    def test_items_before_failure_are_yielded(self):
+        received = []
+
+        async def consume():
+            async for item in rf.alimited_iter(_async_items([1, math.nan]),
+                                               0, 10):
+                received.append(item)
+
+        self.assertRaises(rf.RangeError, asyncio.run, consume())
+        self.assertEqual([1], received)
+
+    def test_decimal_nan(self):
+        expected_message = 'Value[1] must be in range [0, 1]. NaN found ' \
+                           'instead.'
+        items = [decimal.Decimal(0), decimal.Decimal('NaN')]
+        for chunks, batched in ((items, False), ([items], True)):
+            with self.assertRaises(rf.RangeError) as ex:
+                _collect_async(rf.alimited_iter(_async_items(chunks), 0, 1,
+                                                batched=batched))
+            self.assertEqual(expected_message, str(ex.exception))
+
+    def test_batched(self):
+        chunks = [[1, 2], b'\x03\x04\x05', array.array('d', [6.0])]
+        self.assertEqual(chunks, _collect_async(
+            rf.alimited_iter(_async_items(chunks), 0, 10, batched=True)))
+        expected_message = 'Value[4] must be in range [0, 10]. 50 found ' \
+                           'instead.'
+        for chunks in ([[1, 2], [3, 4, 50]], [b'\x01\x02\x03', b'\x04\x32'],
+                       [[1, 2, 3, 4], array.array('h', [50, 1])]):
+            with self.assertRaises(rf.RangeError) as ex:
+                _collect_async(rf.alimited_iter(_async_items(chunks), 0, 10,
+                                                batched=True))
+            self.assertEqual(expected_message, str(ex.exception))
+
+    @unittest.skipIf(np is None, 'NumPy not installed')
+    def test_batched_ndarray(self):
+        chunks = [np.arange(5), np.array([[5, 6], [7, 11]])]
+        expected_message = 'Value[8] must be in range [0, 10]. 11 found ' \
+                           'instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            _collect_async(rf.alimited_iter(_async_items(chunks), 0, 10,
+                                            batched=True))
+        self.assertEqual(expected_message, str(ex.exception))
+        self.assertRaises(TypeError, _collect_async, rf.alimited_iter(
+            _async_items([np.arange(3.0)]), 0, 10, dtype=int, batched=True))
+
+
+@unittest.skipIf(sys.version_info < (3, 7),
+                 'asyncio.run() requires Python 3.7')
+class TestAsyncClipIter(unittest.TestCase):
+    def test_clip(self):
+        self.assertEqual([0, 3, 10], _collect_async(
+            rf.aclip_iter(_async_items([-5, 3, 50]), 0, 10)))
+
+    def test_batched(self):
+        self.assertEqual([[0, 3], [10]], _collect_async(
+            rf.aclip_iter(_async_items([[-5, 3], b'\xff']), 0, 10,
+                          batched=True)))
+
+    @unittest.skipIf(np is None, 'NumPy not installed')
+    def test_batched_ndarray(self):
+        chunks = _collect_async(rf.aclip_iter(
+            _async_items([np.array([-5, 3, 50])]), 0, 10, batched=True))
+        self.assertEqual([0, 3, 10], chunks[0].tolist())
+
+
+class TestSaturate(unittest.TestCase):
+    def test_array_module(self):
+        converted, saturated = rf.saturate(
+            array.array('d', [-1e6, 0.5, 40000.0, -0.9]), 'int16')
+        self.assertEqual(array.array('h', [-32768, 0, 32767, 0]), converted)
+        self.assertEqual(2, saturated)
+        converted, saturated = rf.saturate(iter([1, 2, 300]), 'B')
+        self.assertEqual(array.array('B', [1, 2, 255]), converted)
+        self.assertEqual(1, saturated)
+        converted, saturated = rf.saturate([], 'uint8', tolerance=0)
+        self.assertEqual(array.array('B'), converted)
+        self.assertEqual(0, saturated)
+
+    def test_nan(self):
+        expected_message = 'Sample[1] must be in range [0, 255]. nan found ' \
+                           'instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.saturate([1.0, math.nan], 'uint8', name='Sample')
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_tolerance(self):
+        self.assertEqual(1, rf.saturate([1, 300], 'uint8', tolerance=0.5)[1])
+        expected_message = 'Saturated fraction of Sample must be in range ' \
+                           '[0, 0.4]. 0.5 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.saturate([1, 300], 'uint8', name='Sample', tolerance=0.4)
+        self.assertEqual(expected_message, str(ex.exception))
+        self.assertRaises(FileNotFoundError, rf.saturate, [1, 300], 'uint8',
+                          tolerance=0, ex=FileNotFoundError)
+
+    def test_invalid_arguments(self):
+        self.assertRaises(ValueError, rf.saturate, [1], 'float32')
+        self.assertRaises(ValueError, rf.saturate, [1], 'uint8',
+                          tolerance=1.5)
+
+    @unittest.skipIf(np is None, 'NumPy not installed')
+    def test_ndarray(self):
+        converted, saturated = rf.saturate(np.array([[1.9, 300.0],
+                                                     [-5.0, 7.0]]), 'uint8')
+        self.assertEqual(np.uint8, converted.dtype)
+        self.assertEqual([[1, 255], [0, 7]], converted.tolist())
+        self.assertEqual(2, saturated)
+        converted, saturated = rf.saturate(
+            np.array([-5, 70000, 3], dtype=np.int64), 'uint16')
+        self.assertEqual([0, 65535, 3], converted.tolist())
+        self.assertEqual(2, saturated)
+        converted, saturated = rf.saturate(
+            np.array([2 ** 64 - 1, 5], dtype=np.uint64), 'int64')
+        self.assertEqual([2 ** 63 - 1, 5], converted.tolist())
+        self.assertEqual(1, saturated)
+
+    @unittest.skipIf(np is None, 'NumPy not installed')
+    def test_ndarray_float_beyond_upper_bound(self):
+        converted, saturated = rf.saturate(
+            np.array([1e19, -1e19, 2.0 ** 63, 2.0 ** 63 - 1024]), 'int64')
+        self.assertEqual([2 ** 63 - 1, -2 ** 63, 2 ** 63 - 1, 2 ** 63 - 1024],
+                         converted.tolist())
+        self.assertEqual(3, saturated)
+        converted, saturated = rf.saturate(
+            np.array([3e9, 2.0 ** 31], dtype=np.float32), 'int32')
+        self.assertEqual([2 ** 31 - 1, 2 ** 31 - 1], converted.tolist())
+        self.assertEqual(2, saturated)
+
+    @unittest.skipIf(np is None, 'NumPy not installed')
+    def test_ndarray_nan_and_tolerance(self):
+        expected_message = 'Value[1, 0] must be in range [0, 255]. nan ' \
+                           'found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.saturate(np.array([[1.0, 2.0], [math.nan, 3.0]]), 'uint8')
+        self.assertEqual(expected_message, str(ex.exception))
+        self.assertRaises(rf.RangeError, rf.saturate,
+                          np.array([1.0, 300.0]), 'uint8', tolerance=0.1)
+
+
+class TestMinWidth(unittest.TestCase):
+    def test_unsigned(self):
+        self.assertEqual('uint8', rf.min_width([0, 200, 17]))
+        self.assertEqual('uint16', rf.min_width([256]))
+        self.assertEqual('uint32', rf.min_width(iter([5, 70000, 3])))
+        self.assertEqual('uint64', rf.min_width([2 ** 64 - 1]))
+        self.assertEqual('uint8', rf.min_width([]))
+        self.assertEqual('uint8', rf.min_width(b'\x00\xff'))
+
+    def test_signed(self):
+        self.assertEqual('int8', rf.min_width([-128, 127]))
+        self.assertEqual('int16', rf.min_width([-1, 200]))
+        self.assertEqual('int16', rf.min_width([0, 200], signed=True))
+        self.assertEqual('int64', rf.min_width([-2 ** 63]))
+        self.assertEqual('int8', rf.min_width([], signed=True))
+        self.assertEqual('int8', rf.min_width(array.array('q', [-3, 3])))
+
+    def test_no_width_fits(self):
+        expected_message = 'Column must be in range [0, ' \
+                           '18446744073709551615]. -1 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.min_width([5, -1], signed=False, name='Column')
+        self.assertEqual(expected_message, str(ex.exception))
+        self.assertRaises(rf.RangeError, rf.min_width, [2 ** 64])
+        self.assertRaises(FileNotFoundError, rf.min_width, [-2 ** 63 - 1],
+                          ex=FileNotFoundError)
+
+    def test_type(self):
+        self.assertRaises(TypeError, rf.min_width, [1.5, 2])
+        self.assertRaises(TypeError, rf.min_width, [1, 2.5, 3])
+        self.assertRaises(TypeError, rf.min_width, iter([1, None]))
+        self.assertRaises(TypeError, rf.min_width, array.array('d', [1.0]))
+
+    @unittest.skipIf(np is None, 'NumPy not installed')
+    def test_ndarray(self):
+        self.assertEqual('int64', rf.min_width(np.array([-5, 2 ** 40])))
+        self.assertEqual('uint8', rf.min_width(np.arange(3, dtype=np.uint64)))
+        self.assertEqual('uint8', rf.min_width(np.array([], dtype=int)))
+        self.assertRaises(TypeError, rf.min_width, np.array([1.0]))
+
+
+class TestMinBits(unittest.TestCase):
+    def test_bits(self):
+        self.assertEqual(3, rf.min_bits([0, 5, 3]))
+        self.assertEqual(0, rf.min_bits([0]))
+        self.assertEqual(0, rf.min_bits([]))
+        self.assertEqual(2001, rf.min_bits([2 ** 2000]))
+
+    def test_negative(self):
+        expected_message = 'Value must be in range [0, +inf[. -3 found ' \
+                           'instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.min_bits([-3, 5])
+        self.assertEqual(expected_message, str(ex.exception))
+
+
+class TestFits(unittest.TestCase):
+    def test_fits(self):
+        self.assertTrue(rf.fits([0, 200], 'uint8'))
+        self.assertFalse(rf.fits([0, 200], 'int8'))
+        self.assertTrue(rf.fits([], 'b'))
+        self.assertFalse(rf.fits(iter([-1]), 'B'))
+        self.assertRaises(ValueError, rf.fits, [1], 'float')
+        self.assertRaises(ValueError, rf.fits, [300], 'hH')
+        self.assertRaises(TypeError, rf.fits, [1, 2.5, 3], 'uint8')
+
+
+class TestLimitedFile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'samples.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, data):
+        with open(self.path, 'wb') as file:
+            file.write(data)
+
+    def check_both_implementations(self, function, *args, **kwargs):
+        # With NumPy, if installed, and with the standard library only.
+        results = []
+        for numpy in ([np] if np is not None else []) + [None]:
+            with unittest.mock.patch.object(rf, 'numpy', numpy):
+                results.append(function(*args, **kwargs))
+        return results[-1]
+
+    def check_error(self, expected_message, function, *args, **kwargs):
+        for numpy in ([np] if np is not None else []) + [None]:
+            with unittest.mock.patch.object(rf, 'numpy', numpy):
+                with self.assertRaises(rf.RangeError) as ex:
+                    function(*args, **kwargs)
+                self.assertEqual(expected_message, str(ex.exception))
+
+    def test_in_range(self):
+        samples = array.array('h', range(-2048, 2048))
+        self.write(samples.tobytes())
+        self.assertEqual(4096, self.check_both_implementations(
+            rf.limited_file, self.path, -2048, 2047, 'h', chunk_size=1000))
+        self.write(b'')
+        self.assertEqual(0, self.check_both_implementations(
+            rf.limited_file, self.path, 0, 1, 'h'))
+
+    def test_first_violation_across_chunks(self):
+        samples = array.array('h', [0] * 100000)
+        samples[70000] = 2000
+        samples[90000] = -2000
+        self.write(samples.tobytes())
+        expected_message = 'Sample[70000] at byte offset 140000 must be in ' \
+                           'range [-1024, 1023]. 2000 found instead.'
+        self.check_error(expected_message, rf.limited_file, self.path, -1024,
+                         1023, 'h', name='Sample', chunk_size=4096)
+
+    def test_offset_and_byteorder(self):
+        other = 'big' if sys.byteorder == 'little' else 'little'
+        self.write(b'HEAD' + (300).to_bytes(4, other) + (5).to_bytes(4, other))
+        self.assertEqual(2, self.check_both_implementations(
+            rf.limited_file, self.path, 0, 300, 'I', offset=4,
+            byteorder=other))
+        expected_message = 'Value[1] at byte offset 8 must be in range ' \
+                           '[6, 300]. 5 found instead.'
+        self.check_error(expected_message, rf.limited_file, self.path, 6, 300,
+                         'I', offset=4, byteorder=other)
+
+    def test_nan(self):
+        self.write(array.array('d', [0.5, math.nan]).tobytes())
+        expected_message = 'Value[1] at byte offset 8 must be in range ' \
+                           '[0, 1]. nan found instead.'
+        self.check_error(expected_message, rf.limited_file, self.path, 0, 1,
+                         'd')
+
+    def test_invalid_size(self):
+        self.write(b'\x00\x00\x00')
+        self.assertRaises(ValueError, rf.limited_file, self.path, 0, 1, 'h')
+        self.assertRaises(ValueError, rf.limited_file, self.path, 0, 1, 'B',
+                          offset=4)
+        self.assertRaises(ValueError, rf.limited_file, self.path, None, None,
+                          'B')
+
+    def test_custom_exception_type(self):
+        self.write(b'\x00\xff')
+        self.assertRaises(FileNotFoundError, rf.limited_file, self.path, 0,
+                          10, 'B', ex=FileNotFoundError)
+
+
+class TestFixedWidthFile(unittest.TestCase):
+    def test_fixed_width(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'counters.bin')
+            with open(path, 'wb') as file:
+                file.write(array.array('I', [1, 2, 70000]).tobytes())
+            self.assertEqual(3, rf.fixed_width_file(path, 'uint32', 'I'))
+            expected_message = 'Value[2] at byte offset 8 must be in range ' \
+                               '[0, 65535]. 70000 found instead.'
+            with self.assertRaises(rf.RangeError) as ex:
+                rf.fixed_width_file(path, 'uint16', 'I')
+            self.assertEqual(expected_message, str(ex.exception))
+            self.assertRaises(ValueError, rf.fixed_width_file, path, 'd', 'I')
+            with open(path, 'wb') as file:
+                file.write(array.array('d', [1.5, 2.25]).tobytes())
+            self.assertRaises(TypeError, rf.fixed_width_file, path, 'uint8',
+                              'd')
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, file_name, text):
+        path = os.path.join(self.directory.name, file_name)
+        with open(path, 'w') as file:
+            file.write(text)
+        return path
+
+    def test_json(self):
+        path = self.write('limits.json', '''{
+            "Hours of sleep": [0, 24, "int"],
+            "Port": "uint16",
+            "Ratio": "0.5:",
+            "Temperature": [-40.0, null],
+            "Opcode": {"values": [1, 2, 16], "width": "uint8"},
+            "Band": {"intervals": [[1, 5], [10, 20]]},
+            "Pair": {"length": 2},
+            "Label": {"length": [1, 8]}
+        }''')
+        registry = rf.Registry(path)
+        self.assertEqual(8, len(registry))
+        self.assertIn('Port', registry)
+        self.assertEqual(8, registry['Hours of sleep'](8))
+        self.assertRaises(TypeError, registry['Hours of sleep'], 8.0)
+        for name, value in [('Port', 70000), ('Ratio', 0.1),
+                            ('Temperature', -50.0), ('Opcode', 3),
+                            ('Band', 7), ('Pair', [1]), ('Label', '')]:
+            self.assertRaises(rf.RangeError, registry[name], value)
+        expected_message = 'Port must be in range [0, 65535]. 70000 found ' \
+                           'instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            registry['Port'](70000)
+        self.assertEqual(expected_message, str(ex.exception))
+        self.assertRaises(KeyError, registry.__getitem__, 'Missing')
+
+    def test_ini(self):
+        path = self.write('limits.ini', '[time]\n'
+                                        'Hours of sleep = 0:24\n'
+                                        '[net]\n'
+                                        'Port = uint16\n')
+        registry = rf.Registry(path, ex=FileNotFoundError)
+        self.assertEqual(['Hours of sleep', 'Port'], list(registry))
+        self.assertRaises(FileNotFoundError, registry['Hours of sleep'], 25)
+        path = self.write('duplicate.ini', '[a]\nx = 0:1\n[b]\nx = 0:2\n')
+        self.assertRaises(ValueError, rf.Registry, path)
+
+    def test_toml(self):
+        try:
+            import tomllib  # noqa: F401
+        except ImportError:
+            self.skipTest('TOML not supported')
+        path = self.write('limits.toml', '"Hours of sleep" = [0, 24]\n'
+                                         'Temperature = {min = -40.0}\n')
+        registry = rf.Registry(path)
+        self.assertEqual(0, registry['Hours of sleep'](0))
+        self.assertRaises(rf.RangeError, registry['Temperature'], -41.0)
+
+    def test_invalid_specifications_fail_at_load(self):
+        for text in ('{"a": [5, 1]}', '{"a": [null, null]}', '{"a": "x"}',
+                     '{"a": {"min": 0, "color": 1}}', '{"a": [0, 1, "str"]}',
+                     '{"a": {"width": "float"}}', '{"a": 5}'):
+            path = self.write('limits.json', text)
+            with self.assertRaises(ValueError) as ex:
+                rf.Registry(path)
+            self.assertTrue(str(ex.exception).startswith(
+                'Invalid specification of a: '), str(ex.exception))
+        self.assertRaises(ValueError, rf.Registry,
+                          self.write('limits.yaml', ''))
+
+    def test_reload(self):
+        path = self.write('limits.json', '{"Hours": [0, 24]}')
+        registry = rf.Registry(path)
+        self.assertFalse(registry.reload_if_changed())
+        self.write('limits.json', '{"Hours": [0, 12], "Days": [1, 7]}')
+        os.utime(path, ns=(0, 0))
+        self.assertTrue(registry.reload_if_changed())
+        self.assertRaises(rf.RangeError, registry['Hours'], 20)
+        self.assertEqual(7, registry['Days'](7))
+        self.write('limits.json', '{"Hours": [12, 0]}')
+        self.assertRaises(ValueError, registry.reload)
+        self.assertEqual(12, registry['Hours'](12))  # Old validators kept.
+        self.assertRaises(ValueError, rf.Registry().reload)
+
+    def test_update(self):
+        registry = rf.Registry()
+        registry.update({'Hours': (0, 24), 'Byte': rf.uint8})
+        self.assertEqual(['Hours', 'Byte'], list(registry))
+        self.assertRaises(rf.RangeError, registry['Byte'], 256)
+        registry.update({'Days': [1, 7]}, replace=True)
+        self.assertEqual(['Days'], list(registry))
+
+    def test_default_registry(self):
+        self.assertIsInstance(rf.registry, rf.Registry)
+
+
+@unittest.skipIf(np is None, 'NumPy not installed')
+class TestValidateColumns(unittest.TestCase):
+    def setUp(self):
+        self.columns = {
+            'port': [80, 443, 70000],
+            'hours': np.array([8, 25, 3]),
+            'name': ['a', 'bb', ''],
+        }
+        self.spec = {
+            'port': rf.uint16,
+            'hours': (0, 24, int),
+            'name': rf.Length(1, 8),
+        }
+
+    def test_valid(self):
+        columns = {'port': [80, 443], 'ratio': np.array([0.5, 1.0])}
+        self.assertIs(columns, rf.validate_columns(
+            columns, {'port': rf.uint16, 'ratio': rf.Range(0, 1)}))
+        self.assertEqual([False, False], rf.validate_columns(
+            columns, {'port': rf.uint16}, mask=True).tolist())
+
+    def test_first_violation_in_spec_order(self):
+        expected_message = 'port[2] must be in range [0, 65535]. 70000 ' \
+                           'found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.validate_columns(self.columns, self.spec)
+        self.assertEqual(expected_message, str(ex.exception))
+        expected_message = 'Length of name[2] must be in range [1, 8]. 0 ' \
+                           'found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.validate_columns(self.columns, {'name': rf.Length(1, 8)})
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_mask(self):
+        self.assertEqual([False, True, True], rf.validate_columns(
+            self.columns, self.spec, mask=True).tolist())
+        self.assertEqual(0, len(rf.validate_columns({}, {}, mask=True)))
+        self.assertEqual([False, False, False], rf.validate_columns(
+            self.columns, {}, mask=True).tolist())
+
+    def test_specification_kinds(self):
+        for field_spec, expected_mask in [
+                (rf.Exactly(8), [False, True, True]),
+                (rf.Domain([3, 8]), [False, True, False]),
+                (rf.IntervalSet([(0, 5), (20, 30)]), [True, False, False]),
+                (rf.positive_int, [False, False, False]),
+                (rf.Validator(0, 10), [False, True, False]),
+                (lambda value, name: rf.limited(value, 0, 5, name),
+                 [True, True, False])]:
+            self.assertEqual(expected_mask, rf.validate_columns(
+                self.columns, {'hours': field_spec}, mask=True).tolist())
+        expected_message = 'hours[1] must be exactly 8. 25 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.validate_columns(self.columns, {'hours': rf.Exactly(8)})
+        self.assertEqual(expected_message, str(ex.exception))
+
+    def test_nan(self):
+        columns = {'x': [1.0, math.nan]}
+        self.assertEqual([False, True], rf.validate_columns(
+            columns, {'x': (0, 5)}, mask=True).tolist())
+        self.assertEqual([True, False], rf.validate_columns(
+            columns, {'x': rf.Exactly(math.nan)}, mask=True).tolist())
+
+    def test_invalid_columns(self):
+        self.assertRaises(TypeError, rf.validate_columns, self.columns,
+                          {'hours': (0, 24, float)})
+        self.assertRaises(ValueError, rf.validate_columns,
+                          {'a': [1], 'b': [1, 2]}, {'a': (0, 1), 'b': (0, 1)})
+        self.assertRaises(KeyError, rf.validate_columns, self.columns,
+                          {'missing': (0, 1)})
+        self.assertRaises(FileNotFoundError, rf.validate_columns,
+                          self.columns, self.spec, ex=FileNotFoundError)
+
+    @unittest.skipIf(pd is None, 'pandas not installed')
+    def test_dataframe(self):
+        frame = pd.DataFrame(self.columns, index=['r1', 'r2', 'r3'])
+        expected_message = 'hours[r2] must be in range [0, 24]. 25 found ' \
+                           'instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            rf.validate_columns(frame, {'hours': (0, 24, int)})
+        self.assertEqual(expected_message, str(ex.exception))
+        self.assertEqual([False, True, True], rf.validate_columns(
+            frame, self.spec, mask=True).tolist())
+        self.assertIs(frame, rf.validate_columns(frame, {'port': (0, None)}))
+        self.assertEqual([False, False, False], rf.validate_columns(
+            frame, {}, mask=True).tolist())
+
+
+class TestExactly(unittest.TestCase):
+    def test_record_field(self):
+        validator = rf.RecordValidator({'version': rf.Exactly(2, dtype=int)})
+        self.assertEqual({'version': 2}, validator({'version': 2}))
+        expected_message = 'version must be exactly 2. 3 found instead.'
+        with self.assertRaises(rf.RangeError) as ex:
+            validator({'version': 3})
+        self.assertEqual(expected_message, str(ex.exception))
+        self.assertRaises(TypeError, validator, {'version': 2.0})